@@ -1,14 +1,72 @@
+import time
+_START = time.perf_counter()   # awal proses, untuk --profile-startup
+
+import json
+import os
+import queue
+import sys
+import threading
 import tkinter as tk 
 from tkinter import ttk, messagebox
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
+from functools import partial
+from types import SimpleNamespace
+from athletes import Roster
+from analysis import default_schedule, hitung_metrik
+from storage import RunLog, DATA_DIR
+from workers import TaskRunner
+from run_store import DayTotals, Rollups, HARI_LIST
+from segments import BestEfforts, cek_interval, format_durasi, pola_interval
+from records import RecordIndex
+from plans import PLANS, ScheduleEngine, tanggal_hari, week_key
+
+# Jumlah run per tick Tk dan per transaksi log saat impor massal
+IMPORT_BATCH = 500
+IMPORT_QUEUE = 2       # batch hasil parse yang boleh menunggu di antrean (memori impor terbatas)
+IMPORT_POLL_MS = 10
+
+# Interval refresh tab Hasil saat mode live (ms); berapa pun laju sampel
+LIVE_REFRESH_MS = 250
+
+# Tinggi satu baris tombol tanggal di tab History (px)
+HISTORY_ROW_HEIGHT = 46
+
+# Urutan hasil filter History: label -> (kolom, menurun)
+HISTORY_SORTS = {"Terbaru": ("tanggal", True), "Terlama": ("tanggal", False),
+                 "Jarak terjauh": ("jarak", True), "Pace tercepat": ("pace", False),
+                 "Waktu terlama": ("waktu", True), "Kalori terbanyak": ("kal", True)}
+
+# Jumlah edit/hapus run terakhir yang bisa dibatalkan (Ctrl+Z)
+UNDO_LIMIT = 50
+
+# Atribut yang dimiliki tiap atlet; ditukar saat pindah atlet
+ATHLETE_ATTRS = ("run_log", "runs", "day_totals", "rollups", "schedule_data", "schedule",
+                 "target_mingguan", "pace", "speed", "kal", "best_efforts", "segments", "records",
+                 "undo_stack")
+
+# Ukuran papan jadwal di Canvas tab Jadwal (px)
+JADWAL_WIDTH = 750
+JADWAL_PAD = 10
+JADWAL_GAP = 10
+
+# Method jalur panas yang diukur saat instrumentasi aktif (overlay F12)
+TRACED_METHODS = ("_process_analysis", "_refresh_dirty", "show_hasil", "show_gizi", "show_history",
+                  "show_date_detail", "update_jadwal_display", "apply_theme", "_draw_grafik")
+
+# Panel tab Grafik: (metrik, judul, warna garis)
+GRAFIK_PANELS = (("jarak", "Jarak (km)", "#4ecdc4"), ("pace", "Pace (menit/km)", "#ffd166"),
+                 ("kal", "Kalori", "#ff6b6b"))
+
+# Modul yang jarang dipakai (importer, sqlite_store, instrument, filedialog, simpledialog)
+# di-import di dalam fungsi yang membutuhkannya supaya start lebih cepat
 
 THEME = {
-    "dark": {"bg":"#1e1e2e","frame":"#2d3047","card":"#3d405b","fg":"white"},
-    "light":{"bg":"#f4f4f4","frame":"#ffffff","card":"#e6e6e6","fg":"black"}
+    "dark": {"bg":"#1e1e2e","frame":"#2d3047","card":"#3d405b","fg":"white","sep":"#444444","hover":"#444444"},
+    "light":{"bg":"#f4f4f4","frame":"#ffffff","card":"#e6e6e6","fg":"black","sep":"#cccccc","hover":"#dddddd"}
 }
 
 class RunningApp(tk.Tk):
-    def __init__(self):
+    def __init__(self, data_dir=DATA_DIR, backend="log"):
         super().__init__()
         self.title("Run Analyzer Pro")
         self.geometry("850x750")
@@ -20,159 +78,461 @@ class RunningApp(tk.Tk):
             "waktu": tk.StringVar(),
             "berat": tk.StringVar(),
             "hari": tk.StringVar(),
-            "target_mingguan": tk.StringVar(value="50.0")
+            "target_mingguan": tk.StringVar(value="50.0"),
+            "program": tk.StringVar()
         }
         
+        # Variabel untuk tab Input (dibuat di sini karena tab dibangun belakangan)
+        self.input_vars = {x: tk.StringVar() for x in ["jarak","waktu","berat","target_jarak"]}
+        
         # Data storage
-        self.history = {}
-        self.daily_distances = {} 
-        self.daily_times = {}
-        self.schedule_achievements = {}
+        self.day_totals = DayTotals()
+        self.rollups = Rollups()
         self.target_mingguan = 50.0
-        
-        # Setup data
+        self.best_efforts = BestEfforts()
+        self.segments = None      # split/best effort/interval run terakhir (jika ada data sampel/lap)
+        self.records = RecordIndex()
+        self.undo_stack = []      # [(record_run_lama | None, (tanggal, ts) run_baru | None)]
+        
+        # Tampilan yang sudah dibuat (dipakai ulang) dan tab yang perlu digambar ulang
+        self._views = {}
+        self._dirty = set()
+        self._refresh_job = None
+        self._detail_view = None
+        self._leaderboard_view = None
+        self._perf_view = None
+        self._chart_series = None   # level agregat tab Grafik; None = dibangun ulang saat digambar
+        self._jadwal_days = set(HARI_LIST)   # kartu hari di tab Jadwal yang perlu diperbarui
+        self.tracer = None
+        self._live = None
+        self._importing = False     # impor massal berjalan: pindah atlet dan simpan manual ditolak
+        self.live_vars = {"sumber": tk.StringVar(value="replay"), "target": tk.StringVar()}
+        
+        # Widget/item yang warnanya mengikuti tema: {kunci: (fungsi config, {opsi: peran})}
+        self._styled = {}
+        
+        # Setup data: hanya shard atlet aktif yang dimuat
+        self.roster = Roster(data_dir)
+        self.athlete_id = self.roster.active
+        # backend "sqlite": satu database untuk semua atlet, history tidak dimuat ke RAM
+        self.db = None
+        if backend == "sqlite":
+            from sqlite_store import SqliteStore
+            self.db = SqliteStore(os.path.join(data_dir, "runs.db"))
         self.setup_schedule_data()
+        self.run_log = self._open_log(self.athlete_id)
+        self.runs = self.run_log.new_runs()
+        self.workers = TaskRunner(self)
+        self._retiring = {}         # atlet -> Future kompaksi+tutup log setelah keluar dari LRU
+        self.load_data()
+        self.roster.sync_summary(self.athlete_id, self.rollups)
+        self.target_mingguan = self.roster.profile(self.athlete_id)["target_mingguan"] or self.target_mingguan
+        self.jadwal_vars["target_mingguan"].set(str(self.target_mingguan))
         self.make_gui()
         self.apply_theme()
+        if hasattr(self, "pace"):
+            self.show_all()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
     def setup_schedule_data(self):
-        """Setup data jadwal latihan dengan target dan rekomendasi"""
-        self.schedule_data = {
-            "Senin": {
-                "latihan": "Lari Ringan",
-                "durasi": "30",
-                "target_jarak": 5.0,
-                "target_waktu": "30",
-                "tipe": "Pemanasan",
-                "tips": "Fokus pada pernapasan dan postur tubuh"
-            },
-            "Selasa": {
-                "latihan": "Interval Run",
-                "durasi": "45",
-                "target_jarak": 7.0,
-                "target_waktu": "45",
-                "tipe": "Kecepatan",
-                "tips": "Gunakan pola 5 menit cepat, 2 menit recovery"
-            },
-            "Rabu": {
-                "latihan": "Recovery Run",
-                "durasi": "25",
-                "target_jarak": 4.0,
-                "target_waktu": "25",
-                "tipe": "Pemulihan",
-                "tips": "Lari santai, dengarkan tubuh Anda"
-            },
-            "Kamis": {
-                "latihan": "Tempo Run",
-                "durasi": "40",
-                "target_jarak": 6.0,
-                "target_waktu": "40",
-                "tipe": "Ketahanan",
-                "tips": "Pertahankan pace konsisten sepanjang lari"
-            },
-            "Jumat": {
-                "latihan": "Cross Training",
-                "durasi": "35",
-                "target_jarak": 5.0,
-                "target_waktu": "35",
-                "tipe": "Variasi",
-                "tips": "Bisa kombinasi lari, jalan, atau latihan ringan"
-            },
-            "Sabtu": {
-                "latihan": "Long Run",
-                "durasi": "60",
-                "target_jarak": 10.0,
-                "target_waktu": "60",
-                "tipe": "Daya Tahan",
-                "tips": "Pertahankan pace konsisten sepanjang lari"
-            },
-            "Minggu": {
-                "latihan": "Rest Day",
-                "durasi": "0",
-                "target_jarak": 0.0,
-                "target_waktu": "0",
-                "tipe": "Pemulihan total",
-                "tips": "Istirahat untuk pemulihan otot"
-            }
-        }
-        
-        # Inisialisasi pencapaian jadwal
-        hari_list = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
-        for hari in hari_list:
-            schedule = self.schedule_data[hari]
-            self.schedule_achievements[hari] = {
-                "completed": False,
-                "actual_distance": 0.0,
-                "actual_time": 0.0,
-                "target_distance": schedule["target_jarak"],
-                "target_time": float(schedule["target_waktu"]),
-                "persentase_jarak": 0.0,
-                "persentase_waktu": 0.0,
-                "kontribusi_mingguan": 0.0
-            }
+        """Jadwal dasar atlet + program latihan -> rencana bertanggal per minggu ISO"""
+        profile = self.roster.profile(self.athlete_id)
+        self.schedule_data = profile.setdefault("schedule", default_schedule())
+        # "plans" = riwayat [minggu_mulai, plan]; profil lama hanya punya satu "plan"
+        self.schedule = ScheduleEngine(self.schedule_data, profile.get("plans", profile.get("plan")))
+        plan = self.schedule.plan
+        self.jadwal_vars["program"].set(plan["nama"] if plan else "Tetap")
+
+    def load_data(self):
+        """Muat snapshot lalu putar ulang ekor log"""
+        state, records = self.run_log.load()
+        if state:
+            self.restore_state(state)
+        for rec in records:
+            if rec.get("op") == "hapus":
+                self._remove_run(rec["tanggal"], rec["ts"])
+            else:
+                self._apply_run(rec)
+
+        # Tampilkan run terakhir di tab Hasil/Gizi
+        runs = [rec for rec in records if rec.get("op") != "hapus"]
+        last = runs[-1] if runs else (state or {}).get("last")
+        if last:
+            self.pace, self.speed, self.kal = last["pace"], last["speed"], last["kal"]
+            self.segments = last.get("segments")
+
+    def snapshot_state(self, st=None):
+        """Salinan state untuk disimpan ke snapshot (``st``: atlet yang sedang diparkir)"""
+        st = st or self
+        return json.loads(json.dumps({
+            "runs": st.runs.to_state(),
+            "day_totals": st.day_totals.to_state(),
+            "schedule": st.schedule.to_state(),
+            "target_mingguan": st.target_mingguan,
+            "best_efforts": st.best_efforts.to_state(),
+            "last": {"pace": st.pace, "speed": st.speed, "kal": st.kal,
+                     "segments": st.segments} if hasattr(st, "pace") else None
+        }))
+
+    def restore_state(self, state):
+        self.runs = self.run_log.new_runs(state["runs"])
+        self.day_totals = DayTotals.from_state(state["day_totals"])
+        self.rollups = Rollups.from_days(self.day_totals)
+        self.records = RecordIndex.build(self.runs.metric_rows(), self.rollups)
+        self.target_mingguan = state["target_mingguan"]
+        self.schedule.restore(state.get("schedule"), self.day_totals, self.target_mingguan)
+        self.best_efforts = BestEfforts.from_state(state.get("best_efforts"))
+        self.jadwal_vars["target_mingguan"].set(str(self.target_mingguan))
+
+    def on_close(self):
+        if self._live is not None:
+            self._live["stop"].set()
+        # Tunggu tulisan log yang masih antri sebelum file ditutup
+        self.workers.shutdown(wait=True)
+        self.run_log.close()
+        for _, st in self.roster.resident():
+            st.run_log.close()
+        if self.db is not None:
+            self.db.close()
+        self.roster.write(self.roster.dumps())
+        self.destroy()
+
+    # ===== MULTI ATLET =====
+    def switch_athlete(self, athlete_id):
+        """Pindah atlet: state lama diparkir di LRU, shard baru dimuat jika belum ada"""
+        if athlete_id == self.athlete_id:
+            return
+        if self._import_busy():
+            self._refresh_athlete_combo()
+            return
+        # Ambil atlet tujuan dulu supaya tidak ikut dikeluarkan dari LRU saat atlet lama diparkir
+        st = self.roster.take(athlete_id)
+        parked = SimpleNamespace(**{a: getattr(self, a) for a in ATHLETE_ATTRS if hasattr(self, a)})
+        for evicted_id, evicted in self.roster.park(self.athlete_id, parked):
+            # Atlet yang keluar dari LRU: snapshot penuh supaya load berikutnya cepat
+            self._retiring[evicted_id] = self.workers.submit(
+                self._retire_log, evicted.run_log, self.snapshot_state(evicted))
+
+        for a in ("pace", "speed", "kal"):
+            self.__dict__.pop(a, None)
+        self.athlete_id = self.roster.active = athlete_id
+        if st is not None:
+            self.__dict__.update(vars(st))
+        else:
+            retiring = self._retiring.pop(athlete_id, None)
+            if retiring is not None:
+                # Shard masih ditulis ulang (snapshot + log) oleh _retire_log: tunggu selesai
+                # (error-nya sudah dilaporkan lewat TaskRunner, jangan dilempar dua kali)
+                retiring.exception()
+            self.run_log = self._open_log(athlete_id)
+            self.runs, self.day_totals, self.rollups = self.run_log.new_runs(), DayTotals(), Rollups()
+            self.best_efforts, self.segments, self.records = BestEfforts(), None, RecordIndex()
+            self.undo_stack = []
+            self.setup_schedule_data()
+            self.load_data()
+            self.roster.sync_summary(athlete_id, self.rollups)
+
+        profile = self.roster.profile(athlete_id)
+        self.target_mingguan = profile["target_mingguan"] or self.target_mingguan
+        self.jadwal_vars["target_mingguan"].set(str(self.target_mingguan))
+        berat = "" if profile["berat"] is None else str(profile["berat"])
+        self.jadwal_vars["berat"].set(berat)
+        self.input_vars["berat"].set(berat)
+        self._save_roster()
+        self._refresh_athlete_views()
+
+    def _open_log(self, athlete_id):
+        if self.db is not None:
+            from sqlite_store import SqliteRunLog
+            return SqliteRunLog(self.db, athlete_id)
+        return RunLog(self.roster.shard_dir(athlete_id))
+
+    @staticmethod
+    def _retire_log(run_log, state):
+        """Dijalankan di thread io setelah semua tulisan atlet itu selesai"""
+        run_log.compact(state, background=False)
+        run_log.close()
+
+    def _refresh_athlete_views(self):
+        """Kosongkan tampilan milik atlet sebelumnya lalu gambar ulang semua tab"""
+        self.update_day_info_jadwal()
+        if not hasattr(self, "pace"):
+            for name, keys in (("Hasil", ("Pace", "Kecepatan", "Kalori Terbakar")), ("Gizi", ("kal", "pace"))):
+                view = self._views.get(name)
+                for key in keys if view else ():
+                    self._set(view[key], text="-")
+        if "History" in self._views:
+            self._views["History"]["count"] = None
+            self._views["History"]["first"] = 0
+        if self._detail_view is not None and self._detail_view["win"].winfo_exists():
+            self._detail_view["win"].withdraw()
+        self._chart_series = None
+        if "Grafik" in self._views:
+            self._views["Grafik"]["range"] = None
+        self.show_all()
+
+    def _save_roster(self):
+        # Serialisasi di sini, tulis file di thread io (permintaan lama yang belum jalan dibatalkan)
+        self.workers.submit(self.roster.write, self.roster.dumps(), key="roster")
+
+    def _refresh_athlete_combo(self):
+        self._athlete_ids = [i for i, _ in self.roster.names()]
+        self.athlete_combo.config(values=[n for _, n in self.roster.names()])
+        self.athlete_combo.current(self._athlete_ids.index(self.athlete_id))
+
+    def add_athlete(self):
+        if self._import_busy():
+            return
+        from tkinter import simpledialog
+        nama = simpledialog.askstring("Atlet Baru", "Nama atlet:", parent=self)
+        if not nama or not nama.strip():
+            return
+        athlete_id = self.roster.add(nama.strip(), target_mingguan=self.target_mingguan)
+        self.switch_athlete(athlete_id)
+        self._refresh_athlete_combo()
+
+    def show_leaderboard(self):
+        """Peringkat jarak minggu ini dan total, dari ringkasan di roster (tanpa memuat shard)"""
+        view = self._leaderboard_view
+        if view is None or not view["win"].winfo_exists():
+            win = tk.Toplevel(self)
+            win.title("Leaderboard")
+            win.geometry("520x420")
+            self._themed(win, bg="bg")
+            win.protocol("WM_DELETE_WINDOW", win.withdraw)
+            body = self._themed(tk.Frame(win, padx=20, pady=20), bg="frame")
+            body.pack(expand=True, fill="both", padx=15, pady=15)
+            view = self._leaderboard_view = {"win": win, "body": body, "cells": []}
+
+        for cell in view["cells"]:
+            cell.destroy()
+        view["cells"] = []
+        minggu = Rollups.week_key(date.today().isoformat())
+        for col, (judul, rows) in enumerate(((f"🏆 Minggu {minggu}", self.roster.leaderboard(minggu)),
+                                              ("🏅 Total", self.roster.leaderboard()))):
+            head = self._themed(tk.Label(view["body"], text=judul, fg="#ffd166",
+                                         font=("Arial", 11, "bold")), bg="frame")
+            head.grid(row=0, column=col, sticky="w", padx=10, pady=(0, 10))
+            view["cells"].append(head)
+            for r, (nama, km) in enumerate(rows, 1):
+                cell = self._themed(tk.Label(view["body"], text=f"{r}. {nama} — {km:.1f} km",
+                                             font=("Arial", 10)), bg="frame", fg="fg")
+                cell.grid(row=r, column=col, sticky="w", padx=10, pady=2)
+                view["cells"].append(cell)
+
+        view["win"].deiconify()
+        view["win"].lift()
 
     def make_gui(self):
         self.title_lbl = tk.Label(self, text="RUN ANALYZER PRO", font=("Arial",18,"bold"))
-        self.title_lbl.pack(pady=20)
+        self.title_lbl.pack(pady=(20, 10))
+
+        # Pilihan atlet
+        athlete_bar = self._themed(tk.Frame(self), bg="bg")
+        athlete_bar.pack(fill="x", padx=20)
+        self._themed(tk.Label(athlete_bar, text="Atlet:", font=("Arial", 11)), bg="bg", fg="fg").pack(side="left", padx=(0, 10))
+        self.athlete_combo = ttk.Combobox(athlete_bar, state="readonly", width=24, font=("Arial", 11))
+        self.athlete_combo.pack(side="left")
+        self.athlete_combo.bind("<<ComboboxSelected>>",
+                                lambda e: self.switch_athlete(self._athlete_ids[self.athlete_combo.current()]))
+        tk.Button(athlete_bar, text="+ Atlet", command=self.add_athlete,
+                  bg="#4ecdc4", fg="white", font=("Arial", 9, "bold"),
+                  padx=10, cursor="hand2").pack(side="left", padx=(10, 0))
+        tk.Button(athlete_bar, text="🏆 Leaderboard", command=self.show_leaderboard,
+                  bg="#ffd166", fg="black", font=("Arial", 9, "bold"),
+                  padx=10, cursor="hand2").pack(side="left", padx=(10, 0))
+        self._refresh_athlete_combo()
 
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(expand=True, fill="both", padx=20, pady=10)
         
+        # Isi tab dibangun saat tab pertama kali dibuka
         self.tabs = {}
-        for name in ["Input","Hasil","Gizi","Jadwal","History"]:
+        self._tab_builders = {
+            "Input": self.make_input_tab,
+            "Hasil": self.make_hasil_tab,
+            "Gizi": self.make_gizi_tab,
+            "Jadwal": self.make_jadwal_tab,
+            "History": self.make_history_tab,
+            "Grafik": self.make_grafik_tab
+        }
+        self._built = set()
+        for name in self._tab_builders:
             self.tabs[name] = ttk.Frame(self.notebook)
             self.notebook.add(self.tabs[name], text=name)
-
-        self.make_input_tab()
-        self.make_hasil_tab()
-        self.make_gizi_tab()
-        self.make_jadwal_tab()
-        self.make_history_tab()
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._build_tab("Input")
         
         tk.Button(self, text="Toggle Theme", command=self.toggle_theme).pack(pady=5)
+        self.bind("<F12>", lambda e: self.toggle_perf_overlay())
+        self.bind("<Control-z>", lambda e: self.undo_run())
+
+    # ===== INSTRUMENTASI =====
+    def enable_tracing(self):
+        if self.tracer is None:
+            from instrument import Tracer
+            self.tracer = Tracer(self, TRACED_METHODS)
+        self.tracer.enable()
+
+    def toggle_perf_overlay(self):
+        """Tampilkan/sembunyikan overlay performa; membuka pertama kali mengaktifkan tracing"""
+        view = self._perf_view
+        if view is not None and view["win"].winfo_exists() and view["win"].winfo_viewable():
+            view["win"].withdraw()
+            return
+        if view is None or not view["win"].winfo_exists():
+            self.enable_tracing()
+            view = self._perf_view = self._build_perf_view()
+        view["win"].deiconify()
+        view["win"].lift()
+        self._update_perf_overlay()
+
+    def _build_perf_view(self):
+        win = tk.Toplevel(self)
+        win.title("Performa")
+        win.geometry("640x360")
+        win.attributes("-topmost", True)
+        self._themed(win, bg="bg")
+        win.protocol("WM_DELETE_WINDOW", win.withdraw)
+
+        text = self._themed(tk.Label(win, font=("Courier", 9), justify="left", anchor="nw"), bg="frame", fg="fg")
+        text.pack(expand=True, fill="both", padx=10, pady=(10, 5))
+
+        bar = self._themed(tk.Frame(win), bg="bg")
+        bar.pack(fill="x", padx=10, pady=(0, 10))
+        aktif = tk.BooleanVar(value=True)
+        tk.Checkbutton(bar, text="Rekam", variable=aktif,
+                       command=lambda: self.tracer.enable() if aktif.get() else self.tracer.disable()
+                       ).pack(side="left")
+        tk.Button(bar, text="Reset", command=self.tracer.reset).pack(side="left", padx=(10, 0))
+        tk.Button(bar, text="Export Trace", command=self.export_trace).pack(side="left", padx=(10, 0))
+        return {"win": win, "text": text}
+
+    def _update_perf_overlay(self):
+        """Perbarui isi overlay dua kali per detik selama terlihat"""
+        view = self._perf_view
+        if view is None or not view["win"].winfo_exists() or not view["win"].winfo_viewable():
+            return
+        self._set(view["text"], text=self.tracer.summary())
+        if view.get("job"):
+            self.after_cancel(view["job"])
+        view["job"] = self.after(500, self._update_perf_overlay)
+
+    def export_trace(self):
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(title="Simpan Chrome trace", defaultextension=".json",
+                                            filetypes=[("Chrome trace", "*.json")])
+        if path:
+            self.tracer.export(path)
+
+    def _build_tab(self, name):
+        if name not in self._built:
+            self._built.add(name)
+            self._tab_builders[name]()
+
+    def _on_tab_changed(self, event=None):
+        name = self.notebook.tab(self.notebook.select(), "text")
+        self._build_tab(name)
+        if name in self._dirty:
+            self.mark_dirty()
 
     def apply_theme(self):
+        """Warnai ulang semua widget terdaftar dalam satu pass (tanpa bangun ulang tab)"""
         t = THEME[self.mode]
         self.configure(bg=t["bg"])
         self.title_lbl.configure(bg=t["bg"], fg=t["fg"])
         
-        # Update tabs yang perlu diupdate
-        for widget in self.tabs["Jadwal"].winfo_children():
-            widget.destroy()
-        for widget in self.tabs["History"].winfo_children():
-            widget.destroy()
-            
-        self.make_jadwal_tab()
-        self.make_history_tab()
-        
-        # Update display jika ada data
-        if hasattr(self, "pace"): 
-            self.show_all()
+        for key, (config, roles) in list(self._styled.items()):
+            try:
+                # itemconfig pada item yang sudah dihapus tidak error: cek lewat type() (kosong)
+                if isinstance(key, tuple) and not key[0].type(key[1]):
+                    del self._styled[key]
+                    continue
+                config(**{opt: t[role] for opt, role in roles.items()})
+            except tk.TclError:
+                # Canvas/widget sudah dihancurkan, buang dari daftar
+                del self._styled[key]
+
+    def _style(self, key, config, roles):
+        if key in self._styled:
+            roles = {**self._styled[key][1], **roles}
+        config(**{opt: THEME[self.mode][role] for opt, role in roles.items()})
+        self._styled[key] = (config, roles)
+
+    def _themed(self, widget, **roles):
+        """Daftarkan peran warna widget (mis. bg="card", fg="fg") lalu terapkan"""
+        self._style(widget, widget.config, roles)
+
+        def _forget(event):
+            # <Destroy> Toplevel juga terpicu untuk tiap widget anaknya
+            if event.widget is widget:
+                self._styled.pop(widget, None)
+        widget.bind("<Destroy>", _forget, add="+")
+        return widget
+
+    def _themed_item(self, canvas, item, **roles):
+        """Seperti _themed untuk item Canvas (mis. fill="card"); kembalikan id item"""
+        self._style((canvas, item), lambda **opts: canvas.itemconfig(item, **opts), roles)
+        return item
+
+    @staticmethod
+    def _bind_wheel_scroll(canvas):
+        """Roda mouse menggulir ``canvas`` hanya selama pointer di atasnya (termasuk widget anak)"""
+        path = str(canvas)
+
+        def _scroll(event):
+            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+        def _leave(event):
+            # Pindah ke widget anak juga memicu <Leave>; lepas hanya jika benar-benar keluar
+            inside = canvas.winfo_containing(event.x_root, event.y_root)
+            if inside is None or not (str(inside) + ".").startswith(path + "."):
+                canvas.unbind_all("<MouseWheel>")
+
+        canvas.bind("<Enter>", lambda e: canvas.bind_all("<MouseWheel>", _scroll))
+        canvas.bind("<Leave>", _leave)
 
     def toggle_theme(self):
         self.mode = "light" if self.mode=="dark" else "dark"
         self.apply_theme()
+        self.mark_dirty("Grafik")
 
     def make_input_tab(self):
-        t = THEME[self.mode]
-        f = tk.Frame(self.tabs["Input"], bg=t["frame"], padx=25, pady=25)
+        f = self._themed(tk.Frame(self.tabs["Input"], padx=25, pady=25), bg="frame")
         f.pack(expand=True, fill="both")
-
-        # Variabel untuk tab Input
-        self.input_vars = {x: tk.StringVar() for x in ["jarak","waktu","berat","target_jarak"]}
         
         labels = ["Jarak (km)", "Waktu (menit)", "Berat (kg)", "Target Jarak Harian (km)"]
         keys = ["jarak", "waktu", "berat", "target_jarak"]
         
         for label, key in zip(labels, keys):
-            tk.Label(f, text=label, bg=t["frame"], fg=t["fg"]).pack(anchor="w", pady=(5,0))
-            tk.Entry(f, textvariable=self.input_vars[key], font=("Arial",12),
-                     bg=t["card"], fg=t["fg"]).pack(fill="x", pady=3)
+            self._themed(tk.Label(f, text=label), bg="frame", fg="fg").pack(anchor="w", pady=(5,0))
+            self._themed(tk.Entry(f, textvariable=self.input_vars[key], font=("Arial",12)), bg="card", fg="fg").pack(fill="x", pady=3)
 
         tk.Button(f, text="Analisis", command=self.analyze_from_input,
                   bg="#ff6b6b", fg="white", font=("Arial",11,"bold"),
                   pady=8).pack(fill="x", pady=20)
 
+        # Impor massal file aktivitas (GPX/TCX/FIT/CSV)
+        import_frame = self._themed(tk.Frame(f), bg="frame")
+        import_frame.pack(fill="x")
+        tk.Button(import_frame, text="📂 Impor File Aktivitas", command=self.import_activities,
+                  bg="#4ecdc4", fg="white", font=("Arial",10,"bold"),
+                  pady=6).pack(side="left", expand=True, fill="x", padx=(0, 5))
+        tk.Button(import_frame, text="📁 Impor Folder", command=lambda: self.import_activities(folder=True),
+                  bg="#4ecdc4", fg="white", font=("Arial",10,"bold"),
+                  pady=6).pack(side="left", expand=True, fill="x", padx=(5, 0))
+
+        # Mode live: sampel dari socket (host:port), named pipe atau file replay
+        live_frame = self._themed(tk.Frame(f), bg="frame")
+        live_frame.pack(fill="x", pady=(15, 0))
+        ttk.Combobox(live_frame, textvariable=self.live_vars["sumber"], values=["socket", "pipe", "replay"],
+                     state="readonly", width=8, font=("Arial", 10)).pack(side="left")
+        self._themed(tk.Entry(live_frame, textvariable=self.live_vars["target"], font=("Arial", 11)),
+                     bg="card", fg="fg").pack(side="left", expand=True, fill="x", padx=5)
+        self.live_btn = tk.Button(live_frame, text="📡 Mulai Live", command=self.toggle_live_run,
+                                  bg="#ffd166", fg="black", font=("Arial",10,"bold"), pady=4)
+        self.live_btn.pack(side="left")
+
     def make_hasil_tab(self):
         """Buat tab Hasil - TIDAK DIUBAH (seperti kode asli)"""
         # Tab Hasil dibuat kosong, akan diisi saat analisis
@@ -185,26 +545,24 @@ class RunningApp(tk.Tk):
 
     def make_jadwal_tab(self):
         """Buat tab Jadwal dengan form input dan tampilan jadwal"""
-        t = THEME[self.mode]
         tab = self.tabs["Jadwal"]
         
         # Frame utama dengan 2 bagian
-        main_frame = tk.Frame(tab, bg=t["bg"])
+        main_frame = self._themed(tk.Frame(tab), bg="bg")
         main_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         # ===== BAGIAN 1: INPUT FORM =====
-        input_frame = tk.LabelFrame(main_frame, text=" INPUT DATA LARI", 
-                                   bg=t["frame"], fg="#ffd166", 
+        input_frame = self._themed(tk.LabelFrame(main_frame, text=" INPUT DATA LARI", 
+                                   fg="#ffd166", 
                                    font=("Arial", 12, "bold"),
-                                   padx=15, pady=15)
+                                   padx=15, pady=15), bg="frame")
         input_frame.pack(fill="x", pady=(0, 15))
         
         # Pilihan Hari
-        hari_frame = tk.Frame(input_frame, bg=t["frame"])
+        hari_frame = self._themed(tk.Frame(input_frame), bg="frame")
         hari_frame.pack(fill="x", pady=(0, 10))
         
-        tk.Label(hari_frame, text="Pilih Hari:", bg=t["frame"], fg=t["fg"],
-                 font=("Arial", 11)).pack(side="left", padx=(0, 10))
+        self._themed(tk.Label(hari_frame, text="Pilih Hari:", font=("Arial", 11)), bg="frame", fg="fg").pack(side="left", padx=(0, 10))
         
         hari_list = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
         hari_combo = ttk.Combobox(hari_frame, textvariable=self.jadwal_vars["hari"], 
@@ -214,8 +572,8 @@ class RunningApp(tk.Tk):
         hari_combo.set(hari_list[date.today().weekday()])
         
         # Info target hari yang dipilih
-        self.day_info_label = tk.Label(hari_frame, text="", bg=t["frame"], fg="#4ecdc4",
-                                       font=("Arial", 10))
+        self.day_info_label = self._themed(tk.Label(hari_frame, text="", fg="#4ecdc4",
+                                       font=("Arial", 10)), bg="frame")
         self.day_info_label.pack(side="left", padx=(15, 0))
         
         # Bind event untuk update info
@@ -225,45 +583,41 @@ class RunningApp(tk.Tk):
         self.update_day_info_jadwal()
         
         # Input Jarak
-        jarak_frame = tk.Frame(input_frame, bg=t["frame"])
+        jarak_frame = self._themed(tk.Frame(input_frame), bg="frame")
         jarak_frame.pack(fill="x", pady=(0, 10))
         
-        tk.Label(jarak_frame, text="Jarak (km):", bg=t["frame"], fg=t["fg"],
-                 font=("Arial", 11), width=12).pack(side="left")
+        self._themed(tk.Label(jarak_frame, text="Jarak (km):", font=("Arial", 11), width=12), bg="frame", fg="fg").pack(side="left")
         
-        tk.Entry(jarak_frame, textvariable=self.jadwal_vars["jarak"],
-                font=("Arial", 12), bg=t["card"], fg=t["fg"], width=15).pack(side="left", padx=(10, 0))
+        self._themed(tk.Entry(jarak_frame, textvariable=self.jadwal_vars["jarak"],
+                font=("Arial", 12), width=15), bg="card", fg="fg").pack(side="left", padx=(10, 0))
         
         # Input Waktu
-        waktu_frame = tk.Frame(input_frame, bg=t["frame"])
+        waktu_frame = self._themed(tk.Frame(input_frame), bg="frame")
         waktu_frame.pack(fill="x", pady=(0, 10))
         
-        tk.Label(waktu_frame, text="Waktu (menit):", bg=t["frame"], fg=t["fg"],
-                 font=("Arial", 11), width=12).pack(side="left")
+        self._themed(tk.Label(waktu_frame, text="Waktu (menit):", font=("Arial", 11), width=12), bg="frame", fg="fg").pack(side="left")
         
-        tk.Entry(waktu_frame, textvariable=self.jadwal_vars["waktu"],
-                font=("Arial", 12), bg=t["card"], fg=t["fg"], width=15).pack(side="left", padx=(10, 0))
+        self._themed(tk.Entry(waktu_frame, textvariable=self.jadwal_vars["waktu"],
+                font=("Arial", 12), width=15), bg="card", fg="fg").pack(side="left", padx=(10, 0))
         
         # Input Berat
-        berat_frame = tk.Frame(input_frame, bg=t["frame"])
+        berat_frame = self._themed(tk.Frame(input_frame), bg="frame")
         berat_frame.pack(fill="x", pady=(0, 10))
         
-        tk.Label(berat_frame, text="Berat (kg):", bg=t["frame"], fg=t["fg"],
-                 font=("Arial", 11), width=12).pack(side="left")
+        self._themed(tk.Label(berat_frame, text="Berat (kg):", font=("Arial", 11), width=12), bg="frame", fg="fg").pack(side="left")
         
-        tk.Entry(berat_frame, textvariable=self.jadwal_vars["berat"],
-                font=("Arial", 12), bg=t["card"], fg=t["fg"], width=15).pack(side="left", padx=(10, 0))
+        self._themed(tk.Entry(berat_frame, textvariable=self.jadwal_vars["berat"],
+                font=("Arial", 12), width=15), bg="card", fg="fg").pack(side="left", padx=(10, 0))
         
         # Target Mingguan - BISA DIUBAH
-        target_frame = tk.Frame(input_frame, bg=t["frame"])
+        target_frame = self._themed(tk.Frame(input_frame), bg="frame")
         target_frame.pack(fill="x", pady=(0, 15))
         
-        tk.Label(target_frame, text="Target Mingguan (km):", bg=t["frame"], fg=t["fg"],
-                 font=("Arial", 11), width=18).pack(side="left")
+        self._themed(tk.Label(target_frame, text="Target Mingguan (km):", font=("Arial", 11), width=18), bg="frame", fg="fg").pack(side="left")
         
         # Entry untuk target mingguan yang bisa diubah
-        self.target_entry = tk.Entry(target_frame, textvariable=self.jadwal_vars["target_mingguan"],
-                font=("Arial", 12), bg=t["card"], fg=t["fg"], width=15)
+        self.target_entry = self._themed(tk.Entry(target_frame, textvariable=self.jadwal_vars["target_mingguan"],
+                font=("Arial", 12), width=15), bg="card", fg="fg")
         self.target_entry.pack(side="left", padx=(10, 0))
         
         # Button untuk update target mingguan saja (tanpa harus input data lari)
@@ -273,8 +627,17 @@ class RunningApp(tk.Tk):
                                      padx=10, cursor="hand2")
         update_target_btn.pack(side="left", padx=(10, 0))
         
+        # Program latihan multi-minggu (periodisasi); mulai minggu ini
+        program_frame = self._themed(tk.Frame(input_frame), bg="frame")
+        program_frame.pack(fill="x", pady=(0, 15))
+        self._themed(tk.Label(program_frame, text="Program:", font=("Arial", 11), width=18), bg="frame", fg="fg").pack(side="left")
+        program_combo = ttk.Combobox(program_frame, textvariable=self.jadwal_vars["program"],
+                                     values=list(PLANS), state="readonly", width=24, font=("Arial", 11))
+        program_combo.pack(side="left", padx=(10, 0))
+        program_combo.bind("<<ComboboxSelected>>", lambda e: self.set_plan(self.jadwal_vars["program"].get()))
+        
         # Button Analisis
-        btn_frame = tk.Frame(input_frame, bg=t["frame"])
+        btn_frame = self._themed(tk.Frame(input_frame), bg="frame")
         btn_frame.pack(fill="x")
         
         tk.Button(btn_frame, text="📊 SIMPAN DATA LARI", command=self.analyze_from_jadwal,
@@ -282,49 +645,42 @@ class RunningApp(tk.Tk):
                   pady=8, cursor="hand2").pack(fill="x")
         
         # ===== BAGIAN 2: JADWAL MINGGUAN =====
-        jadwal_frame = tk.LabelFrame(main_frame, text=" JADWAL LATIHAN MINGGUAN", 
-                                    bg=t["frame"], fg="#ffd166", 
+        jadwal_frame = self._themed(tk.LabelFrame(main_frame, text=" JADWAL LATIHAN MINGGUAN", 
+                                    fg="#ffd166", 
                                     font=("Arial", 12, "bold"),
-                                    padx=15, pady=15)
+                                    padx=15, pady=15), bg="frame")
         jadwal_frame.pack(fill="both", expand=True)
         
-        # Canvas untuk scroll
-        canvas = tk.Canvas(jadwal_frame, bg=t["frame"], highlightthickness=0)
+        # Papan jadwal digambar sebagai item Canvas (lihat _build_jadwal_view)
+        canvas = self._themed(tk.Canvas(jadwal_frame, highlightthickness=0), bg="frame")
         scrollbar = ttk.Scrollbar(jadwal_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=t["frame"])
-        
-        scrollable_frame.bind(
-            "<Configure>",
-            lambda e: canvas.configure(scrollregion=canvas.bbox("all"))
-        )
-        
-        canvas.create_window((0, 0), window=scrollable_frame, anchor="nw", width=750)
         canvas.configure(yscrollcommand=scrollbar.set)
         
         canvas.pack(side="left", fill="both", expand=True)
         scrollbar.pack(side="right", fill="y")
+        self.jadwal_canvas = canvas
         
-        # Container untuk konten jadwal
-        self.jadwal_container = tk.Frame(scrollable_frame, bg=t["frame"], padx=10, pady=10)
-        self.jadwal_container.pack(fill="both", expand=True)
-        
-        # Bind mouse wheel untuk scroll
-        def _on_mousewheel_jadwal(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", _on_mousewheel_jadwal)
+        self._bind_wheel_scroll(canvas)
 
     def make_history_tab(self):
         """Buat tab History - TIDAK DIUBAH (seperti kode asli)"""
         # Tab History dibuat kosong, akan diisi saat analisis
         pass
 
+    def make_grafik_tab(self):
+        """Tab Grafik dibangun saat pertama kali dibuka"""
+        self.show_grafik()
+
     def update_day_info_jadwal(self, event=None):
         """Update informasi target untuk hari yang dipilih di tab Jadwal"""
+        if not hasattr(self, "day_info_label"):
+            return
         hari = self.jadwal_vars["hari"].get()
         if hari and hari in self.schedule_data:
-            schedule = self.schedule_data[hari]
+            # Jadwal pada tanggal hari itu (minggu ini, atau minggu lalu jika belum lewat)
+            schedule = self.schedule.jadwal(tanggal_hari(hari).isoformat())
             if schedule["latihan"] != "Rest Day":
-                info = f"🎯 Target: {schedule['target_jarak']} km | ⏱️ Waktu: {schedule['durasi']} menit"
+                info = f"📅 {schedule['tanggal']} | 🎯 Target: {schedule['target_jarak']} km | ⏱️ Waktu: {schedule['durasi']} menit"
                 self.day_info_label.config(text=info, fg="#4ecdc4")
             else:
                 self.day_info_label.config(text="😴 Hari Istirahat", fg="#888")
@@ -344,14 +700,38 @@ class RunningApp(tk.Tk):
         
         # Update target mingguan
         self.target_mingguan = target_mingguan
+        self.roster.profile(self.athlete_id)["target_mingguan"] = target_mingguan
+        self._save_roster()
         
         # Update tampilan jadwal
-        self.update_jadwal_display()
+        self.mark_dirty("Jadwal")
         
         messagebox.showinfo("Berhasil", f"Target mingguan berhasil diubah menjadi {target_mingguan:.1f} km!")
 
+    def set_plan(self, nama):
+        """Pasang program latihan mulai minggu ISO berjalan; minggu lalu tidak berubah"""
+        spec = PLANS.get(nama)
+        profile = self.roster.profile(self.athlete_id)
+        plan = dict(spec, nama=nama, mulai=week_key(date.today().isoformat())) if spec else None
+        self.schedule.set_plan(plan)
+        profile["plans"] = self.schedule.history()
+        profile.pop("plan", None)
+        self._save_roster()
+        
+        # Pencapaian minggu ini dihitung ulang dengan target baru (maks. 7 hari)
+        senin = date.today() - timedelta(days=date.today().weekday())
+        for i in range(7):
+            tanggal = (senin + timedelta(days=i)).isoformat()
+            if self.day_totals.day(tanggal)[2]:
+                self.update_schedule_achievement(tanggal)
+        self._jadwal_days.update(HARI_LIST)
+        self.update_day_info_jadwal()
+        self.mark_dirty("Jadwal")
+
     def analyze_from_input(self):
         """Analisis dari tab Input"""
+        if self._import_busy():
+            return
         try:
             j = float(self.input_vars["jarak"].get())
             w = float(self.input_vars["waktu"].get())
@@ -384,6 +764,8 @@ class RunningApp(tk.Tk):
 
     def analyze_from_jadwal(self):
         """Analisis dari tab Jadwal"""
+        if self._import_busy():
+            return
         try:
             # Cek apakah ada input jarak, waktu, dan berat
             jarak_text = self.jadwal_vars["jarak"].get().strip()
@@ -430,266 +812,807 @@ class RunningApp(tk.Tk):
         
         messagebox.showinfo("Berhasil", f"Data untuk {hari_nama} berhasil disimpan!")
 
-    def _process_analysis(self, jarak, waktu, berat, hari_nama):
-        """Proses analisis data lari"""
-        # Hitung metrics
-        self.pace = waktu / jarak
-        self.speed = (jarak / waktu) * 60
-        self.kal = jarak * berat * 0.653
-        
-        # Buat key unik berdasarkan hari
-        today_str = date.today().strftime("%Y-%m-%d")
-        key = f"{today_str}-{hari_nama}"
-        
-        # Simpan data harian
-        if key not in self.daily_distances:
-            self.daily_distances[key] = 0
-            self.daily_times[key] = 0
-        
-        self.daily_distances[key] += jarak
-        self.daily_times[key] += waktu
-        
-        # Update pencapaian jadwal
-        self.update_schedule_achievement(hari_nama, key)
-        
-        # Simpan ke history
-        if today_str not in self.history:
-            self.history[today_str] = []
-        
-        self.history[today_str].append({
-            "time": datetime.now().strftime("%H:%M"),
+    def _read_berat(self, untuk):
+        """Berat dari tab Input/Jadwal; None (dengan pesan error) jika belum diisi"""
+        berat_text = self.input_vars["berat"].get().strip() or self.jadwal_vars["berat"].get().strip()
+        try:
+            berat = float(berat_text)
+            if berat <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", f"Isi Berat (kg) dulu untuk menghitung kalori {untuk}.")
+            return None
+        return berat
+
+    def import_activities(self, folder=False):
+        """Impor massal file aktivitas tanpa popup dan redraw per run"""
+        berat = self._read_berat("hasil impor")
+        if berat is None:
+            return
+
+        import importer
+        from tkinter import filedialog
+        if folder:
+            path = filedialog.askdirectory(title="Pilih folder aktivitas")
+            paths = list(importer.find_files(path)) if path else []
+        else:
+            paths = filedialog.askopenfilenames(
+                title="Pilih file aktivitas",
+                filetypes=[("File aktivitas", "*.gpx *.tcx *.fit *.csv"), ("Semua file", "*.*")])
+        if not paths:
+            return
+
+        self.import_paths(paths, berat, on_done=self._import_finished)
+
+    def _import_busy(self):
+        """True (dengan pesan) jika impor massal masih berjalan"""
+        if self._importing:
+            messagebox.showinfo("Impor Berjalan", "Tunggu sampai impor selesai.")
+        return self._importing
+
+    def _import_finished(self, hasil):
+        jumlah, gagal = hasil
+        pesan = f"{jumlah} aktivitas berhasil diimpor."
+        if gagal:
+            pesan += f"\n{len(gagal)} file gagal dibaca, misalnya {gagal[0]}"
+        messagebox.showinfo("Impor Selesai", pesan)
+
+    def import_paths(self, paths, berat, on_done=None):
+        """Parse file di latar belakang, lalu masukkan hasilnya bertahap di thread Tk.
+
+        Selama impor, pindah atlet dan simpan manual ditolak: run hasil impor
+        masuk ke store atlet yang aktif saat impor dimulai.
+        """
+        if self._import_busy():
+            return
+        if self._live is not None:
+            return messagebox.showinfo("Run Live", "Selesaikan run live dulu sebelum impor.")
+        self._importing = True
+        # ProcessPool dibuat di thread Tk, bukan dari dalam thread bg
+        executor = self.workers.cpu
+        batches, stop = queue.Queue(maxsize=IMPORT_QUEUE), threading.Event()
+
+        def put(item):
+            # Antrean penuh = thread Tk belum selesai memasukkan batch sebelumnya
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def parse():
+            import importer
+            batch, n = [], 0
+            try:
+                for result in importer.iter_activities(paths, executor=executor):
+                    batch.append(result)
+                    n += len(result[1] or ())
+                    if n >= IMPORT_BATCH:
+                        if not put(batch):
+                            return
+                        batch, n = [], 0
+                if batch:
+                    put(batch)
+            finally:
+                put(None)
+
+        def failed(error):
+            self.report_callback_exception(type(error), error, error.__traceback__)
+
+        self.workers.submit(parse, pool="bg", key="import", on_error=failed)
+        self.workers.run_steps(self._import_steps(batches, stop, berat), on_done, delay_ms=IMPORT_POLL_MS)
+
+    @staticmethod
+    def _parsed(batches):
+        """Hasil parse per file dari antrean; None = belum ada yang siap"""
+        while True:
+            try:
+                batch = batches.get_nowait()
+            except queue.Empty:
+                yield None
+                continue
+            if batch is None:
+                return
+            yield from batch
+
+    def _import_steps(self, batches, stop, berat):
+        """Generator: satu batch run per tick Tk, satu transaksi log per batch.
+
+        ``batches`` diisi thread parse (None = selesai); ``stop`` memberi tahu
+        thread itu jika impor berhenti lebih awal.
+        """
+        batch, jumlah, gagal = [], 0, []
+        runs, records = self.runs, self.records
+        try:
+            with runs.bulk(), records.bulk():
+                for item in self._parsed(batches):
+                    if item is None:
+                        yield
+                        continue
+                    path, acts, error = item
+                    if error:
+                        gagal.append(path)
+                        continue
+                    for act in acts:
+                        rec = {
+                            "tanggal": act["tanggal"],
+                            "ts": act["ts"],
+                            "jarak": act["jarak"],
+                            "waktu": act["waktu"],
+                            "berat": act.get("berat", berat),
+                            "hari": HARI_LIST[date.fromisoformat(act["tanggal"]).weekday()],
+                            "target_mingguan": self.target_mingguan
+                        }
+                        if act.get("segments"):
+                            rec["segments"] = act["segments"]
+                        self._apply_run(rec)
+                        batch.append(rec)
+                    if len(batch) >= IMPORT_BATCH:
+                        self._persist(batch)
+                        jumlah += len(batch)
+                        batch = []
+                        yield
+            if batch:
+                self._persist(batch)
+                jumlah += len(batch)
+        finally:
+            stop.set()
+            self._importing = False
+        # Kompaksi ditunda selama bulk (indeks belum diurutkan); cek sekali di sini
+        self._maybe_compact()
+
+        if jumlah:
+            self.show_all()
+        return jumlah, gagal
+
+    def _persist(self, records):
+        """Tulis run ke log di thread io; kompaksi diantrikan di belakangnya"""
+        self.workers.submit(self.run_log.append_many, records, on_done=self._persisted)
+        self._maybe_compact()
+
+        # Ringkasan leaderboard + profil atlet ikut diperbarui
+        for rec in records:
+            if rec.get("op") == "hapus":
+                self.roster.record_run(self.athlete_id, rec["tanggal"], -rec["jarak"], runs=-1)
+            else:
+                self.roster.record_run(self.athlete_id, rec["tanggal"], rec["jarak"])
+        if records[-1].get("op") != "hapus":
+            profile = self.roster.profile(self.athlete_id)
+            profile["berat"], profile["target_mingguan"] = records[-1]["berat"], records[-1]["target_mingguan"]
+        self._save_roster()
+
+    def _maybe_compact(self):
+        """Antrikan kompaksi jika log sudah besar; tidak selama impor (snapshot belum urut)"""
+        if self.db is not None:
+            self._save_state_changes()
+            return
+        if getattr(self.runs, "_bulk", False) or getattr(self.runs, "_needs_sort", False):
+            return
+        if self.run_log.needs_compaction():
+            # Sudah di thread io: tulis snapshot di sana, jangan buka thread baru
+            self.workers.submit(partial(self.run_log.compact, background=False), self.snapshot_state())
+
+    def _save_state_changes(self):
+        """SQLite: hanya minggu jadwal yang berubah + target + run terakhir, tanpa snapshot penuh"""
+        weeks = self.schedule.take_dirty()
+        if not weeks and self.target_mingguan == self.run_log.saved_target:
+            return
+        self.run_log.saved_target = self.target_mingguan
+        last = {"pace": self.pace, "speed": self.speed, "kal": self.kal,
+                "segments": self.segments} if hasattr(self, "pace") else None
+        self.workers.submit(self.run_log.save_changes, self.target_mingguan, weeks, last)
+
+    # ===== MODE LIVE =====
+    def toggle_live_run(self):
+        if self._live is None:
+            self.start_live_run(self.live_vars["sumber"].get(), self.live_vars["target"].get().strip())
+        else:
+            self.finish_live_run()
+
+    def start_live_run(self, sumber, target, replay_speed=1.0):
+        """Baca sampel di thread bg; tab Hasil diperbarui tiap LIVE_REFRESH_MS"""
+        if self._live is not None or not target or self._import_busy():
+            return
+        berat = self._read_berat("run live")
+        if berat is None:
+            return
+        from live import LiveRun, run_stream
+        live = self._live = {"run": LiveRun(berat), "queue": queue.SimpleQueue(),
+                             "stop": threading.Event(), "job": None}
+        self.workers.submit(run_stream, sumber, target, live["queue"], live["stop"], replay_speed,
+                            pool="bg", on_error=self._live_error)
+        self.live_btn.config(text="⏹ Selesai")
+        self.notebook.select(1)
+        live["job"] = self.after(LIVE_REFRESH_MS, self._live_tick)
+
+    def _live_tick(self):
+        """Habiskan antrian sampel (O(1) per sampel) lalu gambar Hasil sekali"""
+        live = self._live
+        if live is None:
+            return
+        run, ended = live["run"], False
+        while True:
+            try:
+                sample = live["queue"].get_nowait()
+            except queue.Empty:
+                break
+            if sample is None:
+                ended = True
+                break
+            run.add(**sample)
+
+        self._show_live(run)
+        if ended:
+            self.finish_live_run()
+        else:
+            live["job"] = self.after(LIVE_REFRESH_MS, self._live_tick)
+
+    def _show_live(self, run):
+        self._build_tab("Hasil")
+        view = self._views.get("Hasil")
+        if view is None:
+            view = self._views["Hasil"] = self._build_hasil_view()
+        rolling = run.rolling()
+        if rolling is not None:
+            pace, speed = rolling
+            self._set(view["Pace"], text=f"{pace:.2f} menit/km")
+            self._set(view["Kecepatan"], text=f"{speed:.1f} km/jam")
+        self._set(view["Kalori Terbakar"], text=f"{run.kal:.0f} kalori")
+        menit, detik = divmod(int(run.waktu * 60), 60)
+        self._set(view["live"], text=f"🔴 LIVE  {run.jarak:.2f} km | {menit}:{detik:02d}")
+        if not view["live"].winfo_manager():
+            view["live"].pack(before=view["first"], fill="x", pady=(0, 10))
+
+    def finish_live_run(self):
+        """Hentikan mode live dan simpan run lewat jalur yang sama dengan input manual"""
+        live, self._live = self._live, None
+        if live is None:
+            return
+        live["stop"].set()
+        if live["job"] is not None:
+            self.after_cancel(live["job"])
+        self.live_btn.config(text="📡 Mulai Live")
+        view = self._views.get("Hasil")
+        if view is not None:
+            view["live"].pack_forget()
+
+        run = live["run"]
+        if run.jarak > 0 and run.waktu > 0:
+            self._process_analysis(run.jarak, run.waktu, run.berat, HARI_LIST[date.today().weekday()],
+                                   segments=run.segments.summary())
+        else:
+            self.mark_dirty("Hasil")
+
+    def _live_error(self, error):
+        self.finish_live_run()
+        messagebox.showerror("Live Run", f"Sumber live gagal dibaca: {error}")
+
+    def _persisted(self, _):
+        # Backend sqlite: History membaca database, jadi digambar ulang setelah commit
+        if self.db is not None:
+            self._chart_series = None
+            self.mark_dirty("History", "Grafik")
+            self._refresh_date_detail()
+
+    def _process_analysis(self, jarak, waktu, berat, hari_nama, segments=None):
+        """Proses analisis data lari (``segments``: hasil SegmentEngine jika ada data sampel)
+
+        Run dicatat pada tanggal ``hari_nama`` minggu ini (hari yang belum
+        lewat berarti minggu lalu), jam = jam sekarang.
+        """
+        now = datetime.now()
+        tanggal = tanggal_hari(hari_nama, now.date())
+        rec = {
+            "tanggal": tanggal.isoformat(),
+            "ts": datetime.combine(tanggal, now.time()).timestamp(),
             "jarak": jarak,
             "waktu": waktu,
-            "pace": self.pace,
-            "speed": self.speed,
-            "kal": self.kal,
+            "berat": berat,
             "hari": hari_nama,
-            "total_jarak_harian": self.daily_distances[key],
-            "total_waktu_harian": self.daily_times[key]
-        })
-        
-        # Update semua tab
-        self.show_all()
+            "target_mingguan": self.target_mingguan
+        }
+        if segments:
+            rec["segments"] = segments
+        new_date = not self.runs.has_date(rec["tanggal"])
+        self._apply_run(rec)
+        self._persist([rec])
+        
+        # Update hanya tab yang tersentuh run baru
+        self.mark_dirty("Hasil", "Gizi", "Jadwal", "Grafik")
+        # Filter aktif: run baru bisa lolos filter di posisi mana pun, hasilnya dihitung ulang
+        history = self._views.get("History")
+        if new_date or (history is not None and history["kriteria"] is not None):
+            self.mark_dirty("History")
 
-    def update_schedule_achievement(self, hari_nama, key):
-        """Update pencapaian jadwal berdasarkan input"""
-        schedule = self.schedule_data.get(hari_nama, {})
-        
-        if schedule["latihan"] == "Rest Day":
-            return
-        
-        # Target dari jadwal
-        target_jarak = schedule["target_jarak"]
-        target_waktu = float(schedule["target_waktu"])
-        
-        # Akumulasi data
-        total_jarak = self.daily_distances.get(key, 0)
-        total_waktu = self.daily_times.get(key, 0)
-        
-        # Hitung persentase
-        persentase_jarak = (total_jarak / target_jarak) * 100 if target_jarak > 0 else 0
-        persentase_waktu = (total_waktu / target_waktu) * 100 if target_waktu > 0 else 0
-        
-        # Hitung kontribusi terhadap target mingguan
-        kontribusi_mingguan = (total_jarak / self.target_mingguan) * 100 if self.target_mingguan > 0 else 0
+    def _apply_run(self, rec, replace=False):
+        """Masukkan satu run ke data di memori (tanpa update tampilan).
+
+        ``replace``: baris run dengan (tanggal, ts) yang sama sudah ada dan
+        kontribusinya sudah dikurangi; nilainya ditimpa di tempat.
+        """
+        jarak, waktu, berat, hari_nama = rec["jarak"], rec["waktu"], rec["berat"], rec["hari"]
+        self.target_mingguan = rec["target_mingguan"]
+
+        # Hitung metrics
+        self.pace, self.speed, self.kal = hitung_metrik(jarak, waktu, berat)
+        rec["pace"], rec["speed"], rec["kal"] = self.pace, self.speed, self.kal
         
-        # Tentukan status
-        completed = total_jarak >= target_jarak
+        today_str = rec["tanggal"]
         
-        # Update pencapaian
-        self.schedule_achievements[hari_nama] = {
-            "completed": completed,
-            "actual_distance": total_jarak,
-            "actual_time": total_waktu,
-            "target_distance": target_jarak,
-            "target_time": target_waktu,
-            "persentase_jarak": persentase_jarak,
-            "persentase_waktu": persentase_waktu,
-            "kontribusi_mingguan": kontribusi_mingguan
-        }
+        # Simpan ke history
+        (self.runs.update if replace else self.runs.append)(
+            today_str, rec["ts"], jarak, waktu, berat, self.pace, self.speed, self.kal, hari_nama)
+        
+        # Best effort di-cache per run; rekor cukup dibandingkan dengan run ini
+        segments = rec.get("segments")
+        if segments:
+            self.best_efforts.add(rec["ts"], segments["best"])
+            pola = pola_interval(self.schedule.jadwal(today_str))
+            if pola and "cek_interval" not in segments:
+                segments["cek_interval"] = [*cek_interval(segments["intervals"], pola), *pola]
+        self.segments = segments
+        if self._chart_series is not None and (self.db is not None or not self._chart_series.add(
+                today_str, jarak, waktu, self.kal)):
+            self._chart_series = None
+        self.day_totals.add(today_str, jarak, waktu)
+        self.rollups.add(today_str, jarak, waktu)
+        self.records.add(rec["ts"], today_str, jarak, self.pace, self.rollups.week(today_str)[0])
+        self.update_schedule_achievement(today_str)
+
+    def _remove_run(self, tanggal, ts, keep_row=False):
+        """Kurangi kontribusi satu run dari semua data turunan (kebalikan ``_apply_run``).
+
+        Tiap struktur dikurangi nilai run itu saja, tidak ada yang dihitung
+        ulang dari awal. ``keep_row``: baris di ``runs`` dibiarkan untuk
+        ditimpa (edit). Kembalikan record run (format log) atau None.
+        """
+        rec = self._get_run(tanggal, ts)
+        if rec is None:
+            return None
+        jarak, waktu = rec["jarak"], rec["waktu"]
+        rec["target_mingguan"] = self.target_mingguan
+        if not keep_row:
+            self.runs.remove(tanggal, ts)
+        best = self.best_efforts.remove(ts)
+        if best and not rec.get("segments"):
+            # Backend log hanya menyimpan best effort; cukup untuk mengembalikan rekornya
+            rec["segments"] = {"splits": [], "best": best, "intervals": []}
+        if self._chart_series is not None and (self.db is not None or not self._chart_series.remove(
+                tanggal, jarak, waktu, rec["kal"])):
+            self._chart_series = None
+        self.day_totals.remove(tanggal, jarak, waktu)
+        self.rollups.remove(tanggal, jarak, waktu)
+        self.records.remove(ts, tanggal, jarak, rec["pace"], self.rollups.week(tanggal)[0])
+        self.update_schedule_achievement(tanggal)
+        return rec
+
+    def update_schedule_achievement(self, tanggal):
+        """Pencapaian jadwal tanggal itu dari total harian, masuk bucket minggunya"""
+        jarak, waktu, runs = self.day_totals.day(tanggal)
+        hari = HARI_LIST[date.fromisoformat(tanggal).weekday()]
+        if runs == 0:
+            if self.schedule.forget(tanggal) is not None:
+                self._jadwal_days.add(hari)
+        elif self.schedule.record(tanggal, jarak, waktu, self.target_mingguan) is not None:
+            self._jadwal_days.add(hari)
+
+    # ===== EDIT / HAPUS RUN =====
+    def edit_run(self, tanggal, ts):
+        """Ubah jarak/waktu satu run; ts (jam) tetap, segmen sampel dibuang"""
+        if self._import_busy():
+            return
+        from tkinter import simpledialog
+        rec = self._get_run(tanggal, ts)
+        if rec is None:
+            return
+        parent = self._detail_view["win"]
+        jarak = simpledialog.askfloat("Edit Run", "Jarak (km):", initialvalue=rec["jarak"],
+                                      minvalue=0.01, parent=parent)
+        if jarak is None:
+            return
+        waktu = simpledialog.askfloat("Edit Run", "Waktu (menit):", initialvalue=rec["waktu"],
+                                      minvalue=0.01, parent=parent)
+        if waktu is None:
+            return
+        new = {"tanggal": tanggal, "ts": ts, "jarak": jarak, "waktu": waktu, "berat": rec["berat"],
+               "hari": rec["hari"], "target_mingguan": self.target_mingguan}
+        self._push_undo(self._replace_run((tanggal, ts), new), (tanggal, ts))
+
+    def delete_run(self, tanggal, ts):
+        if self._import_busy():
+            return
+        rec = self._get_run(tanggal, ts)
+        if rec is None or not messagebox.askyesno(
+                "Hapus Run", f"Hapus run {tanggal} ({rec['jarak']} km, {rec['waktu']} menit)?",
+                parent=self._detail_view["win"]):
+            return
+        self._push_undo(self._replace_run((tanggal, ts), None), None)
+
+    def undo_run(self):
+        """Batalkan edit/hapus terakhir: run baru dikurangi, run lama dimasukkan lagi"""
+        if not self.undo_stack or self._import_busy():
+            return
+        old, new = self.undo_stack.pop()
+        self._replace_run(new, old)
+
+    def _get_run(self, tanggal, ts):
+        """Record run untuk edit/hapus/undo (format log) atau None.
+
+        SQLite: tulisan yang masih antri di thread io ditunggu dulu, supaya
+        nilai lama yang dikurangi dari data turunan bukan baris basi.
+        """
+        if self.db is not None:
+            self.workers.flush()
+        return self.runs.get(tanggal, ts)
+
+    def _push_undo(self, old, new):
+        if old is None:
+            return
+        self.undo_stack.append((old, new))
+        del self.undo_stack[:-UNDO_LIMIT]
+
+    def _replace_run(self, old, new):
+        """Hapus run ``old`` (tanggal, ts) lalu masukkan record ``new``; salah satunya boleh None.
+
+        Kembalikan record run yang dihapus (untuk undo).
+        """
+        records, removed = [], None
+        # Edit tanpa pindah tanggal/jam: baris run ditimpa, index tanggal tidak digeser
+        same = old is not None and new is not None and tuple(old) == (new["tanggal"], new["ts"])
+        if old is not None:
+            removed = self._remove_run(*old, keep_row=same)
+            if removed is None:
+                return None
+            records.append({"op": "hapus", "tanggal": removed["tanggal"], "ts": removed["ts"],
+                            "jarak": removed["jarak"]})
+        if new is not None:
+            self._apply_run(new, replace=same)
+            records.append(new)
+        if records:
+            self._persist(records)
+        self.mark_dirty("Hasil", "Gizi", "Jadwal", "History", "Grafik")
+        self._refresh_date_detail()
+        return removed
+
+    def _refresh_date_detail(self):
+        view = self._detail_view
+        if view is not None and view["win"].winfo_exists() and view["win"].state() != "withdrawn":
+            self.show_date_detail(view["tanggal"])
 
     def update_jadwal_display(self):
-        """Update tampilan jadwal mingguan"""
-        if not hasattr(self, 'jadwal_container'):
+        """Update tampilan jadwal mingguan: baris progress + kartu hari yang berubah saja"""
+        if not hasattr(self, 'jadwal_canvas'):
             return
-            
-        # Clear container
-        for widget in self.jadwal_container.winfo_children():
-            widget.destroy()
-        
-        t = THEME[self.mode]
-        
-        # Progress mingguan
-        total_jarak_mingguan = sum(self.daily_distances.values())
+
+        # Item dibuat sekali, selanjutnya hanya nilai yang berubah di-itemconfig
+        view = self._views.get("Jadwal")
+        if view is None:
+            view = self._views["Jadwal"] = self._build_jadwal_view()
+        
+        # Pergantian minggu: cukup pakai bucket minggu baru (O(1), tanpa reset)
+        today = date.today().isoformat()
+        week = week_key(today)
+        if view["week"] != week:
+            view["week"] = week
+            self._jadwal_days.update(HARI_LIST)
+        phase = self.schedule.phase(week)
+        tercapai, _ = self.schedule.summary(week)
+        judul = f"📊 PROGRESS MINGGUAN {week}"
+        if phase:
+            judul += f" · {phase[1].get('nama', f'Minggu {phase[0] + 1}')}"
+        self._set_item(view["canvas"], view["title"], text=f"{judul} · ✅ {tercapai} hari tercapai")
+        
+        # Progress mingguan (minggu ISO berjalan)
+        total_jarak_mingguan, _, _ = self.rollups.week(today)
         progress_persen = (total_jarak_mingguan / self.target_mingguan) * 100 if self.target_mingguan > 0 else 0
         
-        # Info progress
-        progress_frame = tk.Frame(self.jadwal_container, bg=t["card"], padx=15, pady=12)
-        progress_frame.pack(fill="x", pady=(0, 15))
-        
-        tk.Label(progress_frame, text="📊 PROGRESS MINGGUAN", 
-                bg=t["card"], fg=t["fg"], font=("Arial", 11, "bold")).pack(anchor="w", pady=(0, 5))
-        
-        tk.Label(progress_frame, text=f"🎯 Target: {self.target_mingguan:.1f} km | 📈 Total: {total_jarak_mingguan:.1f} km | 📊 {progress_persen:.1f}%", 
-                bg=t["card"], fg="#4ecdc4", font=("Arial", 10)).pack(anchor="w")
+        self._set_item(view["canvas"], view["progress"], text=f"🎯 Target: {self.target_mingguan:.1f} km | 📈 Total: {total_jarak_mingguan:.1f} km | 📊 {progress_persen:.1f}%")
         
-        # Jadwal per hari
-        hari_list = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+        for hari_nama in HARI_LIST:
+            if hari_nama in self._jadwal_days:
+                self._update_day_card(view, view["days"][hari_nama], hari_nama, week)
+        self._jadwal_days.clear()
+
+    def _build_jadwal_view(self):
+        """Papan jadwal = item teks/kotak di satu Canvas (tanpa widget per kartu)"""
+        canvas = self.jadwal_canvas
+        view = {"canvas": canvas, "scroll_job": None, "week": week_key(date.today().isoformat())}
         
-        for hari_nama in hari_list:
-            schedule = self.schedule_data[hari_nama]
-            achievement = self.schedule_achievements[hari_nama]
-            
-            # Frame untuk setiap hari
-            day_frame = tk.Frame(self.jadwal_container, bg=t["card"], padx=15, pady=12)
-            day_frame.pack(fill="x", pady=5)
-            
-            # Header dengan hari
-            header_frame = tk.Frame(day_frame, bg=t["card"])
-            header_frame.pack(fill="x", pady=(0, 8))
-            
-            # Nama hari
-            tk.Label(header_frame, text=hari_nama, bg=t["card"], fg=t["fg"],
-                     font=("Arial", 11, "bold")).pack(side="left")
-            
-            # Status pencapaian
-            if achievement["completed"]:
-                status_text = "✅ TERCAPAI"
-                status_color = "#4ecdc4"
-            elif achievement["actual_distance"] > 0:
-                status_text = f"📊 {achievement['persentase_jarak']:.0f}%"
-                status_color = "#ffd166"
-            else:
-                status_text = "⏳ BELUM"
-                status_color = "#888"
-            
-            tk.Label(header_frame, text=status_text, bg=t["card"], fg=status_color,
-                     font=("Arial", 10, "bold")).pack(side="right")
-            
-            # Jenis latihan
-            tk.Label(day_frame, text=f"🏃 {schedule['latihan']}", 
-                    bg=t["card"], fg="#4ecdc4",
-                    font=("Arial", 10, "bold")).pack(anchor="w", pady=(0, 5))
-            
-            # Target
-            if schedule["latihan"] != "Rest Day":
-                target_frame = tk.Frame(day_frame, bg=t["card"])
-                target_frame.pack(fill="x", pady=(0, 5))
-                
-                tk.Label(target_frame, text="🎯 Target:", bg=t["card"], fg=t["fg"],
-                         font=("Arial", 9, "bold")).pack(side="left", padx=(0, 5))
-                
-                tk.Label(target_frame, text=f"Jarak: {schedule['target_jarak']} km | Waktu: {schedule['durasi']} menit", 
-                         bg=t["card"], fg="#888", font=("Arial", 9)).pack(side="left", padx=(0, 10))
-            
-            # Hasil aktual jika ada
-            if achievement["actual_distance"] > 0 and schedule["latihan"] != "Rest Day":
-                # Data aktual
-                actual_frame = tk.Frame(day_frame, bg=t["card"])
-                actual_frame.pack(fill="x", pady=(5, 0))
-                
-                tk.Label(actual_frame, text="📊 Hasil:", bg=t["card"], fg=t["fg"],
-                         font=("Arial", 9, "bold")).pack(side="left", padx=(0, 5))
-                
-                tk.Label(actual_frame, text=f"Jarak: {achievement['actual_distance']:.1f} km", 
-                         bg=t["card"], fg="#4ecdc4", font=("Arial", 9, "bold")).pack(side="left", padx=(0, 10))
-                
-                # Status detail
-                status_frame = tk.Frame(day_frame, bg=t["card"])
-                status_frame.pack(fill="x", pady=(5, 0))
-                
-                if achievement["completed"]:
-                    tk.Label(status_frame, text="✅ TARGET TERPENUHI", bg=t["card"], fg="#4ecdc4",
-                             font=("Arial", 9, "bold")).pack(side="left")
-                    
-                    # Tambahkan kontribusi mingguan
-                    kontribusi_frame = tk.Frame(day_frame, bg=t["card"])
-                    kontribusi_frame.pack(fill="x", pady=(3, 0))
-                    tk.Label(kontribusi_frame, text=f"➕ Kontribusi: {achievement['kontribusi_mingguan']:.1f}% dari target mingguan", 
-                             bg=t["card"], fg="#ffd166", font=("Arial", 8, "bold")).pack(side="left")
-                    
-                    # Jika melebihi target
-                    if achievement["actual_distance"] > achievement["target_distance"]:
-                        kelebihan = achievement["actual_distance"] - achievement["target_distance"]
-                        bonus_frame = tk.Frame(day_frame, bg=t["card"])
-                        bonus_frame.pack(fill="x", pady=(3, 0))
-                        tk.Label(bonus_frame, text=f"⭐ Melebihi target: +{kelebihan:.1f} km", 
-                                 bg=t["card"], fg="#ffd166", font=("Arial", 8, "bold")).pack(side="left")
-                else:
-                    sisa = achievement["target_distance"] - achievement["actual_distance"]
-                    tk.Label(status_frame, text=f"⚠️ Kurang {sisa:.1f} km", bg=t["card"], fg="#ff6b6b",
-                             font=("Arial", 9, "bold")).pack(side="left")
-            
-            elif schedule["latihan"] == "Rest Day":
-                # Hari istirahat
-                rest_frame = tk.Frame(day_frame, bg=t["card"])
-                rest_frame.pack(fill="x", pady=(5, 0))
-                tk.Label(rest_frame, text="😴 Hari istirahat - Fokus pemulihan", 
-                         bg=t["card"], fg="#888", font=("Arial", 9, "italic")).pack()
-            
-            # Tips
-            tips_frame = tk.Frame(day_frame, bg=t["card"])
-            tips_frame.pack(fill="x", pady=(5, 0))
-            tk.Label(tips_frame, text=f"💡 {schedule['tips']}", bg=t["card"], fg="#888",
-                     font=("Arial", 8), wraplength=680, justify="left").pack(anchor="w")
-            
-            # Separator
-            if hari_nama != "Minggu":
-                separator = tk.Frame(day_frame, height=1, 
-                                   bg="#444444" if self.mode=="dark" else "#cccccc")
-                separator.pack(fill="x", pady=(10, 0))
+        # Info progress
+        top = JADWAL_PAD
+        view["progress_card"] = self._themed_item(canvas, canvas.create_rectangle(
+            JADWAL_PAD, top, JADWAL_WIDTH - JADWAL_PAD, top + 58, width=0), fill="card")
+        view["title"] = self._themed_item(canvas, canvas.create_text(
+            JADWAL_PAD + 15, top + 12, anchor="nw", text="📊 PROGRESS MINGGUAN", font=("Arial", 11, "bold")), fill="fg")
+        view["progress"] = canvas.create_text(JADWAL_PAD + 15, top + 34, anchor="nw",
+                                              fill="#4ecdc4", font=("Arial", 10))
+        
+        top += 58 + 15
+        view["days"] = {}
+        for hari_nama in HARI_LIST:
+            card = view["days"][hari_nama] = self._build_day_card(canvas, hari_nama, top, view["week"])
+            top += card["height"] + JADWAL_GAP
+        self._schedule_jadwal_scroll(view)
+        return view
+
+    def _build_day_card(self, canvas, hari_nama, top, week):
+        """Item kartu satu hari (bertag "hari-<nama>"); baris yang tidak dipakai disembunyikan"""
+        tag = f"hari-{hari_nama}"
+        x, right = JADWAL_PAD + 15, JADWAL_WIDTH - JADWAL_PAD - 15
+        
+        def text(role_fg=None, **opts):
+            item = canvas.create_text(x, top, anchor="nw", tags=(tag,), **opts)
+            return self._themed_item(canvas, item, fill=role_fg) if role_fg else item
+        
+        def labelled(label, **opts):
+            # "Label:" tebal + nilai di kanannya, satu baris
+            head = text("fg", text=label, font=("Arial", 9, "bold"))
+            value = text(**opts)
+            return [head, value]
+        
+        card = {"tag": tag, "top": top, "height": 0, "layout": None}
+        card["rect"] = self._themed_item(canvas, canvas.create_rectangle(
+            JADWAL_PAD, top, JADWAL_WIDTH - JADWAL_PAD, top, width=0, tags=(tag,)), fill="card")
+        card["status"] = canvas.create_text(right, top, anchor="ne", font=("Arial", 10, "bold"), tags=(tag,))
+        # Baris kartu dari atas ke bawah: (kunci, item, tinggi_px; None = ukur dari bbox)
+        card["rows"] = [
+            ("hari", [text("fg", font=("Arial", 11, "bold")), card["status"]], 26),
+            ("latihan", [text(fill="#4ecdc4", font=("Arial", 10, "bold"))], 22),
+            ("target", labelled("🎯 Target:", fill="#888", font=("Arial", 9)), 20),
+            ("rest", [text(text="😴 Hari istirahat - Fokus pemulihan", fill="#888",
+                           font=("Arial", 9, "italic"))], 20),
+            ("actual", labelled("📊 Hasil:", fill="#4ecdc4", font=("Arial", 9, "bold")), 22),
+            ("detail", [text(font=("Arial", 9, "bold"))], 20),
+            ("kontribusi", [text(fill="#ffd166", font=("Arial", 8, "bold"))], 18),
+            ("bonus", [text(fill="#ffd166", font=("Arial", 8, "bold"))], 18),
+            ("tips", [text(fill="#888", font=("Arial", 8), width=right - x)], None),
+        ]
+        items = {key: row for key, row, _ in card["rows"]}
+        card["hari"], card["latihan"], card["rest"] = items["hari"][0], items["latihan"][0], items["rest"][0]
+        card["target_text"], card["actual_text"] = items["target"][1], items["actual"][1]
+        card["detail"], card["kontribusi"] = items["detail"][0], items["kontribusi"][0]
+        card["bonus"], card["tips"] = items["bonus"][0], items["tips"][0]
+        # Nilai ditaruh di kanan labelnya (lebar label diukur sekali)
+        for key in ("target", "actual"):
+            head, value = items[key]
+            card[key + "_dx"] = canvas.bbox(head)[2] - x + 5
+        self._update_day_card(None, card, hari_nama, week)
+        return card
+
+    def _update_day_card(self, view, card, hari_nama, week):
+        canvas = self.jadwal_canvas
+        schedule = self.schedule.plan_for(week)[hari_nama]
+        achievement = self.schedule.achievement(week, hari_nama)
+        is_rest = schedule["latihan"] == "Rest Day"
+        has_actual = achievement["actual_distance"] > 0 and not is_rest
+        
+        # Status pencapaian
+        if achievement["completed"]:
+            self._set_item(canvas, card["status"], text="✅ TERCAPAI", fill="#4ecdc4")
+        elif achievement["actual_distance"] > 0:
+            self._set_item(canvas, card["status"], text=f"📊 {achievement['persentase_jarak']:.0f}%", fill="#ffd166")
+        else:
+            self._set_item(canvas, card["status"], text="⏳ BELUM", fill="#888")
+        
+        self._set_item(canvas, card["hari"], text=f"{hari_nama}  {schedule['tanggal'][8:]}/{schedule['tanggal'][5:7]}")
+        self._set_item(canvas, card["latihan"], text=f"🏃 {schedule['latihan']}")
+        self._set_item(canvas, card["target_text"], text=f"Jarak: {schedule['target_jarak']} km | Waktu: {schedule['durasi']} menit")
+        tips_changed = self._set_item(canvas, card["tips"], text=f"💡 {schedule['tips']}")
+        
+        # Hasil aktual jika ada
+        completed = has_actual and achievement["completed"]
+        melebihi = completed and achievement["actual_distance"] > achievement["target_distance"]
+        if has_actual:
+            self._set_item(canvas, card["actual_text"], text=f"Jarak: {achievement['actual_distance']:.1f} km")
+        if completed:
+            self._set_item(canvas, card["detail"], text="✅ TARGET TERPENUHI", fill="#4ecdc4")
+            self._set_item(canvas, card["kontribusi"], text=f"➕ Kontribusi: {achievement['kontribusi_mingguan']:.1f}% dari target mingguan")
+            if melebihi:
+                kelebihan = achievement["actual_distance"] - achievement["target_distance"]
+                self._set_item(canvas, card["bonus"], text=f"⭐ Melebihi target: +{kelebihan:.1f} km")
+        elif has_actual:
+            sisa = achievement["target_distance"] - achievement["actual_distance"]
+            self._set_item(canvas, card["detail"], text=f"⚠️ Kurang {sisa:.1f} km", fill="#ff6b6b")
+        
+        # Susun ulang baris hanya jika baris yang terlihat (atau tinggi tips) berubah
+        layout = (not is_rest, is_rest, has_actual, has_actual, completed, melebihi)
+        if layout != card["layout"] or tips_changed:
+            card["layout"] = layout
+            self._layout_day_card(view, card, hari_nama)
+
+    def _layout_day_card(self, view, card, hari_nama):
+        """Posisikan baris yang terlihat; kartu di bawahnya digeser jika tinggi berubah"""
+        canvas = self.jadwal_canvas
+        x = JADWAL_PAD + 15
+        visible = dict(zip(("target", "rest", "actual", "detail", "kontribusi", "bonus"), card["layout"]))
+        y = card["top"] + 12
+        for key, items, height in card["rows"]:
+            shown = visible.get(key, True)
+            for item in items:
+                canvas.itemconfig(item, state="normal" if shown else "hidden")
+            if not shown:
+                continue
+            canvas.coords(items[0], x, y)
+            if key in ("target", "actual"):
+                canvas.coords(items[1], x + card[key + "_dx"], y)
+            elif len(items) > 1:
+                canvas.coords(items[1], JADWAL_WIDTH - JADWAL_PAD - 15, y)
+            if height is None:
+                x0, y0, x1, y1 = canvas.bbox(items[0])
+                height = y1 - y0 + 4
+            y += height
+        height = y + 10 - card["top"]
+        canvas.coords(card["rect"], JADWAL_PAD, card["top"], JADWAL_WIDTH - JADWAL_PAD, card["top"] + height)
+        
+        delta, card["height"] = height - card["height"], height
+        if view is None or not delta:
+            return
+        after = False
+        for nama in HARI_LIST:
+            if after:
+                other = view["days"][nama]
+                canvas.move(other["tag"], 0, delta)
+                other["top"] += delta
+            after = after or nama == hari_nama
+        self._schedule_jadwal_scroll(view)
+
+    def _schedule_jadwal_scroll(self, view):
+        """scrollregion dihitung sekali per idle, berapa pun kartu yang berubah tinggi"""
+        if view["scroll_job"] is None:
+            view["scroll_job"] = self.after_idle(self._update_jadwal_scroll, view)
+
+    def _update_jadwal_scroll(self, view):
+        view["scroll_job"] = None
+        last = view["days"][HARI_LIST[-1]]
+        view["canvas"].configure(scrollregion=(0, 0, JADWAL_WIDTH, last["top"] + last["height"] + JADWAL_PAD))
+
+    def _set_item(self, canvas, item, **opts):
+        """itemconfig() hanya untuk opsi yang nilainya berubah; True jika ada yang berubah"""
+        last = canvas.__dict__.setdefault("_item_opts", {}).setdefault(item, {})
+        changed = {k: v for k, v in opts.items() if last.get(k) != v}
+        if changed:
+            canvas.itemconfig(item, **changed)
+            last.update(changed)
+        return bool(changed)
+
+    def _set(self, widget, **opts):
+        """config() hanya untuk opsi yang nilainya berubah"""
+        last = widget.__dict__.setdefault("_last_opts", {})
+        changed = {k: v for k, v in opts.items() if last.get(k) != v}
+        if changed:
+            widget.config(**changed)
+            last.update(changed)
+
+    def mark_dirty(self, *tabs):
+        """Tandai tab yang perlu digambar ulang; digabung dalam satu after_idle"""
+        self._dirty.update(tabs)
+        if self._refresh_job is None:
+            self._refresh_job = self.after_idle(self._refresh_dirty)
+
+    def _refresh_dirty(self):
+        """Gambar ulang tab kotor yang sudah dibangun; sisanya menunggu tab dibuka"""
+        self._refresh_job = None
+        dirty = self._dirty
+        renderers = {
+            "Hasil": self.show_hasil,
+            "Gizi": self.show_gizi,
+            "Jadwal": self.update_jadwal_display,
+            "History": self.show_history,
+            "Grafik": self.show_grafik
+        }
+        for name, render in renderers.items():
+            if name in dirty and name in self._built:
+                dirty.discard(name)
+                render()
 
     def show_all(self):
         """Update semua tab"""
-        self.show_hasil()
-        self.show_gizi()
-        self.update_jadwal_display()
-        self.show_history()
+        self._jadwal_days.update(HARI_LIST)
+        self.mark_dirty("Hasil", "Gizi", "Jadwal", "History", "Grafik")
 
     def show_hasil(self):
-        """Tampilkan hasil analisis - TIDAK DIUBAH (seperti kode asli)"""
+        """Tampilkan hasil analisis"""
         if not hasattr(self, "pace"):
             return
             
-        t = THEME[self.mode]
+        view = self._views.get("Hasil")
+        if view is None:
+            view = self._views["Hasil"] = self._build_hasil_view()
+        
+        self._set(view["Pace"], text=f"{self.pace:.2f} menit/km")
+        self._set(view["Kecepatan"], text=f"{self.speed:.1f} km/jam")
+        self._set(view["Kalori Terbakar"], text=f"{self.kal:.0f} kalori")
+        
+        self._set(view["rekor"], text=self._records_text())
+        
+        # Split / best effort / interval hanya untuk run dengan data sampel atau lap
+        seg = self.segments
+        if seg:
+            self._set(view["segmen"], text=self._segment_text(seg))
+            if not view["segmen"].winfo_manager():
+                view["segmen"].pack(fill="x", pady=(15, 0))
+        else:
+            view["segmen"].pack_forget()
+
+    def _records_text(self):
+        """Rekor pribadi + tren beban dari indeks (tanpa scan history)"""
+        tren = self.records.trend(self.day_totals)
+        lines = [f"📈 Beban 7 hari: {tren['beban_7']:.1f} km | 28 hari: {tren['beban_28']:.1f} km",
+                 f"💪 Fitness {tren['fitness']:.1f} | Fatigue {tren['fatigue']:.1f} | Form {tren['form']:+.1f}"]
+        best = self.records.best_pace()
+        if best:
+            lines.append("🏅 Pace terbaik: " + " | ".join(
+                f"{name} {pace:.2f} ({tanggal})" for name, (pace, tanggal, _) in best.items()))
+        longest, week = self.records.longest_run(), self.records.best_week()
+        if longest:
+            lines.append(f"🛣️ Terjauh: {longest[0]:.1f} km ({longest[1]})"
+                         + (f" | Minggu terbaik: {week[0]} {week[1]:.1f} km" if week else ""))
+        return "\n".join(lines)
+
+    def _segment_text(self, seg):
+        lines = []
+        if seg["best"]:
+            lines.append("🏁 Best effort: " + " | ".join(
+                f"{name.upper()} {format_durasi(detik)}" for name, detik in seg["best"].items()))
+        if seg["splits"]:
+            splits = " ".join(format_durasi(detik) for detik in seg["splits"][:12])
+            lines.append(f"⏱️ Split/km: {splits}{' …' if len(seg['splits']) > 12 else ''}")
+        if seg.get("cek_interval"):
+            reps, cepat, menit_cepat, menit_recovery = seg["cek_interval"]
+            lines.append(f"🔁 Interval: {reps}/{cepat} repetisi sesuai pola {menit_cepat}' cepat / {menit_recovery}' recovery")
+        if self.best_efforts.records:
+            lines.append("🏆 Rekor: " + " | ".join(
+                f"{name.upper()} {format_durasi(detik)}" for name, (detik, _) in self.best_efforts.records.items()))
+        return "\n".join(lines)
+
+    def _build_hasil_view(self):
         tab = self.tabs["Hasil"]
-        for w in tab.winfo_children(): w.destroy()
         
-        f = tk.Frame(tab, bg=t["frame"], padx=25, pady=25)
+        f = self._themed(tk.Frame(tab, padx=25, pady=25), bg="frame")
         f.pack(fill="both", expand=True)
         
-        tk.Label(f, text="HASIL ANALISIS", bg=t["frame"],
-                 fg="#ffd166", font=("Arial",14,"bold")).pack(pady=(0,20))
-        
-        data = [
-            ("Pace", f"{self.pace:.2f} menit/km"),
-            ("Kecepatan", f"{self.speed:.1f} km/jam"),
-            ("Kalori Terbakar", f"{self.kal:.0f} kalori")
-        ]
+        self._themed(tk.Label(f, text="HASIL ANALISIS", fg="#ffd166", font=("Arial",14,"bold")), bg="frame").pack(pady=(0,20))
         
-        for label, value in data:
-            frame = tk.Frame(f, bg=t["card"], padx=15, pady=10)
+        # Status mode live (hanya terlihat saat run live berjalan)
+        view = {"live": self._themed(tk.Label(f, fg="#ff6b6b", font=("Arial",12,"bold")), bg="frame")}
+        for label in ["Pace", "Kecepatan", "Kalori Terbakar"]:
+            frame = self._themed(tk.Frame(f, padx=15, pady=10), bg="card")
             frame.pack(fill="x", pady=5)
-            tk.Label(frame, text=label, bg=t["card"], fg=t["fg"],
-                     font=("Arial",11)).pack(side="left")
-            tk.Label(frame, text=value, bg=t["card"], fg="#4ecdc4",
-                     font=("Arial",11,"bold")).pack(side="right")
+            view.setdefault("first", frame)
+            self._themed(tk.Label(frame, text=label, font=("Arial",11)), bg="card", fg="fg").pack(side="left")
+            view[label] = self._themed(tk.Label(frame, fg="#4ecdc4",
+                                   font=("Arial",11,"bold")), bg="card")
+            view[label].pack(side="right")
+        view["rekor"] = self._themed(tk.Label(f, fg="#4ecdc4", font=("Arial",10),
+                                              justify="left", anchor="w", wraplength=700), bg="frame")
+        view["rekor"].pack(fill="x", pady=(15, 0))
+        view["segmen"] = self._themed(tk.Label(f, fg="#ffd166", font=("Arial",10),
+                                               justify="left", anchor="w", wraplength=700), bg="frame")
+        return view
 
     def show_gizi(self):
-        """Tampilkan informasi gizi - TIDAK DIUBAH (seperti kode asli)"""
+        """Tampilkan informasi gizi"""
         if not hasattr(self, "pace"):
             return
             
-        t = THEME[self.mode]
+        view = self._views.get("Gizi")
+        if view is None:
+            view = self._views["Gizi"] = self._build_gizi_view()
+        
+        self._set(view["kal"], text=f"🔥 Kalori Terbakar: {self.kal:.0f} kalori")
+        self._set(view["pace"], text=f"⏱️ Pace: {self.pace:.2f} menit/km | ⚡ Kecepatan: {self.speed:.1f} km/jam")
+
+    def _build_gizi_view(self):
         tab = self.tabs["Gizi"]
-        for w in tab.winfo_children(): w.destroy()
         
-        main_frame = tk.Frame(tab, bg=t["frame"])
+        main_frame = self._themed(tk.Frame(tab), bg="frame")
         main_frame.pack(fill="both", expand=True)
         
-        canvas = tk.Canvas(main_frame, bg=t["frame"], highlightthickness=0)
+        canvas = self._themed(tk.Canvas(main_frame, highlightthickness=0), bg="frame")
         scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=canvas.yview)
-        scrollable_frame = tk.Frame(canvas, bg=t["frame"], width=650)
+        scrollable_frame = self._themed(tk.Frame(canvas, width=650), bg="frame")
         
         scrollable_frame.bind(
             "<Configure>",
@@ -702,104 +1625,639 @@ class RunningApp(tk.Tk):
         canvas.pack(side="left", fill="both", expand=True, padx=(25,0), pady=25)
         scrollbar.pack(side="right", fill="y", pady=25)
         
-        def _on_mousewheel(event):
-            canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        canvas.bind_all("<MouseWheel>", _on_mousewheel)
+        self._bind_wheel_scroll(canvas)
         
-        container = tk.Frame(scrollable_frame, bg=t["frame"])
+        container = self._themed(tk.Frame(scrollable_frame), bg="frame")
         container.pack(expand=True, fill="both", padx=20, pady=10)
        
-        tk.Label(container, text="PROGRES & NUTRISI", bg=t["frame"],
-                 fg="#ffd166", font=("Arial",14,"bold")).pack(pady=(0,25))
+        self._themed(tk.Label(container, text="PROGRES & NUTRISI", fg="#ffd166", font=("Arial",14,"bold")), bg="frame").pack(pady=(0,25))
         
         # Info sederhana
-        info_frame = tk.Frame(container, bg=t["card"], padx=20, pady=15)
+        info_frame = self._themed(tk.Frame(container, padx=20, pady=15), bg="card")
         info_frame.pack(fill="x", pady=(0, 20))
         
-        tk.Label(info_frame, text=f"🔥 Kalori Terbakar: {self.kal:.0f} kalori", 
-                bg=t["card"], fg="#ff6b6b", font=("Arial", 12, "bold")).pack(anchor="w", pady=(0, 5))
+        kal = self._themed(tk.Label(info_frame, fg="#ff6b6b", font=("Arial", 12, "bold")), bg="card")
+        kal.pack(anchor="w", pady=(0, 5))
         
-        tk.Label(info_frame, text=f"⏱️ Pace: {self.pace:.2f} menit/km | ⚡ Kecepatan: {self.speed:.1f} km/jam", 
-                bg=t["card"], fg="#4ecdc4", font=("Arial", 10)).pack(anchor="w")
+        pace = self._themed(tk.Label(info_frame, fg="#4ecdc4", font=("Arial", 10)), bg="card")
+        pace.pack(anchor="w")
+        return {"kal": kal, "pace": pace}
 
     def show_history(self):
-        """Tampilkan riwayat - TIDAK DIUBAH (seperti kode asli)"""
-        if not hasattr(self, "pace"):
+        """Tampilkan riwayat sebagai daftar virtual (hanya baris yang terlihat dibuat)"""
+        if not hasattr(self, "pace") and "History" not in self._views:
             return
             
-        t = THEME[self.mode]
+        view = self._views.get("History")
+        if view is None:
+            view = self._views["History"] = self._build_history_view()
+        
+        count = self.runs.date_count()
+        if count != view["count"]:
+            view["count"] = count
+            if count:
+                view["empty"].pack_forget()
+                view["body"].pack(fill="both", expand=True)
+            else:
+                view["body"].pack_forget()
+                view["empty"].pack()
+            
+            # Daftar tahun/bulan untuk lompat cepat (hanya saat ada tanggal baru)
+            months = {}
+            for tanggal in self.runs.dates(reverse=True):
+                bulan = months.setdefault(tanggal[:4], [])
+                if not bulan or bulan[-1] != tanggal[:7]:
+                    bulan.append(tanggal[:7])
+            view["months"] = months
+            view["tahun"].config(values=list(months))
+        
+        # Data berubah: hasil filter aktif dihitung ulang (indeks, bukan scan)
+        if view["kriteria"] is not None:
+            self._run_history_query(view)
+        self._render_history_rows()
+
+    def _build_history_view(self):
         tab = self.tabs["History"]
-        for w in tab.winfo_children(): w.destroy()
 
-        f = tk.Frame(tab, bg=t["frame"], padx=25, pady=25)
+        f = self._themed(tk.Frame(tab, padx=25, pady=25), bg="frame")
         f.pack(fill="both", expand=True)
         
-        tk.Label(f, text="Riwayat Analisis", bg=t["frame"],
-                 fg="#ffd166", font=("Arial",14,"bold")).pack(pady=(0,20))
-        
-        if not self.history:
-            tk.Label(f, text="Belum ada riwayat", fg=t["fg"], bg=t["frame"]).pack()
+        self._themed(tk.Label(f, text="Riwayat Analisis", fg="#ffd166", font=("Arial",14,"bold")), bg="frame").pack(pady=(0,20))
+        
+        empty = self._themed(tk.Label(f, text="Belum ada riwayat"), fg="fg", bg="frame")
+        body = self._themed(tk.Frame(f), bg="frame")
+        
+        # Lompat ke tahun / bulan
+        jump_frame = self._themed(tk.Frame(body), bg="frame")
+        jump_frame.pack(fill="x", pady=(0, 10))
+        self._themed(tk.Label(jump_frame, text="Lompat ke:", font=("Arial", 10)), bg="frame", fg="fg").pack(side="left", padx=(0, 10))
+        tahun = ttk.Combobox(jump_frame, state="readonly", width=8, font=("Arial", 10))
+        tahun.pack(side="left")
+        bulan = ttk.Combobox(jump_frame, state="readonly", width=10, font=("Arial", 10))
+        bulan.pack(side="left", padx=(10, 0))
+        tahun.bind("<<ComboboxSelected>>", lambda e: self._history_jump_tahun())
+        bulan.bind("<<ComboboxSelected>>", lambda e: self._history_jump_to(bulan.get()))
+        
+        # Ekspor riwayat (rentang tanggal opsional, YYYY-MM-DD)
+        export_frame = self._themed(tk.Frame(body), bg="frame")
+        export_frame.pack(fill="x", pady=(0, 10))
+        self._themed(tk.Label(export_frame, text="Ekspor:", font=("Arial", 10)), bg="frame", fg="fg").pack(side="left", padx=(0, 10))
+        fmt = ttk.Combobox(export_frame, state="readonly", width=8, font=("Arial", 10),
+                           values=["csv", "jsonl", "parquet"])
+        fmt.set("csv")
+        fmt.pack(side="left")
+        dari = self._themed(tk.Entry(export_frame, width=11, font=("Arial", 10)), bg="card", fg="fg")
+        dari.pack(side="left", padx=(10, 0))
+        self._themed(tk.Label(export_frame, text="s/d", font=("Arial", 10)), bg="frame", fg="fg").pack(side="left", padx=5)
+        sampai = self._themed(tk.Entry(export_frame, width=11, font=("Arial", 10)), bg="card", fg="fg")
+        sampai.pack(side="left")
+        export_btn = tk.Button(export_frame, text="💾 Ekspor", command=self.export_history,
+                               bg="#4ecdc4", fg="white", font=("Arial",10,"bold"))
+        export_btn.pack(side="left", padx=(10, 0))
+        export_status = self._themed(tk.Label(export_frame, fg="#4ecdc4", font=("Arial", 9)), bg="frame")
+        export_status.pack(side="left", padx=(10, 0))
+        
+        filter_view = self._build_history_filter(body)
+        
+        list_frame = self._themed(tk.Frame(body), bg="frame")
+        list_frame.pack(fill="both", expand=True)
+        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self._history_yview)
+        scrollbar.pack(side="right", fill="y")
+        rows_frame = self._themed(tk.Frame(list_frame), bg="frame")
+        rows_frame.pack(side="left", fill="both", expand=True)
+        rows_frame.bind("<Configure>", self._resize_history_pool)
+        self._bind_history_wheel(rows_frame)
+        
+        return {"empty": empty, "body": body, "rows_frame": rows_frame,
+                "scrollbar": scrollbar, "tahun": tahun, "bulan": bulan,
+                "export": {"format": fmt, "dari": dari, "sampai": sampai,
+                           "btn": export_btn, "status": export_status, "job": None},
+                "filter": filter_view, "kriteria": None, "hasil": None,
+                "count": None, "months": {}, "first": 0, "visible": 1, "pool": []}
+
+    def _build_history_filter(self, body):
+        """Panel filter: rentang tanggal/jarak/pace, hari, tipe latihan, status, urutan"""
+        frame = self._themed(tk.Frame(body), bg="frame")
+        frame.pack(fill="x", pady=(0, 10))
+        rows = [self._themed(tk.Frame(frame), bg="frame") for _ in range(2)]
+        for row in rows:
+            row.pack(fill="x", pady=2)
+
+        def label(row, text, padx=(0, 5)):
+            self._themed(tk.Label(row, text=text, font=("Arial", 10)), bg="frame", fg="fg").pack(side="left", padx=padx)
+
+        def entry(row, width):
+            e = self._themed(tk.Entry(row, width=width, font=("Arial", 10)), bg="card", fg="fg")
+            e.pack(side="left")
+            return e
+
+        def combo(row, values, width):
+            c = ttk.Combobox(row, state="readonly", width=width, font=("Arial", 10), values=values)
+            c.set(values[0])
+            c.pack(side="left")
+            return c
+
+        widgets = {}
+        label(rows[0], "Filter:", padx=(0, 10))
+        widgets["dari"] = entry(rows[0], 11)
+        label(rows[0], "s/d", padx=5)
+        widgets["sampai"] = entry(rows[0], 11)
+        label(rows[0], "Hari:", padx=(10, 5))
+        widgets["hari"] = combo(rows[0], ["Semua", *HARI_LIST], 8)
+        label(rows[0], "Tipe:", padx=(10, 5))
+        widgets["tipe"] = combo(rows[0], ["Semua"], 14)
+        label(rows[0], "Status:", padx=(10, 5))
+        widgets["status"] = combo(rows[0], ["Semua", "Tercapai", "Belum"], 8)
+
+        label(rows[1], "Jarak:")
+        widgets["jarak_min"] = entry(rows[1], 5)
+        label(rows[1], "-", padx=3)
+        widgets["jarak_max"] = entry(rows[1], 5)
+        label(rows[1], "km  Pace:", padx=(3, 5))
+        widgets["pace_min"] = entry(rows[1], 5)
+        label(rows[1], "-", padx=3)
+        widgets["pace_max"] = entry(rows[1], 5)
+        label(rows[1], "Urut:", padx=(10, 5))
+        widgets["urut"] = combo(rows[1], list(HISTORY_SORTS), 14)
+        tk.Button(rows[1], text="🔍 Cari", command=self.filter_history,
+                  bg="#4ecdc4", fg="white", font=("Arial", 10, "bold")).pack(side="left", padx=(10, 0))
+        tk.Button(rows[1], text="✖ Reset", command=self.reset_history_filter,
+                  bg="#ff6b6b", fg="white", font=("Arial", 10, "bold")).pack(side="left", padx=(5, 0))
+        # Daftar tipe diisi saat dropdown dibuka (program bisa berganti)
+        widgets["tipe"].config(postcommand=lambda: widgets["tipe"].config(
+            values=["Semua", *self.schedule.tipe_list()]))
+        widgets["summary"] = self._themed(tk.Label(frame, fg="#ffd166", font=("Arial", 10, "bold")), bg="frame")
+        return widgets
+
+    def filter_history(self):
+        """Baca panel filter lalu jalankan query; daftar History menampilkan run hasilnya"""
+        view = self._views["History"]
+        w = view["filter"]
+        try:
+            for key in ("dari", "sampai"):
+                if w[key].get().strip():
+                    date.fromisoformat(w[key].get().strip())
+            rentang = {}
+            for col in ("jarak", "pace"):
+                lo, hi = (w[f"{col}_{end}"].get().strip() for end in ("min", "max"))
+                if lo or hi:
+                    rentang[col] = (float(lo) if lo else None, float(hi) if hi else None)
+        except ValueError:
+            messagebox.showerror("Error", "Tanggal filter: YYYY-MM-DD, jarak/pace: angka")
             return
+        status = w["status"].get()
+        view["kriteria"] = {
+            "dari": w["dari"].get().strip() or None,
+            "sampai": w["sampai"].get().strip() or None,
+            "hari": [w["hari"].get()] if w["hari"].get() != "Semua" else None,
+            "tipe": [w["tipe"].get()] if w["tipe"].get() != "Semua" else None,
+            "completed": None if status == "Semua" else status == "Tercapai",
+            **rentang,
+        }
+        view["first"] = 0
+        self._run_history_query(view)
+        self._render_history_rows()
 
-        dates_frame = tk.Frame(f, bg=t["frame"])
-        dates_frame.pack(anchor="center")
+    def reset_history_filter(self):
+        view = self._views["History"]
+        view["kriteria"] = view["hasil"] = None
+        view["first"] = 0
+        view["filter"]["summary"].pack_forget()
+        self._render_history_rows()
 
-        row_frame = None
-        for i, tanggal in enumerate(sorted(self.history.keys(), reverse=True)):
-            if i % 3 == 0:
-                row_frame = tk.Frame(dates_frame, bg=t["frame"])
+    def _run_history_query(self, view):
+        """Ringkasan dihitung sekarang; baris hasil diambil dari generator sebanyak yang terlihat"""
+        urut, turun = HISTORY_SORTS[view["filter"]["urut"].get()]
+        ringkasan, rows = self.runs.query(view["kriteria"], self.schedule, urut, turun)
+        view["hasil"] = {"ringkasan": ringkasan, "rows": rows, "items": []}
+        summary = view["filter"]["summary"]
+        self._set(summary, text=f"{ringkasan['runs']} run | {ringkasan['jarak']:.1f} km | "
+                                f"{ringkasan['waktu'] / 60:.1f} jam | Pace {ringkasan['pace']:.2f} | "
+                                f"{ringkasan['kal']:.0f} cal")
+        if not summary.winfo_manager():
+            summary.pack(anchor="w", pady=(5, 0))
+
+    def _history_count(self, view):
+        hasil = view["hasil"]
+        return view["count"] if hasil is None else hasil["ringkasan"]["runs"]
+
+    def _history_item(self, view, i):
+        """(tanggal, teks tombol) ke-i: tanggal History, atau run hasil filter dari generator"""
+        hasil = view["hasil"]
+        if hasil is None:
+            tanggal = self.runs.date_at(i, reverse=True)
+            return tanggal, tanggal
+        rows, items = hasil["rows"], hasil["items"]
+        while len(items) <= i:
+            run = next(rows, None)
+            if run is None:
+                return None
+            items.append(run)
+        run = items[i]
+        return run["tanggal"], f"{run['tanggal']} · {run['jarak']:.1f} km"
+
+    def _resize_history_pool(self, event):
+        """Jumlah baris tombol mengikuti tinggi area, bukan jumlah tanggal"""
+        view = self._views["History"]
+        view["visible"] = max(1, event.height // HISTORY_ROW_HEIGHT)
+        while len(view["pool"]) < view["visible"]:
+            row_frame = self._themed(tk.Frame(view["rows_frame"]), bg="frame")
+            self._bind_history_wheel(row_frame)
+            buttons = [self._make_date_button(row_frame) for _ in range(3)]
+            view["pool"].append((row_frame, buttons))
+        self._render_history_rows()
+
+    def _render_history_rows(self):
+        view = self._views["History"]
+        count = self._history_count(view)
+        total_rows = -(-count // 3)
+        visible = view["visible"]
+        view["first"] = max(0, min(view["first"], total_rows - visible))
+        
+        for k, (row_frame, buttons) in enumerate(view["pool"]):
+            r = view["first"] + k
+            if k >= visible or r >= total_rows:
+                row_frame.pack_forget()
+                continue
+            if not row_frame.winfo_manager():
                 row_frame.pack(anchor="center", pady=6)
+            for j, btn in enumerate(buttons):
+                i = r * 3 + j
+                item = self._history_item(view, i) if i < count else None
+                if item is not None:
+                    btn.tanggal, text = item
+                    self._set(btn, text=text, width=10 if view["hasil"] is None else 18)
+                    if not btn.winfo_manager():
+                        btn.pack(side="left", padx=6)
+                else:
+                    btn.pack_forget()
+        
+        if total_rows:
+            view["scrollbar"].set(view["first"] / total_rows,
+                                  min(1.0, (view["first"] + visible) / total_rows))
+
+    def _history_yview(self, *args):
+        """Perintah scrollbar: geser baris pertama yang ditampilkan"""
+        view = self._views["History"]
+        total_rows = -(-self._history_count(view) // 3)
+        if args[0] == "moveto":
+            view["first"] = int(float(args[1]) * total_rows)
+        elif args[0] == "scroll":
+            step = view["visible"] if args[2] == "pages" else 1
+            view["first"] += int(args[1]) * step
+        self._render_history_rows()
+
+    def _bind_history_wheel(self, widget):
+        def _on_wheel(event):
+            if event.num == 4 or event.delta > 0:
+                self._history_yview("scroll", -1, "units")
+            else:
+                self._history_yview("scroll", 1, "units")
+            return "break"
+        widget.bind("<MouseWheel>", _on_wheel)
+        widget.bind("<Button-4>", _on_wheel)
+        widget.bind("<Button-5>", _on_wheel)
+
+    def _history_jump_tahun(self):
+        view = self._views["History"]
+        months = view["months"].get(view["tahun"].get(), [])
+        view["bulan"].config(values=months)
+        if months:
+            view["bulan"].set(months[0])
+            self._history_jump_to(months[0])
+
+    def _history_jump_to(self, prefix):
+        """Scroll ke tanggal terbaru pada bulan/tahun ``prefix``"""
+        view = self._views["History"]
+        if view["hasil"] is not None:
+            self.reset_history_filter()
+        i = self.runs.date_position(prefix, reverse=True)
+        view["first"] = i // 3
+        self._render_history_rows()
+
+    def export_history(self):
+        """Ekspor run (+ pencapaian jadwal harian) di thread bg, berkas ditulis per potongan"""
+        import exporter
+        from tkinter import filedialog
+        ex = self._views["History"]["export"]
+        dari, sampai = ex["dari"].get().strip() or None, ex["sampai"].get().strip() or None
+        try:
+            for tanggal in filter(None, (dari, sampai)):
+                date.fromisoformat(tanggal)
+        except ValueError:
+            messagebox.showerror("Error", "Format tanggal ekspor: YYYY-MM-DD")
+            return
+        fmt = ex["format"].get()
+        path = filedialog.asksaveasfilename(title="Ekspor riwayat", defaultextension=exporter.FORMATS[fmt],
+                                            filetypes=[(fmt.upper(), "*" + exporter.FORMATS[fmt])])
+        if not path:
+            return
+
+        # Rentang dan salinan kolom diambil di thread Tk; penulisan di thread bg
+        chunks = self.runs.export_chunks(dari, sampai, exporter.EXPORT_CHUNK)
+        schedule = self.schedule.copy()
+        progress = [0]
+        ex["btn"].config(state="disabled")
+
+        def done(jumlah):
+            self._export_finished(ex)
+            self._set(ex["status"], text=f"{jumlah} run → {os.path.basename(path)}")
+
+        def failed(error):
+            self._export_finished(ex)
+            self._set(ex["status"], text="")
+            messagebox.showerror("Ekspor Gagal", str(error))
+
+        self.workers.submit(exporter.export_runs, path, chunks, schedule, self.target_mingguan, fmt,
+                            lambda n: progress.__setitem__(0, n),
+                            pool="bg", key="export", on_done=done, on_error=failed)
+        self._export_progress(ex, progress)
 
-            btn = tk.Button(
-                row_frame, text=tanggal,
-                command=lambda tgl=tanggal: self.show_date_detail(tgl),
-                bg=t["card"], fg=t["fg"], font=("Arial",10),
-                relief="flat", padx=18, pady=8, cursor="hand2"
-            )
-            btn.pack(side="left", padx=6)
+    def _export_progress(self, ex, progress):
+        self._set(ex["status"], text=f"Mengekspor... {progress[0]} run")
+        ex["job"] = self.after(200, self._export_progress, ex, progress)
 
-            btn.bind("<Enter>", lambda e, b=btn: b.config(bg="#444444" if self.mode=="dark" else "#dddddd"))
-            btn.bind("<Leave>", lambda e, b=btn: b.config(bg=t["card"]))
+    def _export_finished(self, ex):
+        if ex["job"] is not None:
+            self.after_cancel(ex["job"])
+            ex["job"] = None
+        ex["btn"].config(state="normal")
+
+    def _make_date_button(self, row_frame):
+        btn = self._themed(tk.Button(
+            row_frame, font=("Arial",10), width=10,
+            relief="flat", padx=18, pady=8, cursor="hand2"
+        ), bg="card", fg="fg")
+        btn.config(command=lambda b=btn: self.show_date_detail(b.tanggal))
+        btn.bind("<Enter>", lambda e, b=btn: b.config(bg=THEME[self.mode]["hover"]))
+        btn.bind("<Leave>", lambda e, b=btn: b.config(bg=THEME[self.mode]["card"]))
+        self._bind_history_wheel(btn)
+        return btn
 
     def show_date_detail(self, tanggal):
-        """Tampilkan detail tanggal - TIDAK DIUBAH (seperti kode asli)"""
-        detail = tk.Toplevel(self)
+        """Tampilkan detail tanggal di jendela detail yang dipakai ulang"""
+        view = self._detail_view
+        if view is None or not view["win"].winfo_exists():
+            view = self._detail_view = self._build_detail_view()
+
+        detail = view["win"]
+        view["tanggal"] = tanggal
         detail.title(f"Detail {tanggal}")
+        self._set(view["title"], text=f"Detail Tanggal {tanggal}")
+
+        total_jarak, _, _ = self.day_totals.day(tanggal)
+        minggu = self.day_totals.week_total("jarak", tanggal)
+        bulan = self.day_totals.month_total("jarak", tanggal)
+        self._set(view["total"], text=f"Total Jarak: {total_jarak:.1f} km")
+        self._set(view["periode"], text=f"Minggu ini: {minggu:.1f} km | Bulan ini: {bulan:.1f} km")
+
+        # Baris run dipakai ulang sesuai posisi, sisanya disembunyikan
+        rows = view["rows"]
+        n = 0
+        for n, item in enumerate(self.runs.rows_on(tanggal), 1):
+            if n > len(rows):
+                rows.append(self._build_detail_row(view["container"]))
+            row_frame, label = rows[n - 1]
+            row_frame.run = (tanggal, item["ts"])
+            info = f"{item['time']} | {item['jarak']}km | {item['waktu']}m | Pace {item['pace']:.2f} | {item['kal']:.0f} cal"
+            self._set(label, text=info)
+            if not row_frame.winfo_manager():
+                row_frame.pack(fill="x", pady=4)
+        for row_frame, _ in rows[n:]:
+            row_frame.pack_forget()
+        self._set(view["undo"], state="normal" if self.undo_stack else "disabled")
+
+        detail.deiconify()
+        detail.lift()
+
+    def _build_detail_row(self, container):
+        """Satu baris run + tombol edit/hapus; run yang ditunjuk disimpan di ``row_frame.run``"""
+        row_frame = self._themed(tk.Frame(container, padx=10, pady=8), bg="card")
+        label = self._themed(tk.Label(row_frame, font=("Arial",10)), bg="card", fg="fg")
+        label.pack(side="left", expand=True)
+        tk.Button(row_frame, text="🗑", command=lambda: self.delete_run(*row_frame.run),
+                  bg="#ff6b6b", fg="white", relief="flat", cursor="hand2").pack(side="right", padx=(5, 0))
+        tk.Button(row_frame, text="✏️", command=lambda: self.edit_run(*row_frame.run),
+                  bg="#4ecdc4", fg="white", relief="flat", cursor="hand2").pack(side="right")
+        return row_frame, label
+
+    def _build_detail_view(self):
+        detail = tk.Toplevel(self)
         detail.geometry("600x450")
-        t = THEME[self.mode]
-        detail.configure(bg=t["bg"])
+        self._themed(detail, bg="bg")
+        # Tutup = sembunyikan, supaya jendela bisa dipakai lagi
+        detail.protocol("WM_DELETE_WINDOW", detail.withdraw)
+        detail.bind("<Control-z>", lambda e: self.undo_run())
 
-        main_frame = tk.Frame(detail, bg=t["bg"])
+        main_frame = self._themed(tk.Frame(detail), bg="bg")
         main_frame.pack(expand=True, fill="both")
 
-        tk.Label(main_frame, text=f"Detail Tanggal {tanggal}", bg=t["bg"], fg="#ffd166",
-                 font=("Arial",14,"bold")).pack(pady=15)
+        title = self._themed(tk.Label(main_frame, fg="#ffd166",
+                         font=("Arial",14,"bold")), bg="bg")
+        title.pack(pady=15)
 
-        center_frame = tk.Frame(main_frame, bg=t["bg"])
+        center_frame = self._themed(tk.Frame(main_frame), bg="bg")
         center_frame.pack(expand=True)
 
-        container = tk.Frame(center_frame, bg=t["frame"], padx=20, pady=20)
+        container = self._themed(tk.Frame(center_frame, padx=20, pady=20), bg="frame")
         container.pack()
-
-        total_jarak = 0
-        for key, value in self.daily_distances.items():
-            if key.startswith(tanggal):
-                total_jarak += value
         
-        target_frame = tk.Frame(container, bg=t["card"], padx=10, pady=8)
+        target_frame = self._themed(tk.Frame(container, padx=10, pady=8), bg="card")
         target_frame.pack(fill="x", pady=5)
-        tk.Label(target_frame, text=f"Total Jarak: {total_jarak:.1f} km", 
-                 bg=t["card"], fg=t["fg"], font=("Arial",10, "bold")).pack()
-        
-        if tanggal in self.history:
-            for item in self.history[tanggal]:
-                row_frame = tk.Frame(container, bg=t["card"], padx=10, pady=8)
-                row_frame.pack(fill="x", pady=4)
+        total = self._themed(tk.Label(target_frame, font=("Arial",10, "bold")), bg="card", fg="fg")
+        total.pack()
+        periode = self._themed(tk.Label(target_frame, fg="#4ecdc4", font=("Arial",9)), bg="card")
+        periode.pack()
+        undo = tk.Button(target_frame, text="↶ Batalkan (Ctrl+Z)", command=self.undo_run,
+                         bg="#ffd166", fg="black", font=("Arial", 9), cursor="hand2")
+        undo.pack(pady=(5, 0))
+        return {"win": detail, "title": title, "total": total, "periode": periode,
+                "container": container, "rows": [], "undo": undo, "tanggal": None}
 
-                info = f"{item['time']} | {item['jarak']}km | {item['waktu']}m | Pace {item['pace']:.2f} | {item['kal']:.0f} cal"
-                
-                label = tk.Label(row_frame, text=info, bg=t["card"], fg=t["fg"],
-                         font=("Arial",10))
-                label.pack(expand=True)
+    # ===== GRAFIK =====
+    def show_grafik(self):
+        """Tren jarak/pace/kalori pada satu Canvas (item gambar, bukan widget)"""
+        view = self._views.get("Grafik")
+        if view is None:
+            view = self._views["Grafik"] = self._build_grafik_view()
+        self._draw_grafik()
+
+    def _build_grafik_view(self):
+        tab = self.tabs["Grafik"]
+        f = self._themed(tk.Frame(tab, padx=15, pady=15), bg="frame")
+        f.pack(fill="both", expand=True)
+        self._themed(tk.Label(f, text="Geser: seret | Zoom: roda mouse | Reset: klik ganda",
+                              font=("Arial", 9)), bg="frame", fg="fg").pack(anchor="w")
+        canvas = self._themed(tk.Canvas(f, highlightthickness=0), bg="frame")
+        canvas.pack(fill="both", expand=True)
+
+        # Item dibuat sekali; tiap redraw cukup coords()/itemconfig()
+        panels = {}
+        for metric, judul, warna in GRAFIK_PANELS:
+            panels[metric] = {
+                "frame": canvas.create_rectangle(0, 0, 0, 0, outline="#666666"),
+                "line": canvas.create_line(0, 0, 0, 0, fill=warna, width=2),
+                "title": canvas.create_text(0, 0, anchor="nw", font=("Arial", 9, "bold"), fill=warna),
+                "max": canvas.create_text(0, 0, anchor="ne", font=("Arial", 8)),
+                "min": canvas.create_text(0, 0, anchor="se", font=("Arial", 8)),
+            }
+        ticks = [canvas.create_text(0, 0, anchor="n", font=("Arial", 8)) for _ in range(5)]
+        empty = canvas.create_text(0, 0, text="Belum ada riwayat", font=("Arial", 11))
+
+        view = {"canvas": canvas, "panels": panels, "ticks": ticks, "empty": empty,
+                "range": None, "drag": None, "job": None}
+        canvas.bind("<Configure>", lambda e: self._schedule_grafik())
+        canvas.bind("<ButtonPress-1>", self._grafik_drag_start)
+        canvas.bind("<B1-Motion>", self._grafik_drag)
+        canvas.bind("<Double-Button-1>", lambda e: self._grafik_reset())
+        canvas.bind("<MouseWheel>", self._grafik_zoom)
+        canvas.bind("<Button-4>", self._grafik_zoom)
+        canvas.bind("<Button-5>", self._grafik_zoom)
+        return view
+
+    def _schedule_grafik(self):
+        """Gabungkan event drag/zoom/resize menjadi satu redraw per idle"""
+        view = self._views["Grafik"]
+        if view["job"] is None:
+            view["job"] = self.after_idle(self._draw_grafik)
+
+    def _grafik_geometry(self, canvas):
+        """(kiri, kanan, lebar_plot) area plot dalam piksel"""
+        left, right = 60, canvas.winfo_width() - 15
+        return left, right, right - left
+
+    def _draw_grafik(self):
+        view = self._views["Grafik"]
+        view["job"] = None
+        canvas = view["canvas"]
+        left, right, plot_w = self._grafik_geometry(canvas)
+        height = canvas.winfo_height()
+        if plot_w < 50 or height < 120:
+            return
+
+        if self._chart_series is None:
+            from charts import ChartSeries
+            self._chart_series = ChartSeries.build(self.runs.daily_rows())
+        series = self._chart_series
+        fg = THEME[self.mode]["fg"]
+        canvas.coords(view["empty"], (left + right) / 2, height / 2)
+        canvas.itemconfig(view["empty"], fill=fg, state="hidden" if series else "normal")
+        state = "normal" if series else "hidden"
+        for items in view["panels"].values():
+            for item in items.values():
+                canvas.itemconfig(item, state=state)
+        for item in view["ticks"]:
+            canvas.itemconfig(item, state=state)
+        if not series:
+            return
+
+        if view["range"] is None:
+            first, last = series.span()
+            view["range"] = [first - 1, last + 1]
+        x0, x1 = view["range"]
+        scale = plot_w / (x1 - x0)
+
+        panel_h = (height - 30) / len(GRAFIK_PANELS)
+        for k, (metric, judul, _) in enumerate(GRAFIK_PANELS):
+            items = view["panels"][metric]
+            top, bottom = k * panel_h + 5, (k + 1) * panel_h - 5
+            level, xs, ys = series.visible(metric, x0, x1, plot_w)
+            lo, hi = min(ys), max(ys)
+            if hi - lo < 1e-9:
+                lo, hi = lo - 1, hi + 1
+            inner_top, inner_h = top + 18, bottom - top - 22
+            px = [left + (x - x0) * scale for x in xs]
+            py = [inner_top + (hi - y) / (hi - lo) * inner_h for y in ys]
+            self._clip_line(px, py, left, right)
+            coords = [v for point in zip(px, py) for v in point]
+            if len(coords) == 2:
+                coords *= 2
+            canvas.coords(items["line"], *coords)
+            canvas.coords(items["frame"], left, top, right, bottom)
+            canvas.coords(items["title"], left + 5, top + 3)
+            canvas.itemconfig(items["title"], text=f"{judul} per {level}")
+            canvas.coords(items["max"], left - 5, inner_top)
+            canvas.itemconfig(items["max"], text=f"{hi:.1f}", fill=fg)
+            canvas.coords(items["min"], left - 5, inner_top + inner_h)
+            canvas.itemconfig(items["min"], text=f"{lo:.1f}", fill=fg)
+        for i, item in enumerate(view["ticks"]):
+            x = x0 + (x1 - x0) * (i + 0.5) / len(view["ticks"])
+            canvas.coords(item, left + (x - x0) * scale, height - 22)
+            canvas.itemconfig(item, text=date.fromordinal(max(1, int(x))).isoformat(), fill=fg)
+
+    @staticmethod
+    def _clip_line(px, py, left, right):
+        """Potong titik ujung di luar area plot (Canvas tidak punya clipping)"""
+        if len(px) < 2:
+            return
+        for a, b, edge in ((0, 1, left), (-1, -2, right)):
+            if (px[a] < edge if a == 0 else px[a] > edge) and px[a] != px[b]:
+                t = (edge - px[b]) / (px[a] - px[b])
+                py[a] = py[b] + (py[a] - py[b]) * t
+                px[a] = edge
+
+    def _grafik_drag_start(self, event):
+        view = self._views["Grafik"]
+        if view["range"] is not None:
+            view["drag"] = (event.x, list(view["range"]))
+
+    def _grafik_drag(self, event):
+        view = self._views["Grafik"]
+        if view["drag"] is None:
+            return
+        start_x, (x0, x1) = view["drag"]
+        _, _, plot_w = self._grafik_geometry(view["canvas"])
+        geser = (start_x - event.x) * (x1 - x0) / max(1, plot_w)
+        view["range"] = [x0 + geser, x1 + geser]
+        self._schedule_grafik()
+
+    def _grafik_zoom(self, event):
+        """Zoom di sekitar posisi kursor; rentang minimal 14 hari"""
+        view = self._views["Grafik"]
+        if view["range"] is None:
+            return "break"
+        left, _, plot_w = self._grafik_geometry(view["canvas"])
+        x0, x1 = view["range"]
+        faktor = 0.8 if event.num == 4 or event.delta > 0 else 1.25
+        pusat = x0 + (x1 - x0) * min(1.0, max(0.0, (event.x - left) / max(1, plot_w)))
+        lebar = max(14.0, (x1 - x0) * faktor)
+        rasio = (pusat - x0) / (x1 - x0)
+        view["range"] = [pusat - lebar * rasio, pusat + lebar * (1 - rasio)]
+        self._schedule_grafik()
+        return "break"
+
+    def _grafik_reset(self):
+        self._views["Grafik"]["range"] = None
+        self._schedule_grafik()
+
+
+def report_first_paint(app, init_done):
+    """Cetak waktu import, __init__ dan sampai jendela pertama kali tergambar (stderr)"""
+    app.update_idletasks()
+    now = time.perf_counter()
+    print(f"startup: import {(_IMPORTED - _START) * 1000:.0f} ms | "
+          f"init {(init_done - _IMPORTED) * 1000:.0f} ms | "
+          f"first paint {(now - _START) * 1000:.0f} ms", file=sys.stderr)
+
+
+_IMPORTED = time.perf_counter()
 
-RunningApp().mainloop()
\ No newline at end of file
+# Guard wajib: worker ProcessPool (impor massal) meng-import ulang modul ini
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Run Analyzer Pro")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="simpan run di database SQLite (history dibaca lewat query)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="laporkan waktu sampai jendela pertama kali tergambar")
+    parser.add_argument("--trace", action="store_true",
+                        help="aktifkan instrumentasi sejak start (overlay: F12)")
+    args = parser.parse_args()
+    app = RunningApp(backend="sqlite" if args.sqlite else "log")
+    if args.trace:
+        app.enable_tracing()
+    if args.profile_startup:
+        init_done = time.perf_counter()
+        # after_idle pertama jalan setelah mainloop memproses event map/expose jendela
+        app.after_idle(report_first_paint, app, init_done)
+    app.mainloop()
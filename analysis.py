@@ -0,0 +1,269 @@
+"""Inti analisis lari tanpa GUI (bisa dipakai dari CLI / server headless)"""
+import copy
+import operator
+import sys
+from array import array
+from datetime import date
+
+from run_store import HARI_LIST
+
+# Koefisien kalori: kal = jarak (km) * berat (kg) * KOEF_KALORI
+KOEF_KALORI = 0.653
+
+SCHEDULE_DATA = {
+    "Senin": {
+        "latihan": "Lari Ringan",
+        "durasi": "30",
+        "target_jarak": 5.0,
+        "target_waktu": "30",
+        "tipe": "Pemanasan",
+        "tips": "Fokus pada pernapasan dan postur tubuh"
+    },
+    "Selasa": {
+        "latihan": "Interval Run",
+        "durasi": "45",
+        "target_jarak": 7.0,
+        "target_waktu": "45",
+        "tipe": "Kecepatan",
+        "tips": "Gunakan pola 5 menit cepat, 2 menit recovery"
+    },
+    "Rabu": {
+        "latihan": "Recovery Run",
+        "durasi": "25",
+        "target_jarak": 4.0,
+        "target_waktu": "25",
+        "tipe": "Pemulihan",
+        "tips": "Lari santai, dengarkan tubuh Anda"
+    },
+    "Kamis": {
+        "latihan": "Tempo Run",
+        "durasi": "40",
+        "target_jarak": 6.0,
+        "target_waktu": "40",
+        "tipe": "Ketahanan",
+        "tips": "Pertahankan pace konsisten sepanjang lari"
+    },
+    "Jumat": {
+        "latihan": "Cross Training",
+        "durasi": "35",
+        "target_jarak": 5.0,
+        "target_waktu": "35",
+        "tipe": "Variasi",
+        "tips": "Bisa kombinasi lari, jalan, atau latihan ringan"
+    },
+    "Sabtu": {
+        "latihan": "Long Run",
+        "durasi": "60",
+        "target_jarak": 10.0,
+        "target_waktu": "60",
+        "tipe": "Daya Tahan",
+        "tips": "Pertahankan pace konsisten sepanjang lari"
+    },
+    "Minggu": {
+        "latihan": "Rest Day",
+        "durasi": "0",
+        "target_jarak": 0.0,
+        "target_waktu": "0",
+        "tipe": "Pemulihan total",
+        "tips": "Istirahat untuk pemulihan otot"
+    }
+}
+
+
+def default_schedule():
+    """Salinan jadwal default supaya bisa diubah tanpa mengganggu aslinya"""
+    return copy.deepcopy(SCHEDULE_DATA)
+
+
+def hitung_metrik(jarak, waktu, berat):
+    """Kembalikan (pace menit/km, kecepatan km/jam, kalori)"""
+    pace = waktu / jarak
+    speed = (jarak / waktu) * 60
+    kal = jarak * berat * KOEF_KALORI
+    return pace, speed, kal
+
+
+def _numpy():
+    """NumPy opsional dan di-import saat pertama dipakai"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _as_array(values, np):
+    if np is None:
+        return values if isinstance(values, array) else array("d", values)
+    if isinstance(values, array):
+        # Tanpa salin: buffer array.array langsung dibaca NumPy
+        return np.frombuffer(values, dtype="f" if values.typecode == "f" else "d").astype(float, copy=False)
+    return np.asarray(values, dtype=float)
+
+
+def hitung_metrik_batch(jarak, waktu, berat, koef_kalori=KOEF_KALORI):
+    """Versi vektor dari hitung_metrik untuk banyak run sekaligus.
+
+    ``berat`` boleh berupa satu angka atau deret sepanjang ``jarak``.
+    Hasil berupa array NumPy jika tersedia, kalau tidak ``array('d')``;
+    keduanya float64 dan punya ``tobytes()``. Jarak 0 memberi pace 0.0,
+    waktu 0 memberi kecepatan 0.0 (di kedua jalur).
+    """
+    np = _numpy()
+    jarak, waktu = _as_array(jarak, np), _as_array(waktu, np)
+    if np is not None:
+        berat = _as_array(berat, np) if not isinstance(berat, (int, float)) else float(berat)
+        pace, speed = np.zeros_like(jarak), np.zeros_like(waktu)
+        np.divide(waktu, jarak, out=pace, where=jarak > 0)
+        np.divide(jarak, waktu, out=speed, where=waktu > 0)
+        return pace, speed * 60, jarak * berat * koef_kalori
+
+    if isinstance(berat, (int, float)):
+        kal = array("d", map((berat * koef_kalori).__mul__, jarak))
+    else:
+        kal = array("d", map(operator.mul, jarak, _as_array(berat, None)))
+        kal = array("d", map(koef_kalori.__mul__, kal))
+    if jarak and min(jarak) > 0 and min(waktu) > 0:
+        pace = array("d", map(operator.truediv, waktu, jarak))
+        speed = array("d", map((60.0).__mul__, map(operator.truediv, jarak, waktu)))
+    else:
+        pace = array("d", (w / j if j > 0 else 0.0 for w, j in zip(waktu, jarak)))
+        speed = array("d", (j / w * 60 if w > 0 else 0.0 for j, w in zip(jarak, waktu)))
+    return pace, speed, kal
+
+
+def persentase_jadwal_batch(total_jarak, dow, schedule=SCHEDULE_DATA):
+    """Persentase target jarak harian untuk deret (total_jarak, index hari)"""
+    target = [schedule[hari]["target_jarak"] for hari in HARI_LIST]
+    np = _numpy()
+    if np is not None:
+        total = _as_array(total_jarak, np)
+        t = np.take(np.asarray(target, dtype=float), np.asarray(dow, dtype=int))
+        out = np.zeros_like(total)
+        np.divide(total * 100, t, out=out, where=t > 0)
+        return out
+    return array("d", (j * 100 / target[d] if target[d] > 0 else 0.0
+                       for j, d in zip(total_jarak, dow)))
+
+
+def pencapaian_awal(schedule):
+    """Pencapaian kosong untuk satu hari jadwal"""
+    return {
+        "completed": False,
+        "actual_distance": 0.0,
+        "actual_time": 0.0,
+        "target_distance": schedule["target_jarak"],
+        "target_time": float(schedule["target_waktu"]),
+        "persentase_jarak": 0.0,
+        "persentase_waktu": 0.0,
+        "kontribusi_mingguan": 0.0
+    }
+
+
+def hitung_pencapaian(schedule, total_jarak, total_waktu, target_mingguan):
+    """Pencapaian satu hari dari total jarak/waktu; None untuk Rest Day"""
+    if schedule["latihan"] == "Rest Day":
+        return None
+    
+    # Target dari jadwal
+    target_jarak = schedule["target_jarak"]
+    target_waktu = float(schedule["target_waktu"])
+    
+    # Hitung persentase
+    persentase_jarak = (total_jarak / target_jarak) * 100 if target_jarak > 0 else 0
+    persentase_waktu = (total_waktu / target_waktu) * 100 if target_waktu > 0 else 0
+    
+    # Hitung kontribusi terhadap target mingguan
+    kontribusi_mingguan = (total_jarak / target_mingguan) * 100 if target_mingguan > 0 else 0
+    
+    return {
+        "completed": total_jarak >= target_jarak,
+        "actual_distance": total_jarak,
+        "actual_time": total_waktu,
+        "target_distance": target_jarak,
+        "target_time": target_waktu,
+        "persentase_jarak": persentase_jarak,
+        "persentase_waktu": persentase_waktu,
+        "kontribusi_mingguan": kontribusi_mingguan
+    }
+
+
+def analisis_aktivitas(activities, berat, target_mingguan, schedule=SCHEDULE_DATA):
+    """Hitung metrik tiap run dan pencapaian jadwal kumulatif per tanggal"""
+    totals = {}
+    for act in sorted(activities, key=lambda a: a["ts"]):
+        tanggal = act["tanggal"]
+        hari = HARI_LIST[date.fromisoformat(tanggal).weekday()]
+        b = act.get("berat", berat)
+        pace, speed, kal = hitung_metrik(act["jarak"], act["waktu"], b)
+        total = totals.setdefault(tanggal, [0.0, 0.0])
+        total[0] += act["jarak"]
+        total[1] += act["waktu"]
+        pencapaian = hitung_pencapaian(schedule[hari], total[0], total[1], target_mingguan) or {}
+        yield {
+            "tanggal": tanggal,
+            "ts": act["ts"],
+            "hari": hari,
+            "jarak": act["jarak"],
+            "waktu": act["waktu"],
+            "berat": b,
+            "pace": pace,
+            "speed": speed,
+            "kal": kal,
+            "total_jarak_harian": total[0],
+            "total_waktu_harian": total[1],
+            "completed": pencapaian.get("completed"),
+            "persentase_jarak": pencapaian.get("persentase_jarak"),
+            "persentase_waktu": pencapaian.get("persentase_waktu"),
+            "kontribusi_mingguan": pencapaian.get("kontribusi_mingguan")
+        }
+
+
+def main(argv=None):
+    """CLI: analisis file aktivitas secara batch dan tulis hasil JSON/CSV"""
+    # Import di sini supaya `import analysis` tetap ringan
+    import argparse
+    import csv
+    import json
+    import os
+    import importer
+
+    parser = argparse.ArgumentParser(description="Run Analyzer Pro - analisis batch tanpa GUI")
+    parser.add_argument("paths", nargs="+", help="file GPX/TCX/FIT/CSV atau folder")
+    parser.add_argument("--berat", type=float, required=True, help="berat badan (kg)")
+    parser.add_argument("--target", type=float, default=50.0, help="target mingguan (km)")
+    parser.add_argument("--format", choices=["json", "csv"], default="json")
+    parser.add_argument("-o", "--output", default="-", help="file output (default stdout)")
+    args = parser.parse_args(argv)
+
+    files = []
+    for path in args.paths:
+        files.extend(importer.find_files(path) if os.path.isdir(path) else [path])
+
+    activities = []
+    for path, acts, error in importer.iter_activities(files):
+        if error:
+            print(f"Gagal membaca {path}: {error}", file=sys.stderr)
+        activities.extend(acts)
+
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        rows = analisis_aktivitas(activities, args.berat, args.target)
+        if args.format == "json":
+            json.dump(list(rows), out, indent=2)
+            out.write("\n")
+        else:
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(out, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(row)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+"""Daftar atlet (roster), shard data per atlet dan leaderboard"""
+import heapq
+import json
+import os
+import re
+from collections import OrderedDict
+
+from analysis import default_schedule
+from run_store import Rollups
+from storage import DATA_DIR
+
+# Atlet "default" memakai folder data lama supaya riwayat sebelumnya tetap terbaca
+DEFAULT_ID = "default"
+
+
+class Roster:
+    """Profil semua atlet + ringkasan untuk leaderboard, disimpan di roster.json.
+
+    Data run tiap atlet ada di shard (folder) sendiri dan hanya dimuat saat
+    atlet dipilih. Atlet yang pernah dimuat diparkir di LRU berukuran
+    ``max_resident``; yang paling lama tidak dipakai dikeluarkan dari memori.
+    Leaderboard dihitung dari ringkasan per minggu yang diperbarui setiap run,
+    jadi tidak perlu memuat shard atlet lain.
+    """
+
+    def __init__(self, folder=DATA_DIR, max_resident=8):
+        self.folder = folder
+        self.path = os.path.join(folder, "roster.json")
+        self.max_resident = max_resident
+        self._resident = OrderedDict()   # id -> state atlet yang sedang diparkir
+
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        else:
+            data = {"active": DEFAULT_ID, "athletes": {}, "summary": {}}
+        self.active = data["active"]
+        self.athletes = data["athletes"]
+        self.summary = data["summary"]
+        if DEFAULT_ID not in self.athletes:
+            # Target None: pakai target dari snapshot data lama
+            self.athletes[DEFAULT_ID] = self._new_profile("Atlet Utama", None, None)
+
+    @staticmethod
+    def _new_profile(nama, berat, target_mingguan):
+        return {
+            "nama": nama,
+            "berat": berat,
+            "target_mingguan": target_mingguan,
+            "schedule": default_schedule()
+        }
+
+    # ===== PROFIL =====
+    def add(self, nama, berat=None, target_mingguan=50.0):
+        """Tambah atlet baru, kembalikan id-nya"""
+        base = re.sub(r"[^a-z0-9]+", "-", nama.lower()).strip("-") or "atlet"
+        athlete_id, n = base, 1
+        while athlete_id in self.athletes:
+            n += 1
+            athlete_id = f"{base}-{n}"
+        self.athletes[athlete_id] = self._new_profile(nama, berat, target_mingguan)
+        return athlete_id
+
+    def profile(self, athlete_id):
+        return self.athletes[athlete_id]
+
+    def names(self):
+        """[(id, nama)] urut nama"""
+        return sorted(((i, p["nama"]) for i, p in self.athletes.items()), key=lambda x: x[1].lower())
+
+    def shard_dir(self, athlete_id):
+        if athlete_id == DEFAULT_ID:
+            return self.folder
+        return os.path.join(self.folder, "athletes", athlete_id)
+
+    # ===== LRU ATLET YANG DIMUAT =====
+    def take(self, athlete_id):
+        """Ambil state atlet dari LRU (None jika belum/tidak lagi dimuat)"""
+        return self._resident.pop(athlete_id, None)
+
+    def park(self, athlete_id, state):
+        """Simpan state atlet ke LRU; kembalikan [(id, state)] yang dikeluarkan"""
+        self._resident[athlete_id] = state
+        self._resident.move_to_end(athlete_id)
+        evicted = []
+        while len(self._resident) > self.max_resident:
+            evicted.append(self._resident.popitem(last=False))
+        return evicted
+
+    def resident(self):
+        return list(self._resident.items())
+
+    # ===== RINGKASAN & LEADERBOARD =====
+    def record_run(self, athlete_id, tanggal, jarak, runs=1):
+        """Tambah run ke ringkasan (run dihapus: jarak negatif, runs=-1)"""
+        s = self.summary.setdefault(athlete_id, {"total": 0.0, "runs": 0, "weeks": {}})
+        s["total"] += jarak
+        s["runs"] += runs
+        week = Rollups.week_key(tanggal)
+        s["weeks"][week] = s["weeks"].get(week, 0.0) + jarak
+
+    def sync_summary(self, athlete_id, rollups):
+        """Isi ringkasan dari rollups untuk atlet yang datanya dibuat sebelum ada roster"""
+        if athlete_id in self.summary or not rollups.weeks:
+            return
+        self.summary[athlete_id] = {
+            "total": sum(v[0] for v in rollups.years.values()),
+            "runs": sum(v[2] for v in rollups.years.values()),
+            "weeks": {k: v[0] for k, v in rollups.weeks.items()},
+        }
+
+    def leaderboard(self, week=None, limit=20):
+        """[(nama, km)] terbesar untuk satu minggu ISO, atau total jika week None"""
+        def km(item):
+            s = item[1]
+            return s["weeks"].get(week, 0.0) if week else s["total"]
+        top = heapq.nlargest(limit, self.summary.items(), key=km)
+        return [(self.athletes[i]["nama"], km((i, s))) for i, s in top if i in self.athletes]
+
+    # ===== SIMPAN =====
+    def dumps(self):
+        """Serialisasi di thread Tk; penulisan file bisa di thread lain"""
+        return json.dumps({"active": self.active, "athletes": self.athletes,
+                           "summary": self.summary}, separators=(",", ":"))
+
+    def write(self, text):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, self.path)
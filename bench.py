@@ -0,0 +1,256 @@
+"""Benchmark jalur panas RunningApp untuk berbagai ukuran history.
+
+Contoh:
+    python bench.py --sizes 10,10000,100000 --output bench.json
+    xvfb-run python bench.py --check          # server tanpa layar
+
+Benchmark GUI butuh display (X / Xvfb). Tanpa display hanya benchmark data
+(RunStore, DayTotals, Rollups, metrik batch) yang dijalankan.
+"""
+import argparse
+import importlib.util
+import itertools
+import json
+import math
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from analysis import default_schedule, hitung_metrik, hitung_metrik_batch
+from charts import ChartSeries
+from plans import ScheduleEngine
+from records import RecordIndex
+from run_store import DayTotals, HARI_LIST, Rollups, RunStore
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(HERE, "Run- Analyze- pro.py")
+THRESHOLDS_PATH = os.path.join(HERE, "bench_thresholds.json")
+
+
+def synthetic_runs(n, seed=1, runs_per_day=1.5):
+    """Run sintetis terurut waktu, berakhir hari ini"""
+    rng = random.Random(seed)
+    days = max(1, int(n / runs_per_day))
+    start = datetime.now().replace(hour=6, minute=0, second=0, microsecond=0) - timedelta(days=days)
+    stamps = sorted(start + timedelta(days=i * days // n, minutes=rng.randint(0, 600))
+                    for i in range(n))
+    for t in stamps:
+        jarak = round(rng.uniform(2, 21), 2)
+        yield {
+            "tanggal": t.strftime("%Y-%m-%d"),
+            "ts": t.timestamp(),
+            "jarak": jarak,
+            "waktu": round(jarak * rng.uniform(4.5, 7.5), 1),
+            "berat": 65.0,
+            "hari": HARI_LIST[t.weekday()],
+            "target_mingguan": 50.0,
+        }
+
+
+def measure(fn, repeat=20):
+    """Latensi per panggilan (ms) + puncak alokasi memori (KiB)"""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times.sort()
+    return {
+        "median_ms": statistics.median(times),
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))],
+        "peak_kib": peak / 1024,
+    }
+
+
+# ===== BENCHMARK DATA (tanpa GUI) =====
+def bench_data(n):
+    runs = list(synthetic_runs(n))
+    store, days, rollups, records = RunStore(), DayTotals(), Rollups(), RecordIndex()
+    for r in runs:
+        pace, speed, kal = hitung_metrik(r["jarak"], r["waktu"], r["berat"])
+        store.append(r["tanggal"], r["ts"], r["jarak"], r["waktu"], r["berat"],
+                     pace, speed, kal, r["hari"])
+        days.add(r["tanggal"], r["jarak"], r["waktu"])
+        rollups.add(r["tanggal"], r["jarak"], r["waktu"])
+        records.add(r["ts"], r["tanggal"], r["jarak"], pace, rollups.week(r["tanggal"])[0])
+
+    last = runs[-1]
+    first_day = datetime.fromtimestamp(runs[0]["ts"]).date()
+    last_day = datetime.fromtimestamp(last["ts"]).date()
+    counter = iter(range(10 ** 9))
+    chart = ChartSeries.build(store.daily_rows())
+
+    def append_run():
+        i = next(counter)
+        store.append(last["tanggal"], last["ts"] + i, 5.0, 30.0, 65.0, 6.0, 10.0, 212.0, last["hari"])
+        days.add(last["tanggal"], 5.0, 30.0)
+        rollups.add(last["tanggal"], 5.0, 30.0)
+        records.add(last["ts"] + i, last["tanggal"], 5.0, 6.0, rollups.week(last["tanggal"])[0])
+
+    mid = runs[len(runs) // 2]
+    schedule = ScheduleEngine(default_schedule())
+    kriteria = {"hari": ["Sabtu", "Minggu"], "jarak": (10.0, None), "pace": (None, 6.5)}
+
+    def history_query():
+        # Ringkasan + satu layar hasil, seperti panel filter History
+        ringkasan, rows = store.query(kriteria, schedule, "pace", False)
+        return ringkasan, list(itertools.islice(rows, 60))
+
+    def edit_run():
+        # Koreksi run lama: kontribusinya dikurangi lalu run dimasukkan lagi
+        tanggal, ts = mid["tanggal"], mid["ts"]
+        old = store.get(tanggal, ts)
+        days.remove(tanggal, old["jarak"], old["waktu"])
+        rollups.remove(tanggal, old["jarak"], old["waktu"])
+        records.remove(ts, tanggal, old["jarak"], old["pace"], rollups.week(tanggal)[0])
+        store.update(tanggal, ts, old["jarak"], old["waktu"], old["berat"], old["pace"],
+                     old["speed"], old["kal"], old["hari"])
+        days.add(tanggal, old["jarak"], old["waktu"])
+        rollups.add(tanggal, old["jarak"], old["waktu"])
+        records.add(ts, tanggal, old["jarak"], old["pace"], rollups.week(tanggal)[0])
+
+    return {
+        "store_append": measure(append_run),
+        "run_edit": measure(edit_run),
+        "day_lookup": measure(lambda: days.day(last["tanggal"])),
+        "range_total": measure(lambda: days.range_total("jarak", first_day, last_day)),
+        "week_rollup": measure(lambda: rollups.week(last["tanggal"])),
+        "date_rows": measure(lambda: list(store.rows_on(last["tanggal"]))),
+        "history_query": measure(history_query),
+        "records_query": measure(lambda: (records.best_pace(), records.best_week(), records.trend(days))),
+        "records_rebuild": measure(lambda: RecordIndex.build(store.metric_rows(), rollups), repeat=3),
+        "chart_levels": measure(lambda: ChartSeries.build(store.daily_rows()), repeat=3),
+        "chart_visible": measure(lambda: (chart._cache.clear(), chart.visible("pace", *chart.span(), 700))),
+        "metrik_batch": measure(lambda: hitung_metrik_batch(store.cols["jarak"], store.cols["waktu"],
+                                                            store.cols["berat"]), repeat=3),
+    }
+
+
+# ===== BENCHMARK GUI =====
+def load_app_module():
+    spec = importlib.util.spec_from_file_location("run_analyzer_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bench_gui(module, n):
+    with tempfile.TemporaryDirectory() as folder:
+        app = module.RunningApp(data_dir=folder)
+        app.withdraw()
+        # Tab dibangun saat dibuka; benchmark butuh semuanya
+        for name in app.tabs:
+            app._build_tab(name)
+        try:
+            with app.runs.bulk():
+                for rec in synthetic_runs(n):
+                    app._apply_run(rec)
+            app.show_all()
+            app.update()
+            tanggal = app.runs.date_at(0, reverse=True)
+
+            def process():
+                app._process_analysis(5.0, 30.0, 65.0, "Senin")
+                app.update_idletasks()
+
+            def date_detail():
+                app.show_date_detail(tanggal)
+                app.update_idletasks()
+
+            def theme():
+                app.toggle_theme()
+                app.update_idletasks()
+
+            return {
+                "_process_analysis": measure(process),
+                "update_jadwal_display": measure(app.update_jadwal_display),
+                "show_history": measure(app.show_history),
+                "show_date_detail": measure(date_detail),
+                "apply_theme": measure(theme, repeat=6),
+            }
+        finally:
+            app.on_close()
+
+
+def scaling(results, sizes):
+    """Eksponen log-log latensi terhadap ukuran history (1 = linear)"""
+    if len(sizes) < 2:
+        return {}
+    lo, hi = str(sizes[0]), str(sizes[-1])
+    out = {}
+    for path in results[lo]:
+        a, b = results[lo][path]["median_ms"], results[hi][path]["median_ms"]
+        if a > 0 and b > 0:
+            out[path] = math.log(b / a) / math.log(sizes[-1] / sizes[0])
+    return out
+
+
+def check_thresholds(report, thresholds):
+    """Daftar pelanggaran batas median_ms dari bench_thresholds.json"""
+    failures = []
+    for size, paths in thresholds.items():
+        for path, limit in paths.items():
+            for group in ("data", "gui"):
+                result = report[group].get(size, {}).get(path)
+                if result and result["median_ms"] > limit:
+                    failures.append(f"{path} @ {size} run: {result['median_ms']:.2f} ms > {limit} ms")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark jalur panas Run Analyzer Pro")
+    parser.add_argument("--sizes", default="10,10000,100000",
+                        help="ukuran history dipisah koma (mis. 10,10000,1000000)")
+    parser.add_argument("--output", help="tulis hasil JSON ke file ini (default stdout)")
+    parser.add_argument("--no-gui", action="store_true", help="lewati benchmark GUI")
+    parser.add_argument("--check", action="store_true",
+                        help="bandingkan dengan bench_thresholds.json, exit 1 jika lebih lambat")
+    args = parser.parse_args(argv)
+    sizes = [int(x) for x in args.sizes.split(",")]
+
+    report = {"sizes": sizes, "data": {}, "gui": {}, "gui_skipped": None}
+    for n in sizes:
+        print(f"data  {n:>9} run ...", file=sys.stderr)
+        report["data"][str(n)] = bench_data(n)
+
+    if not args.no_gui:
+        try:
+            module = load_app_module()
+            for n in sizes:
+                print(f"gui   {n:>9} run ...", file=sys.stderr)
+                report["gui"][str(n)] = bench_gui(module, n)
+        except Exception as e:
+            # Biasanya tidak ada display; jalankan lewat xvfb-run
+            report["gui_skipped"] = str(e)
+            print(f"Benchmark GUI dilewati: {e}", file=sys.stderr)
+
+    report["scaling"] = {group: scaling(report[group], sizes)
+                         for group in ("data", "gui") if report[group]}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.check:
+        with open(THRESHOLDS_PATH, encoding="utf-8") as f:
+            failures = check_thresholds(report, json.load(f))
+        for msg in failures:
+            print("REGRESI:", msg, file=sys.stderr)
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
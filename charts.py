@@ -0,0 +1,182 @@
+"""Data grafik tren: level agregat hari/minggu/bulan + downsampling LTTB"""
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date
+
+LEVELS = ("hari", "minggu", "bulan")
+METRICS = ("jarak", "pace", "kal")
+
+
+def _period(level, ordinal):
+    """Ordinal hari pertama periode (Senin untuk minggu, tanggal 1 untuk bulan)"""
+    if level == "minggu":
+        return ordinal - (ordinal - 1) % 7
+    if level == "bulan":
+        return date.fromordinal(ordinal).replace(day=1).toordinal()
+    return ordinal
+
+
+def lttb(xs, ys, n):
+    """Largest-Triangle-Three-Buckets: pilih ``n`` titik yang menjaga bentuk garis.
+
+    Titik pertama dan terakhir selalu ikut; dari tiap bucket diambil titik
+    yang membentuk segitiga terbesar dengan titik terpilih sebelumnya dan
+    rata-rata bucket berikutnya.
+    """
+    size = len(xs)
+    if n >= size or n < 3:
+        return list(xs), list(ys)
+    out_x, out_y = [xs[0]], [ys[0]]
+    every = (size - 2) / (n - 2)
+    a = 0
+    for i in range(n - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nxt_end = min(int((i + 2) * every) + 1, size)
+        avg_x = sum(xs[hi:nxt_end]) / (nxt_end - hi)
+        avg_y = sum(ys[hi:nxt_end]) / (nxt_end - hi)
+        ax, ay = xs[a], ys[a]
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((ax - avg_x) * (ys[j] - ay) - (ax - xs[j]) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = j, area
+        out_x.append(xs[best])
+        out_y.append(ys[best])
+        a = best
+    out_x.append(xs[-1])
+    out_y.append(ys[-1])
+    return out_x, out_y
+
+
+class ChartSeries:
+    """Deret jarak/pace/kalori pada tiga level agregat.
+
+    Level minggu dan bulan dijumlahkan sekali dari level hari saat dibangun,
+    run baru di ujung deret cukup menambah elemen terakhir tiap level.
+    Untuk rentang yang terlihat dipilih level paling halus yang jumlah
+    titiknya masih <= ``POINTS_PER_PX`` x lebar, lalu di-LTTB ke sekitar
+    satu titik per dua piksel. Hasil downsampling di-cache (LRU) per
+    (level, metrik, rentang indeks, lebar), jadi redraw tanpa pan/zoom
+    (ganti tema, resize bolak-balik, data tidak berubah) tidak menghitung ulang.
+    """
+
+    POINTS_PER_PX = 4
+
+    def __init__(self, cache_size=48):
+        self.levels = {level: {"x": array("l"), "jarak": array("d"), "waktu": array("d"),
+                               "kal": array("d"), "pace": array("d")} for level in LEVELS}
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __bool__(self):
+        return len(self.levels["hari"]["x"]) > 0
+
+    @classmethod
+    def build(cls, daily_rows):
+        """Dari (tanggal, jarak, waktu, kal) per hari, urut tanggal"""
+        series = cls()
+        day = series.levels["hari"]
+        for tanggal, jarak, waktu, kal in daily_rows:
+            day["x"].append(date.fromisoformat(tanggal).toordinal())
+            day["jarak"].append(jarak)
+            day["waktu"].append(waktu)
+            day["kal"].append(kal)
+        for level in LEVELS[1:]:
+            series._rollup(level)
+        for data in series.levels.values():
+            data["pace"] = array("d", (w / j if j > 0 else 0.0 for j, w in zip(data["jarak"], data["waktu"])))
+        return series
+
+    def _rollup(self, level):
+        """Jumlahkan level hari ke minggu/bulan; awal periode dihitung hanya saat melewati batas"""
+        day, data = self.levels["hari"], self.levels[level]
+        end = None
+        for x, jarak, waktu, kal in zip(day["x"], day["jarak"], day["waktu"], day["kal"]):
+            if end is None or x >= end:
+                start = _period(level, x)
+                end = start + 7 if level == "minggu" else _period(level, start + 31)
+                data["x"].append(start)
+                data["jarak"].append(jarak)
+                data["waktu"].append(waktu)
+                data["kal"].append(kal)
+            else:
+                data["jarak"][-1] += jarak
+                data["waktu"][-1] += waktu
+                data["kal"][-1] += kal
+
+    def add(self, tanggal, jarak, waktu, kal):
+        """Tambah satu run di ujung deret, O(1) per level.
+
+        Kembalikan False jika run lebih lama dari tanggal terakhir (deret
+        harus dibangun ulang).
+        """
+        ordinal = date.fromisoformat(tanggal).toordinal()
+        days = self.levels["hari"]["x"]
+        if days and ordinal < days[-1]:
+            return False
+        self._append(ordinal, jarak, waktu, kal)
+        self._cache.clear()
+        return True
+
+    def remove(self, tanggal, jarak, waktu, kal):
+        """Kurangi satu run dari tiap level, O(log n) + hapus titik yang jadi kosong.
+
+        Kembalikan False jika tanggal itu tidak ada di deret.
+        """
+        ordinal = date.fromisoformat(tanggal).toordinal()
+        for level, data in self.levels.items():
+            x = _period(level, ordinal)
+            i = bisect_left(data["x"], x)
+            if i == len(data["x"]) or data["x"][i] != x:
+                return False
+            data["jarak"][i] -= jarak
+            data["waktu"][i] -= waktu
+            data["kal"][i] -= kal
+            if data["jarak"][i] <= 1e-9:
+                for col in data.values():
+                    del col[i]
+            else:
+                data["pace"][i] = data["waktu"][i] / data["jarak"][i]
+        self._cache.clear()
+        return True
+
+    def _append(self, ordinal, jarak, waktu, kal):
+        for level, data in self.levels.items():
+            x = _period(level, ordinal)
+            if data["x"] and data["x"][-1] == x:
+                data["jarak"][-1] += jarak
+                data["waktu"][-1] += waktu
+                data["kal"][-1] += kal
+            else:
+                for name, value in (("x", x), ("jarak", jarak), ("waktu", waktu), ("kal", kal), ("pace", 0.0)):
+                    data[name].append(value)
+            if data["jarak"][-1] > 0:
+                data["pace"][-1] = data["waktu"][-1] / data["jarak"][-1]
+
+    def span(self):
+        """(ordinal pertama, ordinal terakhir) seluruh data"""
+        x = self.levels["hari"]["x"]
+        return x[0], x[-1]
+
+    def visible(self, metric, x0, x1, width):
+        """(level, xs, ys) yang digambar untuk rentang ordinal x0..x1 selebar ``width`` px"""
+        for level in LEVELS:
+            xs = self.levels[level]["x"]
+            # Satu titik di luar tiap sisi supaya garis menyentuh tepi area
+            i = max(0, bisect_left(xs, x0) - 1)
+            j = min(len(xs), bisect_right(xs, x1) + 1)
+            if j - i <= width * self.POINTS_PER_PX:
+                break
+
+        key = (level, metric, i, j, width)
+        hit = self._cache.get(key)
+        if hit is not None:
+            self._cache.move_to_end(key)
+            return hit
+        data = self.levels[level]
+        result = (level, *lttb(data["x"][i:j], data[metric][i:j], max(3, width // 2)))
+        self._cache[key] = result
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return result
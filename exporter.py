@@ -0,0 +1,120 @@
+"""Ekspor riwayat run + pencapaian jadwal harian ke CSV / JSON Lines / Parquet"""
+import csv
+import json
+import os
+from datetime import datetime
+
+from analysis import hitung_pencapaian
+from run_store import HARI_LIST
+
+FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+
+# Jumlah baris per potongan: memori penulis (baris/dict hasil) dibatasi oleh ini.
+# Sumber ``RunStore`` tetap menyalin kolom array rentang ekspor sekali di awal;
+# ``SqliteRuns`` membaca per potongan lewat fetchmany.
+EXPORT_CHUNK = 5000
+
+# Kolom hasil ekspor (sama dengan keluaran ``analysis.analisis_aktivitas`` + jam)
+FIELDS = ("tanggal", "jam", "hari", "jarak", "waktu", "berat", "pace", "speed", "kal",
+          "total_jarak_harian", "total_waktu_harian", "completed",
+          "persentase_jarak", "persentase_waktu", "kontribusi_mingguan")
+
+
+def _with_achievements(chunks, schedule, target_mingguan):
+    """Tambahkan total harian dan pencapaian jadwal kumulatif ke tiap potongan.
+
+    Potongan urut (tanggal, ts), jadwal cukup dihitung sambil jalan dengan
+    total hari berjalan yang di-reset saat tanggal berganti. ``schedule``
+    adalah ``plans.ScheduleEngine`` (rencana per minggu ISO).
+    """
+    tanggal_aktif, jadwal, jarak_hari, waktu_hari = None, None, 0.0, 0.0
+    for c in chunks:
+        n = len(c["ts"])
+        out = {name: [] for name in FIELDS}
+        out.update(tanggal=c["tanggal"], jarak=c["jarak"], waktu=c["waktu"], berat=c["berat"],
+                   pace=c["pace"], speed=c["speed"], kal=c["kal"])
+        for i in range(n):
+            tanggal, hari = c["tanggal"][i], HARI_LIST[c["dow"][i]]
+            if tanggal != tanggal_aktif:
+                tanggal_aktif, jarak_hari, waktu_hari = tanggal, 0.0, 0.0
+                jadwal = schedule.jadwal(tanggal)
+            jarak_hari += c["jarak"][i]
+            waktu_hari += c["waktu"][i]
+            pencapaian = hitung_pencapaian(jadwal, jarak_hari, waktu_hari, target_mingguan) or {}
+            out["jam"].append(datetime.fromtimestamp(c["ts"][i]).strftime("%H:%M"))
+            out["hari"].append(hari)
+            out["total_jarak_harian"].append(jarak_hari)
+            out["total_waktu_harian"].append(waktu_hari)
+            for key in ("completed", "persentase_jarak", "persentase_waktu", "kontribusi_mingguan"):
+                out[key].append(pencapaian.get(key))
+        yield out
+
+
+def _rows(chunk):
+    return zip(*(chunk[name] for name in FIELDS))
+
+
+def _write_csv(path, chunks):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for chunk in chunks:
+            writer.writerows(_rows(chunk))
+            yield len(chunk["tanggal"])
+
+
+def _write_jsonl(path, chunks):
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write("".join(json.dumps(dict(zip(FIELDS, row))) + "\n" for row in _rows(chunk)))
+            yield len(chunk["tanggal"])
+
+
+def _write_parquet(path, chunks):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Ekspor Parquet butuh paket pyarrow (pip install pyarrow)") from None
+
+    schema = pa.schema([
+        ("tanggal", pa.string()), ("jam", pa.string()), ("hari", pa.string()),
+        *((name, pa.float64()) for name in ("jarak", "waktu")),
+        ("berat", pa.float32()),
+        *((name, pa.float64()) for name in ("pace", "speed", "kal", "total_jarak_harian", "total_waktu_harian")),
+        ("completed", pa.bool_()),
+        *((name, pa.float64()) for name in ("persentase_jarak", "persentase_waktu", "kontribusi_mingguan")),
+    ])
+    # Satu row group per potongan, jadi memori tetap dibatasi EXPORT_CHUNK
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in chunks:
+            writer.write_table(pa.table({name: chunk[name] for name in FIELDS}, schema=schema))
+            yield len(chunk["tanggal"])
+
+
+WRITERS = {"csv": _write_csv, "jsonl": _write_jsonl, "parquet": _write_parquet}
+
+
+def export_runs(path, chunks, schedule, target_mingguan, fmt=None, progress=None):
+    """Tulis potongan kolom dari ``runs.export_chunks()`` ke ``path``.
+
+    Aman dijalankan di thread latar belakang. File ditulis ke ``.tmp`` lalu
+    di-rename, jadi ekspor yang gagal tidak meninggalkan file setengah jadi.
+    ``progress(jumlah_baris)`` dipanggil setelah tiap potongan ditulis.
+    Memori yang dibatasi potongan hanya sisi penulis; salinan kolom sumber
+    (lihat ``RunStore.export_chunks``) sudah dibuat sebelum fungsi ini jalan.
+    Kembalikan jumlah baris.
+    """
+    fmt = fmt or next((name for name, ext in FORMATS.items() if path.endswith(ext)), "csv")
+    tmp = path + ".tmp"
+    total = 0
+    try:
+        for n in WRITERS[fmt](tmp, _with_achievements(chunks, schedule, target_mingguan)):
+            total += n
+            if progress is not None:
+                progress(total)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return total
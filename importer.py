@@ -0,0 +1,197 @@
+"""Impor massal file aktivitas (GPX/TCX/FIT/CSV) dengan parsing streaming"""
+import csv
+import math
+import os
+import struct
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+
+from segments import SegmentEngine, analyze, from_laps
+
+EXTENSIONS = (".gpx", ".tcx", ".fit", ".csv")
+
+# Epoch FIT: 1989-12-31 00:00:00 UTC
+FIT_EPOCH = 631065600
+
+
+def _activity(start, jarak_km, waktu_menit, segments=None):
+    """Bentuk satu aktivitas; tanggal mengikuti zona waktu lokal seperti RunStore"""
+    ts = start.timestamp()
+    act = {
+        "tanggal": datetime.fromtimestamp(ts).strftime("%Y-%m-%d"),
+        "ts": ts,
+        "jarak": jarak_km,
+        "waktu": waktu_menit,
+    }
+    if segments is not None:
+        act["segments"] = segments
+    return act
+
+
+def _parse_time(text):
+    t = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    return t if t.tzinfo else t.astimezone()
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Jarak dua titik dalam km"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def parse_gpx(path):
+    """Jumlahkan jarak antar trackpoint (sekaligus split/best effort); elemen dibuang setelah dibaca"""
+    jarak, prev, start, end = 0.0, None, None, None
+    lat = lon = t = None
+    engine = SegmentEngine()
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        tag = _local(elem.tag)
+        if event == "start":
+            if tag == "trkpt":
+                lat, lon = float(elem.get("lat")), float(elem.get("lon"))
+            continue
+        if tag == "time" and lat is not None and elem.text:
+            t = _parse_time(elem.text)
+            start = start or t
+            end = t
+        elif tag == "trkpt":
+            if prev is not None:
+                jarak += haversine(prev[0], prev[1], lat, lon)
+            if t is not None:
+                engine.add(t.timestamp(), jarak)
+            prev, lat, t = (lat, lon), None, None
+            elem.clear()
+    if start is None or end <= start:
+        return []
+    return [_activity(start, jarak, (end - start).total_seconds() / 60, engine.summary())]
+
+
+def parse_tcx(path):
+    """Ambil total jarak/waktu dari setiap Lap (lap juga dipakai untuk split/best effort)"""
+    jarak_m, detik, start, laps = 0.0, 0.0, None, []
+    for _, elem in ET.iterparse(path, events=("end",)):
+        tag = _local(elem.tag)
+        if tag == "Lap":
+            lap = {}
+            for child in elem:
+                name = _local(child.tag)
+                if name in ("TotalTimeSeconds", "DistanceMeters"):
+                    lap[name] = float(child.text)
+            detik += lap.get("TotalTimeSeconds", 0.0)
+            jarak_m += lap.get("DistanceMeters", 0.0)
+            laps.append((lap.get("DistanceMeters", 0.0) / 1000, lap.get("TotalTimeSeconds", 0.0)))
+            if start is None and elem.get("StartTime"):
+                start = _parse_time(elem.get("StartTime"))
+            elem.clear()
+    if start is None or detik <= 0:
+        return []
+    return [_activity(start, jarak_m / 1000, detik / 60, analyze(from_laps(laps)))]
+
+
+def parse_fit(path):
+    """Parser FIT minimal: hanya pesan session (global 18) yang dibaca"""
+    activities = []
+    with open(path, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[8:12] != b".FIT":
+            raise ValueError("Bukan file FIT")
+        header_size = header[0]
+        data_size = struct.unpack("<I", header[4:8])[0]
+        f.seek(header_size)
+        end = header_size + data_size
+        definitions = {}
+
+        while f.tell() < end:
+            rh = f.read(1)[0]
+            if rh & 0x80:
+                # Compressed timestamp header: selalu pesan data
+                local, is_def, has_dev = (rh >> 5) & 0x03, False, False
+            else:
+                local, is_def, has_dev = rh & 0x0F, bool(rh & 0x40), bool(rh & 0x20)
+
+            if is_def:
+                _, arch = f.read(2)
+                order = ">" if arch else "<"
+                global_num, n = struct.unpack(order + "HB", f.read(3))
+                fields = [tuple(f.read(3)[:2]) for _ in range(n)]
+                if has_dev:
+                    n_dev = f.read(1)[0]
+                    fields += [(None, f.read(3)[1]) for _ in range(n_dev)]
+                definitions[local] = (global_num, order, fields)
+                continue
+
+            global_num, order, fields = definitions[local]
+            values = {}
+            for num, size in fields:
+                raw = f.read(size)
+                if global_num == 18 and num in (2, 7, 8, 9) and size == 4:
+                    values[num] = struct.unpack(order + "I", raw)[0]
+            if global_num == 18 and 2 in values and 9 in values:
+                detik = values.get(8, values.get(7, 0xFFFFFFFF))
+                if 0xFFFFFFFF in (values[2], values[9], detik):
+                    continue
+                start = datetime.fromtimestamp(values[2] + FIT_EPOCH, tz=timezone.utc)
+                activities.append(_activity(start, values[9] / 100 / 1000, detik / 1000 / 60))
+    return activities
+
+
+def parse_csv(path):
+    """CSV dengan kolom: tanggal, jam (opsional), jarak (km), waktu (menit), berat (opsional)"""
+    activities = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            start = datetime.fromisoformat(f"{row['tanggal']} {row.get('jam') or '00:00'}").astimezone()
+            act = _activity(start, float(row["jarak"]), float(row["waktu"]))
+            if row.get("berat"):
+                act["berat"] = float(row["berat"])
+            activities.append(act)
+    return activities
+
+
+PARSERS = {".gpx": parse_gpx, ".tcx": parse_tcx, ".fit": parse_fit, ".csv": parse_csv}
+
+
+def parse_file(path):
+    """Dijalankan di proses worker: kembalikan (path, aktivitas, error)"""
+    try:
+        parser = PARSERS[os.path.splitext(path)[1].lower()]
+        acts = [a for a in parser(path) if a["jarak"] > 0 and a["waktu"] > 0]
+        return path, acts, None
+    except Exception as e:
+        return path, [], str(e)
+
+
+def find_files(folder):
+    """Semua file aktivitas di dalam folder (rekursif)"""
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(EXTENSIONS):
+                yield os.path.join(root, name)
+
+
+def iter_activities(paths, workers=None, chunksize=16, executor=None, window=256):
+    """Parse file secara paralel; hasil di-yield per file sesuai urutan input.
+
+    ``executor`` boleh diisi ProcessPool yang sudah ada supaya tidak membuat
+    pool baru setiap impor. File dikirim ke pool per ``window`` file, jadi
+    hasil yang menunggu diambil paling banyak satu window (``Executor.map``
+    menjadwalkan semua input sekaligus).
+    """
+    paths = list(paths)
+    if executor is not None:
+        for i in range(0, len(paths), window):
+            yield from executor.map(parse_file, paths[i:i + window], chunksize=chunksize)
+        return
+    if len(paths) < 2:
+        yield from map(parse_file, paths)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for i in range(0, len(paths), window):
+            yield from pool.map(parse_file, paths[i:i + window], chunksize=chunksize)
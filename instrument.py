@@ -0,0 +1,135 @@
+"""Instrumentasi jalur panas: span waktu, hitungan widget dan lag event loop Tk"""
+import json
+import time
+import tkinter as tk
+from collections import deque
+
+
+class Tracer:
+    """Ukur method tertentu dari ``root`` hanya selama tracer aktif.
+
+    Saat ``enable()`` setiap method di ``methods`` dibungkus dan dipasang
+    sebagai atribut instance (menimpa method kelas); ``disable()`` menghapus
+    atribut itu lagi. Jadi saat mati tidak ada biaya sama sekali di jalur
+    panas, bukan sekadar satu cek ``if``.
+
+    Selama aktif juga dihitung widget yang dibuat/dihapus (per span) dan lag
+    event loop: selisih waktu antara jadwal ``after()`` dan saat dijalankan.
+    Event disimpan dalam format Chrome trace (chrome://tracing, Perfetto).
+    """
+
+    def __init__(self, root, methods, max_events=20000, lag_interval_ms=100):
+        self.root = root
+        self.methods = methods
+        self.lag_interval_ms = lag_interval_ms
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.stats = {}       # nama -> [jumlah, total_ms, max_ms, terakhir_ms, widget_dibuat, widget_dihapus]
+        self.lag = [0.0, 0.0, 0.0, 0]   # terakhir_ms, max_ms, total_ms, jumlah
+        self.created = 0
+        self.destroyed = 0
+        self._t0 = time.perf_counter()
+        self._widget_methods = None
+        self._lag_job = None
+        self._expected = 0.0
+
+    # ===== HIDUP / MATI =====
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for name in self.methods:
+            setattr(self.root, name, self._wrap(name, getattr(self.root, name)))
+        self._patch_widgets()
+        self._expected = time.perf_counter() + self.lag_interval_ms / 1000
+        self._lag_job = self.root.after(self.lag_interval_ms, self._tick)
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for name in self.methods:
+            self.root.__dict__.pop(name, None)
+        tk.BaseWidget.__init__, tk.BaseWidget.destroy = self._widget_methods
+        self._widget_methods = None
+        if self._lag_job is not None:
+            self.root.after_cancel(self._lag_job)
+            self._lag_job = None
+
+    def reset(self):
+        self.events.clear()
+        self.stats.clear()
+        self.lag = [0.0, 0.0, 0.0, 0]
+
+    # ===== PENGUKURAN =====
+    def _wrap(self, name, fn):
+        def traced(*args, **kwargs):
+            created, destroyed = self.created, self.destroyed
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, t0, time.perf_counter(),
+                             self.created - created, self.destroyed - destroyed)
+        return traced
+
+    def _record(self, name, t0, t1, created, destroyed):
+        ms = (t1 - t0) * 1000
+        s = self.stats.setdefault(name, [0, 0.0, 0.0, 0.0, 0, 0])
+        s[0] += 1
+        s[1] += ms
+        s[2] = max(s[2], ms)
+        s[3] = ms
+        s[4] += created
+        s[5] += destroyed
+        self.events.append({
+            "name": name, "ph": "X", "pid": 1, "tid": 1,
+            "ts": (t0 - self._t0) * 1e6, "dur": (t1 - t0) * 1e6,
+            "args": {"widgets_created": created, "widgets_destroyed": destroyed}
+        })
+
+    def _patch_widgets(self):
+        """Hitung semua widget Tk/ttk yang dibuat dan dihapus (dipasang di kelas dasar)"""
+        tracer = self
+        init, destroy = tk.BaseWidget.__init__, tk.BaseWidget.destroy
+        self._widget_methods = (init, destroy)
+
+        def counted_init(widget, *args, **kwargs):
+            tracer.created += 1
+            init(widget, *args, **kwargs)
+
+        def counted_destroy(widget):
+            tracer.destroyed += 1
+            destroy(widget)
+
+        tk.BaseWidget.__init__, tk.BaseWidget.destroy = counted_init, counted_destroy
+
+    def _tick(self):
+        now = time.perf_counter()
+        lag_ms = max(0.0, (now - self._expected) * 1000)
+        self.lag[0] = lag_ms
+        self.lag[1] = max(self.lag[1], lag_ms)
+        self.lag[2] += lag_ms
+        self.lag[3] += 1
+        self.events.append({"name": "loop_lag", "ph": "C", "pid": 1, "tid": 1,
+                            "ts": (now - self._t0) * 1e6, "args": {"lag_ms": lag_ms}})
+        self._expected = now + self.lag_interval_ms / 1000
+        self._lag_job = self.root.after(self.lag_interval_ms, self._tick)
+
+    # ===== LAPORAN =====
+    def summary(self):
+        """Ringkasan teks untuk overlay"""
+        lines = [f"{'span':<24}{'n':>6}{'rata2':>9}{'max':>9}{'akhir':>9}{'+w':>7}{'-w':>7}"]
+        for name, (n, total, mx, last, created, destroyed) in sorted(
+                self.stats.items(), key=lambda item: -item[1][1]):
+            lines.append(f"{name:<24}{n:>6}{total / n:>9.2f}{mx:>9.2f}{last:>9.2f}{created:>7}{destroyed:>7}")
+        last, mx, total, n = self.lag
+        lines.append("")
+        lines.append(f"lag event loop: {last:.1f} ms | rata2 {total / n if n else 0:.1f} ms | max {mx:.1f} ms")
+        lines.append(f"widget hidup (sejak aktif): {self.created - self.destroyed:+d}")
+        return "\n".join(lines)
+
+    def export(self, path):
+        """Tulis event sebagai file Chrome trace JSON"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": list(self.events), "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,196 @@
+"""Mode live: sampel jarak/posisi bertimestamp dari socket, named pipe atau file replay"""
+import json
+import os
+import select
+import socket
+from collections import deque
+from datetime import datetime
+
+from analysis import KOEF_KALORI
+from importer import haversine
+from segments import SegmentEngine
+
+SOURCES = ("socket", "pipe", "replay")
+
+
+class LiveRun:
+    """Statistik run yang sedang berjalan, O(1) (amortized) per sampel.
+
+    Jarak dan waktu total dijumlahkan berjalan; pace/kecepatan saat ini
+    dihitung dari jendela geser ``window_s`` detik terakhir (deque, sampel
+    lama dibuang dari depan). Split, best effort dan interval ikut dihitung
+    oleh ``SegmentEngine`` pada aliran yang sama.
+    """
+
+    def __init__(self, berat, window_s=30.0):
+        self.berat = berat
+        self.window_s = window_s
+        self.jarak = 0.0          # km
+        self.start_ts = None
+        self.ts = None
+        self.samples = 0
+        self._window = deque()    # (ts, jarak_kumulatif)
+        self._pos = None
+        self.segments = SegmentEngine()
+
+    def add(self, ts, jarak=None, lat=None, lon=None):
+        """Tambah satu sampel: ``jarak`` kumulatif (km) atau posisi ``lat``/``lon``"""
+        if self.ts is not None and ts <= self.ts:
+            return
+        if jarak is not None:
+            self.jarak = max(self.jarak, jarak)
+        elif lat is not None:
+            if self._pos is not None:
+                self.jarak += haversine(self._pos[0], self._pos[1], lat, lon)
+            self._pos = (lat, lon)
+        if self.start_ts is None:
+            self.start_ts = ts
+        self.ts = ts
+        self.samples += 1
+
+        self.segments.add(ts, self.jarak)
+        window = self._window
+        window.append((ts, self.jarak))
+        while len(window) > 2 and ts - window[1][0] >= self.window_s:
+            window.popleft()
+
+    @property
+    def waktu(self):
+        """Waktu berjalan dalam menit"""
+        return (self.ts - self.start_ts) / 60 if self.ts is not None else 0.0
+
+    @property
+    def kal(self):
+        return self.jarak * self.berat * KOEF_KALORI
+
+    def rolling(self):
+        """(pace menit/km, kecepatan km/jam) pada jendela terakhir, None jika belum bergerak"""
+        if len(self._window) < 2:
+            return None
+        (t0, d0), (t1, d1) = self._window[0], self._window[-1]
+        if d1 <= d0 or t1 <= t0:
+            return None
+        menit = (t1 - t0) / 60
+        return menit / (d1 - d0), (d1 - d0) / (menit / 60)
+
+
+def parse_sample(line):
+    """Satu baris -> dict sampel, atau None jika baris kosong/komentar.
+
+    Format yang diterima:
+      - JSON: {"ts": 1760000000.5, "jarak": 1.23} atau {"ts": ..., "lat": ..., "lon": ...}
+      - CSV : ts,jarak  atau  ts,lat,lon
+    ``ts`` boleh detik epoch atau waktu ISO 8601.
+    """
+    line = line.strip()
+    if not line or line.startswith("#"):
+        return None
+    if line.startswith("{"):
+        data = json.loads(line)
+    else:
+        parts = line.split(",")
+        data = {"ts": parts[0]}
+        if len(parts) >= 3:
+            data["lat"], data["lon"] = parts[1], parts[2]
+        else:
+            data["jarak"] = parts[1]
+
+    ts = data["ts"]
+    try:
+        ts = float(ts)
+    except ValueError:
+        ts = datetime.fromisoformat(ts.strip().replace("Z", "+00:00")).timestamp()
+    sample = {"ts": ts}
+    for key in ("jarak", "lat", "lon"):
+        if data.get(key) is not None:
+            sample[key] = float(data[key])
+    return sample
+
+
+def _split_lines(chunks):
+    """Gabungkan potongan byte menjadi baris teks"""
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", "replace")
+    if buf:
+        yield buf.decode("utf-8", "replace")
+
+
+def _socket_chunks(target, stop):
+    host, port = target.rsplit(":", 1)
+    with socket.create_connection((host or "127.0.0.1", int(port)), timeout=5) as sock:
+        sock.settimeout(0.2)
+        while not stop.is_set():
+            try:
+                chunk = sock.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                return
+            yield chunk
+
+
+def _pipe_chunks(path, stop):
+    """Baca FIFO tanpa blok supaya berhenti bisa kapan saja (juga sebelum penulis terhubung)"""
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_NONBLOCK", 0))
+    got_data = False
+    with os.fdopen(fd, "rb", buffering=0) as f:
+        while not stop.is_set():
+            ready, _, _ = select.select([f], [], [], 0.2)
+            if not ready:
+                continue
+            chunk = f.read(65536)
+            if chunk is None:
+                continue
+            if not chunk:
+                if got_data:
+                    return      # penulis menutup pipe: run selesai
+                stop.wait(0.2)  # belum ada penulis
+                continue
+            got_data = True
+            yield chunk
+
+
+def stream_samples(kind, target, stop, replay_speed=1.0):
+    """Generator sampel dari sumber ``kind`` ("socket" / "pipe" / "replay")"""
+    if kind == "socket":
+        lines = _split_lines(_socket_chunks(target, stop))
+    elif kind == "pipe":
+        lines = _split_lines(_pipe_chunks(target, stop))
+    elif kind == "replay":
+        lines = None
+    else:
+        raise ValueError(f"Sumber live tidak dikenal: {kind}")
+
+    if lines is not None:
+        for line in lines:
+            sample = parse_sample(line)
+            if sample is not None:
+                yield sample
+        return
+
+    # Replay: jeda antar sampel mengikuti selisih timestamp (dibagi replay_speed)
+    prev = None
+    with open(target, encoding="utf-8") as f:
+        for line in f:
+            sample = parse_sample(line)
+            if sample is None:
+                continue
+            if prev is not None and stop.wait(max(0.0, sample["ts"] - prev) / replay_speed):
+                return
+            prev = sample["ts"]
+            yield sample
+
+
+def run_stream(kind, target, out, stop, replay_speed=1.0):
+    """Dijalankan di thread latar belakang: kirim sampel ke ``out``, None sebagai tanda selesai"""
+    try:
+        for sample in stream_samples(kind, target, stop, replay_speed):
+            if stop.is_set():
+                break
+            out.put(sample)
+    finally:
+        out.put(None)
@@ -0,0 +1,272 @@
+"""Jadwal berbasis kalender: rencana per minggu ISO, program periodisasi, pencapaian per minggu"""
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from analysis import hitung_pencapaian, pencapaian_awal
+from run_store import HARI_LIST, Rollups
+
+# Program latihan bawaan. "faktor" mengalikan target jarak/waktu jadwal dasar,
+# "hari" menimpa isi jadwal hari tertentu pada minggu itu.
+PLANS = {
+    "Tetap": None,
+    "Build 3+1": {
+        "ulang": True,
+        "minggu": [
+            {"nama": "Build 1", "faktor": 1.0},
+            {"nama": "Build 2", "faktor": 1.1},
+            {"nama": "Build 3", "faktor": 1.2},
+            {"nama": "Deload", "faktor": 0.7},
+        ],
+    },
+    "Persiapan 10K (8 minggu)": {
+        "ulang": False,
+        "minggu": [
+            {"nama": "Dasar 1", "faktor": 0.9},
+            {"nama": "Dasar 2", "faktor": 1.0},
+            {"nama": "Dasar 3", "faktor": 1.1, "hari": {"Sabtu": {"target_jarak": 12.0}}},
+            {"nama": "Pemulihan", "faktor": 0.8},
+            {"nama": "Puncak 1", "faktor": 1.15, "hari": {"Sabtu": {"target_jarak": 14.0}}},
+            {"nama": "Puncak 2", "faktor": 1.2, "hari": {"Sabtu": {"target_jarak": 15.0}}},
+            {"nama": "Taper", "faktor": 0.7},
+            {"nama": "Lomba", "faktor": 0.5, "hari": {"Minggu": {
+                "latihan": "Lomba 10K", "target_jarak": 10.0, "target_waktu": "60", "durasi": "60",
+                "tipe": "Lomba", "tips": "Mulai tenang, naikkan pace di 3 km terakhir"}}},
+        ],
+    },
+}
+
+
+def week_key(tanggal):
+    return Rollups.week_key(tanggal)
+
+
+def week_start(week):
+    """Senin minggu ISO "YYYY-Www" """
+    tahun, minggu = week.split("-W")
+    return date.fromisocalendar(int(tahun), int(minggu), 1)
+
+
+def tanggal_hari(hari, today=None):
+    """Tanggal ``hari`` pada minggu berjalan; hari yang belum lewat = minggu lalu"""
+    today = today or date.today()
+    d = today + timedelta(days=HARI_LIST.index(hari) - today.weekday())
+    return d if d <= today else d - timedelta(days=7)
+
+
+def _skala(jadwal, faktor):
+    jadwal["target_jarak"] = round(jadwal["target_jarak"] * faktor, 1)
+    for key in ("target_waktu", "durasi"):
+        jadwal[key] = str(round(float(jadwal[key]) * faktor))
+
+
+class ScheduleEngine:
+    """Jadwal dasar per hari + program multi-minggu -> rencana bertanggal per minggu ISO.
+
+    Program disimpan sebagai riwayat ``[(minggu_mulai, plan)]``: mengganti
+    program hanya berlaku mulai minggu berjalan, minggu lalu tetap dihitung
+    dengan program yang dulu aktif. Rencana satu minggu dibuat sekali lalu di-cache (LRU ``cache_size``
+    minggu). Pencapaian disimpan per minggu (``weeks``), jadi pergantian
+    minggu cukup memakai kunci minggu baru (O(1), tidak ada reset) dan
+    pencapaian minggu lalu tinggal dibaca. Ringkasan tiap minggu
+    (hari tercapai, kontribusi) ikut diperbarui setiap run.
+    """
+
+    def __init__(self, base, plan=None, cache_size=16):
+        self.base = base          # hari -> jadwal dasar (profil atlet)
+        # [(minggu_mulai, plan)] urut minggu; plan = {"nama", "mulai", "minggu": [...], "ulang"} atau None
+        self.plans = self._history(plan)
+        self._starts = [week for week, _ in self.plans]
+        self.cache_size = cache_size
+        self.weeks = {}           # minggu -> {hari: pencapaian} (hanya hari yang ada run-nya)
+        self.totals = {}          # minggu -> [hari_tercapai, kontribusi_persen]
+        self.completed_days = set()   # tanggal yang target harinya tercapai (filter History)
+        self.version = 0          # naik setiap rencana/pencapaian berubah (cache indeks query)
+        self.dirty_weeks = set()  # minggu yang bucket-nya berubah sejak take_dirty terakhir
+        self._plans = OrderedDict()
+
+    @staticmethod
+    def _history(plan):
+        """Riwayat dari data profil: daftar [minggu, plan], atau satu dict plan (format lama)"""
+        if isinstance(plan, list):
+            return [(week, p) for week, p in plan]
+        return [(plan["mulai"], plan)] if plan else []
+
+    def history(self):
+        """Riwayat program untuk disimpan di profil (JSON)"""
+        return [[week, plan] for week, plan in self.plans]
+
+    def copy(self):
+        """Salinan rencana tanpa pencapaian (untuk dipakai di thread lain)"""
+        return ScheduleEngine(self.base, self.history(), self.cache_size)
+
+    # ===== RENCANA =====
+    @property
+    def plan(self):
+        """Program yang berlaku sekarang (entri terakhir riwayat)"""
+        return self.plans[-1][1] if self.plans else None
+
+    def plan_at(self, week):
+        """(minggu_mulai, plan) yang berlaku pada minggu ``week``, atau None"""
+        i = bisect_right(self._starts, week)
+        return self.plans[i - 1] if i else None
+
+    def phase(self, week):
+        """(nomor_minggu_program, spesifikasi) atau None di luar program"""
+        found = self.plan_at(week)
+        if not found or not found[1] or not found[1].get("minggu"):
+            return None
+        mulai, plan = found
+        n = (week_start(week) - week_start(mulai)).days // 7
+        if n >= len(plan["minggu"]):
+            if not plan.get("ulang"):
+                return None
+            n %= len(plan["minggu"])
+        return n, plan["minggu"][n]
+
+    def plan_for(self, week):
+        """{hari: jadwal} minggu ``week``; tiap jadwal berisi "tanggal" """
+        plan = self._plans.get(week)
+        if plan is not None:
+            self._plans.move_to_end(week)
+            return plan
+
+        phase = self.phase(week)
+        spec = phase[1] if phase else {}
+        senin = week_start(week)
+        plan = {}
+        for i, hari in enumerate(HARI_LIST):
+            jadwal = dict(self.base[hari])
+            if spec.get("faktor", 1.0) != 1.0 and jadwal["latihan"] != "Rest Day":
+                _skala(jadwal, spec["faktor"])
+            jadwal.update(spec.get("hari", {}).get(hari, {}))
+            jadwal["tanggal"] = (senin + timedelta(days=i)).isoformat()
+            plan[hari] = jadwal
+
+        self._plans[week] = plan
+        if len(self._plans) > self.cache_size:
+            self._plans.popitem(last=False)
+        return plan
+
+    def jadwal(self, tanggal):
+        """Jadwal untuk satu tanggal ("YYYY-MM-DD")"""
+        return self.plan_for(week_key(tanggal))[HARI_LIST[date.fromisoformat(tanggal).weekday()]]
+
+    def set_plan(self, plan, mulai=None):
+        """Pasang ``plan`` mulai minggu ``mulai`` (default minggu berjalan).
+
+        Entri riwayat yang mulai pada/setelah minggu itu diganti; rencana
+        minggu sebelumnya (dan cache-nya) tidak berubah.
+        """
+        mulai = mulai or week_key(date.today().isoformat())
+        i = bisect_left(self._starts, mulai)
+        del self.plans[i:], self._starts[i:]
+        self.plans.append((mulai, plan))
+        self._starts.append(mulai)
+        for week in [week for week in self._plans if week >= mulai]:
+            del self._plans[week]
+        self.version += 1
+
+    def tipe_list(self):
+        """Semua tipe latihan di jadwal dasar + yang ditambahkan program (seluruh riwayat)"""
+        tipe = {jadwal["tipe"] for jadwal in self.base.values()}
+        for _, plan in self.plans:
+            for spec in (plan or {}).get("minggu", ()):
+                tipe.update(isi["tipe"] for isi in spec.get("hari", {}).values() if "tipe" in isi)
+        return sorted(tipe)
+
+    def tipe_overrides(self, dari, sampai):
+        """(tanggal, tipe) hari yang tipenya ditimpa program, untuk tanggal dari..sampai.
+
+        Hanya minggu program yang dilewati, bukan tiap tanggal, jadi tipe
+        semua run cukup dihitung dari jadwal dasar per hari + daftar ini.
+        Tiap entri riwayat hanya berlaku sampai entri berikutnya dimulai.
+        """
+        dari, sampai = date.fromisoformat(dari), date.fromisoformat(sampai)
+        for i, (mulai, plan) in enumerate(self.plans):
+            if not plan or not plan.get("minggu"):
+                continue
+            akhir = sampai
+            if i + 1 < len(self.plans):
+                akhir = min(akhir, week_start(self.plans[i + 1][0]) - timedelta(days=1))
+            yield from self._overrides(week_start(mulai), plan, dari, akhir)
+
+    @staticmethod
+    def _overrides(mulai, plan, dari, sampai):
+        specs = plan["minggu"]
+        last = (sampai - mulai).days // 7
+        if not plan.get("ulang"):
+            last = min(last, len(specs) - 1)
+        for n in range(max(0, (dari - mulai).days // 7), last + 1):
+            for hari, isi in specs[n % len(specs)].get("hari", {}).items():
+                tanggal = mulai + timedelta(days=7 * n + HARI_LIST.index(hari))
+                if "tipe" in isi and dari <= tanggal <= sampai:
+                    yield tanggal.isoformat(), isi["tipe"]
+
+    # ===== PENCAPAIAN =====
+    def record(self, tanggal, jarak_hari, waktu_hari, target_mingguan):
+        """Pencapaian hari ``tanggal`` dari total hari itu; O(1)"""
+        week = week_key(tanggal)
+        hari = HARI_LIST[date.fromisoformat(tanggal).weekday()]
+        pencapaian = hitung_pencapaian(self.plan_for(week)[hari], jarak_hari, waktu_hari, target_mingguan)
+        self._drop(week, hari, tanggal)
+        bucket = self.weeks.setdefault(week, {})
+        total = self.totals.setdefault(week, [0, 0.0])
+        if pencapaian is not None:
+            # Rest Day tidak punya pencapaian
+            bucket[hari] = pencapaian
+            total[0] += pencapaian["completed"]
+            total[1] += pencapaian["kontribusi_mingguan"]
+            if pencapaian["completed"]:
+                self.completed_days.add(tanggal)
+        return pencapaian
+
+    def forget(self, tanggal):
+        """Buang pencapaian hari ``tanggal`` (semua run hari itu dihapus); O(1)"""
+        return self._drop(week_key(tanggal), HARI_LIST[date.fromisoformat(tanggal).weekday()], tanggal)
+
+    def _drop(self, week, hari, tanggal):
+        self.version += 1
+        self.dirty_weeks.add(week)
+        self.completed_days.discard(tanggal)
+        old = self.weeks.get(week, {}).pop(hari, None)
+        if old is not None:
+            total = self.totals[week]
+            total[0] -= old["completed"]
+            total[1] -= old["kontribusi_mingguan"]
+        return old
+
+    def achievement(self, week, hari):
+        found = self.weeks.get(week, {}).get(hari)
+        return found if found is not None else pencapaian_awal(self.plan_for(week)[hari])
+
+    def take_dirty(self):
+        """Salinan bucket minggu yang berubah (untuk disimpan bertahap), lalu tandai bersih"""
+        weeks = {week: dict(self.weeks.get(week, {})) for week in self.dirty_weeks}
+        self.dirty_weeks.clear()
+        return weeks
+
+    def summary(self, week):
+        """(hari_tercapai, kontribusi_persen) satu minggu, langsung dari bucket"""
+        return tuple(self.totals.get(week, (0, 0.0)))
+
+    # ===== SNAPSHOT =====
+    def to_state(self):
+        return {"weeks": self.weeks}
+
+    def restore(self, state, day_totals, target_mingguan):
+        """Muat bucket tersimpan; data lama (pencapaian per hari saja) dihitung ulang sekali"""
+        self.weeks, self.totals, self.completed_days = {}, {}, set()
+        self.dirty_weeks.clear()
+        self.version += 1
+        if state and "weeks" in state:
+            self.weeks = state["weeks"]
+            for week, bucket in self.weeks.items():
+                self.totals[week] = [sum(p["completed"] for p in bucket.values()),
+                                     sum(p["kontribusi_mingguan"] for p in bucket.values())]
+                senin = week_start(week)
+                self.completed_days.update((senin + timedelta(days=HARI_LIST.index(hari))).isoformat()
+                                           for hari, p in bucket.items() if p["completed"])
+            return
+        for tanggal, (jarak, waktu, _) in day_totals.to_state().items():
+            self.record(tanggal, jarak, waktu, target_mingguan)
@@ -0,0 +1,196 @@
+"""Query riwayat run: filter lewat indeks sekunder (bitmap + array terurut), hasil berupa generator"""
+from array import array
+from bisect import bisect_left, bisect_right
+
+from run_store import HARI_LIST
+
+# Urutan hasil; "tanggal" = urutan baris (ts), jarak/pace memakai indeks terurut
+SORT_KEYS = ("tanggal", "jarak", "pace", "waktu", "kal")
+
+# Kolom dengan indeks array terurut untuk filter rentang (min, max)
+RANGE_COLS = ("jarak", "pace")
+
+# Posisi bit yang menyala untuk tiap nilai byte
+_BITS = [tuple(i for i in range(8) if b >> i & 1) for b in range(256)]
+
+
+def _span(start, end):
+    """Bitmap baris [start, end)"""
+    return ((1 << end) - 1) ^ ((1 << start) - 1)
+
+
+def _from_rows(rows, n):
+    buf = bytearray((n + 7) // 8)
+    for r in rows:
+        buf[r >> 3] |= 1 << (r & 7)
+    return int.from_bytes(buf, "little")
+
+
+def iter_bits(mask, reverse=False):
+    """Nomor baris yang bitnya menyala, urut naik (atau turun)"""
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for i in range(len(data) - 1, -1, -1) if reverse else range(len(data)):
+        b = data[i]
+        if b:
+            base = i << 3
+            for bit in reversed(_BITS[b]) if reverse else _BITS[b]:
+                yield base + bit
+
+
+class RunIndex:
+    """Indeks sekunder atas ``RunStore`` untuk filter History.
+
+    Bitmap adalah int Python (bit ke-i = baris ke-i), jadi gabungan filter
+    cukup AND/OR int di level C, tanpa melihat tiap run:
+
+    - tanggal: rentang baris dari index tanggal ``RunStore``
+    - hari: satu bitmap per hari
+    - jarak/pace: nomor baris diurutkan menurut nilainya; rentang = bisect,
+      lalu potongan array dijadikan bitmap
+    - tipe latihan: bitmap hari yang tipenya cocok di jadwal dasar, dikoreksi
+      untuk tanggal yang tipenya ditimpa program
+    - status tercapai: bitmap dari ``ScheduleEngine.completed_days``,
+      di-cache sampai data atau pencapaian berubah
+
+    Run baru di ujung cukup ditambahkan ke indeks. Sisipan, edit dan hapus
+    menggeser nomor baris (``RunStore.version`` naik), indeks dibangun
+    ulang sekali pada query berikutnya.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.hari = [0] * len(HARI_LIST)
+        self.order = {}       # kolom -> array nomor baris urut nilai
+        self.values = {}      # kolom -> array nilai (urut), untuk bisect
+        self._version = None
+        self._n = 0
+        self._completed = (None, 0)
+
+    def _sync(self):
+        store, n = self.store, len(self.store)
+        if self._version != store.version or n < self._n or n - self._n > n // 4:
+            self._rebuild()
+            return
+        dow = store.cols["dow"]
+        for r in range(self._n, n):
+            self.hari[dow[r]] |= 1 << r
+            for col in RANGE_COLS:
+                value = store.cols[col][r]
+                i = bisect_right(self.values[col], value)
+                self.values[col].insert(i, value)
+                self.order[col].insert(i, r)
+        self._n = n
+
+    def _rebuild(self):
+        store, n = self.store, len(self.store)
+        bufs = [bytearray((n + 7) // 8) for _ in HARI_LIST]
+        for r, d in enumerate(store.cols["dow"]):
+            bufs[d][r >> 3] |= 1 << (r & 7)
+        self.hari = [int.from_bytes(buf, "little") for buf in bufs]
+        for col in RANGE_COLS:
+            values = store.cols[col]
+            order = sorted(range(n), key=values.__getitem__)
+            self.order[col] = array("l", order)
+            self.values[col] = array("d", map(values.__getitem__, order))
+        self._version, self._n = store.version, n
+
+    # ===== FILTER =====
+    def match(self, kriteria, schedule):
+        """Bitmap baris yang lolos semua filter ``kriteria``.
+
+        Kunci (semua opsional): dari/sampai ("YYYY-MM-DD"), hari (daftar nama
+        hari), tipe (daftar tipe latihan), jarak/pace ((min, max), None = bebas),
+        completed (True/False).
+        """
+        self._sync()
+        store = self.store
+        mask = (1 << self._n) - 1
+        if kriteria.get("dari") or kriteria.get("sampai"):
+            mask &= _span(*store.range_between(kriteria.get("dari") or "", kriteria.get("sampai") or "\uffff"))
+        if kriteria.get("hari"):
+            hari = 0
+            for nama in kriteria["hari"]:
+                hari |= self.hari[HARI_LIST.index(nama)]
+            mask &= hari
+        if kriteria.get("tipe"):
+            mask &= self._tipe(set(kriteria["tipe"]), schedule)
+        for col in RANGE_COLS:
+            if kriteria.get(col) and mask:
+                mask &= self._range(col, *kriteria[col])
+        if kriteria.get("completed") is not None and mask:
+            completed = self._completed_mask(schedule)
+            mask &= completed if kriteria["completed"] else ~completed
+        return mask
+
+    def _range(self, col, lo=None, hi=None):
+        values = self.values[col]
+        i = bisect_left(values, lo) if lo is not None else 0
+        j = bisect_right(values, hi) if hi is not None else len(values)
+        order, n = self.order[col], self._n
+        if j - i > n // 2:
+            # Rentang lebar: lebih sedikit baris di luar rentang, bitmap-nya dibalik
+            return ((1 << n) - 1) & ~(_from_rows(order[:i], n) | _from_rows(order[j:], n))
+        return _from_rows(order[i:j], n)
+
+    def _tipe(self, tipe, schedule):
+        mask = 0
+        for d, hari in enumerate(HARI_LIST):
+            if schedule.base[hari]["tipe"] in tipe:
+                mask |= self.hari[d]
+        store = self.store
+        if store:
+            for tanggal, ganti in schedule.tipe_overrides(store.date_at(0), store.date_at(0, reverse=True)):
+                start, end = store.date_range(tanggal)
+                if start < end:
+                    span = _span(start, end)
+                    mask = mask | span if ganti in tipe else mask & ~span
+        return mask
+
+    def _completed_mask(self, schedule):
+        key = (self._version, self._n, id(schedule), schedule.version)
+        if self._completed[0] != key:
+            buf = bytearray((self._n + 7) // 8)
+            for tanggal in schedule.completed_days:
+                start, end = self.store.date_range(tanggal)
+                for r in range(start, end):
+                    buf[r >> 3] |= 1 << (r & 7)
+            self._completed = (key, int.from_bytes(buf, "little"))
+        return self._completed[1]
+
+    # ===== HASIL =====
+    def rows(self, mask, urut="tanggal", turun=True):
+        """Generator run (dict tampilan) hasil filter; berhenti jika data berubah di tengah jalan"""
+        store = self.store
+        version = (store.version, len(store))
+        if urut == "tanggal":
+            found = iter_bits(mask, reverse=turun)
+        elif urut in self.order:
+            member = mask.to_bytes((self._n + 7) // 8, "little")
+            order = self.order[urut]
+            found = (r for r in (reversed(order) if turun else order) if member[r >> 3] >> (r & 7) & 1)
+        else:
+            found = iter(sorted(iter_bits(mask), key=store.cols[urut].__getitem__, reverse=turun))
+        for r in found:
+            if (store.version, len(store)) != version:
+                return
+            yield store.row(r)
+
+    def aggregate(self, mask):
+        """Jumlah run, total jarak/waktu/kalori dan pace rata-rata hasil filter"""
+        c = self.store.cols
+        jarak_col, waktu_col, kal_col = c["jarak"], c["waktu"], c["kal"]
+        low = mask & -mask
+        if mask and not (mask + low) & mask:
+            # Bit menyala berurutan (tanpa filter / hanya rentang tanggal): jumlah per slice
+            start, end = low.bit_length() - 1, mask.bit_length()
+            runs = end - start
+            jarak, waktu, kal = (sum(col[start:end]) for col in (jarak_col, waktu_col, kal_col))
+        else:
+            runs, jarak, waktu, kal = 0, 0.0, 0.0, 0.0
+            for r in iter_bits(mask):
+                runs += 1
+                jarak += jarak_col[r]
+                waktu += waktu_col[r]
+                kal += kal_col[r]
+        return {"runs": runs, "jarak": jarak, "waktu": waktu, "kal": kal,
+                "pace": waktu / jarak if jarak > 0 else 0.0}
@@ -0,0 +1,170 @@
+"""Indeks rekor pribadi dan tren beban latihan (diperbarui per run, O(log n))"""
+import heapq
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from run_store import Rollups
+
+# Kelompok jarak untuk rekor pace: (nama, batas_bawah_km, batas_atas_km)
+BUCKETS = (
+    ("<5K", 0.0, 5.0),
+    ("5–10K", 5.0, 10.0),
+    ("10K–HM", 10.0, 21.0975),
+    ("HM+", 21.0975, float("inf")),
+)
+
+# Konstanta waktu EWMA (hari): fitness (beban kronis) dan fatigue (beban akut)
+FITNESS_DAYS = 42
+FATIGUE_DAYS = 7
+
+
+def bucket_of(jarak):
+    for name, lo, hi in BUCKETS:
+        if lo <= jarak < hi:
+            return name
+    return BUCKETS[-1][0]
+
+
+class RecordIndex:
+    """Rekor dan tren tanpa scan ulang history.
+
+    - pace terbaik per kelompok jarak dan run terjauh: heap, push O(log n)
+    - minggu terbaik: heap (total, minggu) dengan entri basi dilewati saat
+      dibaca (total minggu di ``_week_km`` selalu yang terbaru)
+    - fitness/fatigue: EWMA beban harian (km). Kontribusi run pada hari d
+      terhadap nilai di hari terakhir = beban * k * (1 - k) ** selisih_hari,
+      jadi run yang datang tidak berurutan (impor) tetap O(1)
+    - hapus run: entri heap-nya dicatat di ``_removed`` dan baru dibuang saat
+      naik ke puncak heap; kontribusi EWMA cukup dikurangi (linear)
+    Beban 7/28 hari dihitung dari Fenwick tree ``DayTotals`` (O(log n)).
+    """
+
+    def __init__(self):
+        self.pace = {name: [] for name, _, _ in BUCKETS}   # heap (pace, ts, tanggal, jarak)
+        self.longest = []         # heap (-jarak, ts, tanggal)
+        self.weeks = []           # heap (-km, minggu)
+        self._week_km = {}
+        self._removed = Counter()   # entri heap run yang sudah dihapus
+        self.fitness = 0.0
+        self.fatigue = 0.0
+        self._day = None          # ordinal hari acuan fitness/fatigue
+        self._bulk = False
+
+    def add(self, ts, tanggal, jarak, pace, week_km):
+        """Catat satu run; ``week_km`` = total minggu ISO run itu setelah ditambah"""
+        self._add_run(ts, tanggal, jarak, pace)
+        self._set_week(tanggal, week_km)
+
+    def remove(self, ts, tanggal, jarak, pace, week_km):
+        """Kebalikan ``add``; ``week_km`` = total minggu itu setelah run dikurangi"""
+        self._removed[(pace, ts, tanggal, jarak)] += 1
+        self._removed[(-jarak, ts, tanggal)] += 1
+        self._add_load(tanggal, -jarak)
+        self._set_week(tanggal, week_km)
+
+    def _set_week(self, tanggal, week_km):
+        week = Rollups.week_key(tanggal)
+        if week_km > 0:
+            self._week_km[week] = week_km
+            self._push(self.weeks, (-week_km, week))
+        else:
+            self._week_km.pop(week, None)
+
+    def _add_run(self, ts, tanggal, jarak, pace):
+        self._push(self.pace[bucket_of(jarak)], (pace, ts, tanggal, jarak))
+        self._push(self.longest, (-jarak, ts, tanggal))
+        self._add_load(tanggal, jarak)
+
+    def _push(self, heap, item):
+        if self._bulk:
+            heap.append(item)
+        else:
+            heapq.heappush(heap, item)
+
+    def _add_load(self, tanggal, beban):
+        day = date.fromisoformat(tanggal).toordinal()
+        if self._day is None:
+            self._day = day
+        if day > self._day:
+            self._decay(day)
+        lag = self._day - day
+        self.fitness += beban / FITNESS_DAYS * (1 - 1 / FITNESS_DAYS) ** lag
+        self.fatigue += beban / FATIGUE_DAYS * (1 - 1 / FATIGUE_DAYS) ** lag
+
+    def _decay(self, day):
+        gap = day - self._day
+        self.fitness *= (1 - 1 / FITNESS_DAYS) ** gap
+        self.fatigue *= (1 - 1 / FATIGUE_DAYS) ** gap
+        self._day = day
+
+    @contextmanager
+    def bulk(self):
+        """Impor massal: kumpulkan dulu, heapify sekali di akhir (O(n))"""
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            for heap in (*self.pace.values(), self.longest, self.weeks):
+                heapq.heapify(heap)
+
+    @classmethod
+    def build(cls, rows, rollups):
+        """Bangun dari (ts, tanggal, jarak, pace) semua run + total mingguan"""
+        index = cls()
+        with index.bulk():
+            for ts, tanggal, jarak, pace in rows:
+                index._add_run(ts, tanggal, jarak, pace)
+            index._week_km = {week: total[0] for week, total in rollups.weeks.items()}
+            index.weeks = [(-km, week) for week, km in index._week_km.items()]
+        return index
+
+    # ===== QUERY =====
+    def _top(self, heap):
+        """Puncak heap setelah entri run yang dihapus dibuang"""
+        removed = self._removed
+        while heap and removed[heap[0]]:
+            removed[heap[0]] -= 1
+            if not removed[heap[0]]:
+                del removed[heap[0]]
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def best_pace(self):
+        """{kelompok: (pace, tanggal, jarak)}"""
+        best = {}
+        for name, heap in self.pace.items():
+            top = self._top(heap)
+            if top is not None:
+                best[name] = (top[0], top[2], top[3])
+        return best
+
+    def longest_run(self):
+        top = self._top(self.longest)
+        if top is None:
+            return None
+        jarak, _, tanggal = top
+        return -jarak, tanggal
+
+    def best_week(self):
+        weeks = self.weeks
+        while weeks and self._week_km.get(weeks[0][1]) != -weeks[0][0]:
+            heapq.heappop(weeks)    # entri basi: total minggu itu sudah berubah
+        return (weeks[0][1], -weeks[0][0]) if weeks else None
+
+    def trend(self, day_totals, today=None):
+        """Beban 7/28 hari (km) dan fitness/fatigue/form per hari ``today``"""
+        today = today or date.today()
+        fitness, fatigue = self.fitness, self.fatigue
+        if self._day is not None and today.toordinal() > self._day:
+            gap = today.toordinal() - self._day
+            fitness *= (1 - 1 / FITNESS_DAYS) ** gap
+            fatigue *= (1 - 1 / FATIGUE_DAYS) ** gap
+        return {
+            "beban_7": day_totals.range_total("jarak", today - timedelta(days=6), today),
+            "beban_28": day_totals.range_total("jarak", today - timedelta(days=27), today),
+            "fitness": fitness,
+            "fatigue": fatigue,
+            "form": fitness - fatigue,
+        }
@@ -0,0 +1,497 @@
+"""Penyimpanan run dalam kolom array bertipe (hemat memori, agregasi cepat)"""
+import base64
+from contextlib import contextmanager
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+
+HARI_LIST = ["Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu"]
+
+# nama kolom -> typecode array
+COLUMNS = {
+    "ts": "d",      # timestamp (detik epoch)
+    "jarak": "d",   # km
+    "waktu": "d",   # menit
+    "berat": "f",   # kg
+    "pace": "d",    # menit/km
+    "speed": "d",   # km/jam
+    "kal": "d",     # kalori
+    "dow": "b",     # index hari jadwal (0 = Senin)
+}
+
+
+class RunStore:
+    """Semua run disimpan per kolom, diurutkan menurut waktu.
+
+    ``_index`` memetakan tanggal ("YYYY-MM-DD") ke rentang baris [awal, akhir)
+    sehingga data satu tanggal cukup diambil dengan slicing.
+    """
+
+    def __init__(self):
+        self.cols = {name: array(code) for name, code in COLUMNS.items()}
+        self._dates = []      # tanggal terurut naik
+        self._index = {}      # tanggal -> [awal, akhir)
+        self._bulk = False    # sedang impor massal: pengurutan ditunda
+        self._needs_sort = False
+        self.version = 0      # naik jika nomor/isi baris lama berubah (bukan append di ujung)
+        self._query_index = None
+
+    def __len__(self):
+        return len(self.cols["ts"])
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def append(self, tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari):
+        """Tambah satu run, kembalikan nomor barisnya"""
+        ts_col = self.cols["ts"]
+        if ts_col and (ts < ts_col[-1] or self._needs_sort):
+            if self._bulk:
+                # Impor massal: tambahkan di akhir, urutkan sekali saat selesai
+                self._append_raw(tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari)
+                self._needs_sort = True
+                return len(ts_col) - 1
+            return self._insert(tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari)
+
+        self._append_raw(tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari)
+        row = len(ts_col) - 1
+        if self._dates and self._dates[-1] == tanggal:
+            self._index[tanggal][1] = row + 1
+        else:
+            self._dates.append(tanggal)
+            self._index[tanggal] = [row, row + 1]
+        return row
+
+    @contextmanager
+    def bulk(self):
+        """Tunda pengurutan ulang sampai akhir impor massal"""
+        self._bulk = True
+        try:
+            yield self
+        finally:
+            self._bulk = False
+            if self._needs_sort:
+                self._needs_sort = False
+                self._resort()
+
+    def _append_raw(self, tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari):
+        c = self.cols
+        c["ts"].append(ts)
+        c["jarak"].append(jarak)
+        c["waktu"].append(waktu)
+        c["berat"].append(berat)
+        c["pace"].append(pace)
+        c["speed"].append(speed)
+        c["kal"].append(kal)
+        c["dow"].append(HARI_LIST.index(hari))
+
+    def _insert(self, tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari):
+        """Sisipkan run lama di posisinya (memmove per kolom), geser index tanggal sesudahnya"""
+        self.version += 1
+        row = bisect_right(self.cols["ts"], ts)
+        for name, value in zip(COLUMNS, (ts, jarak, waktu, berat, pace, speed, kal, HARI_LIST.index(hari))):
+            self.cols[name].insert(row, value)
+        i = bisect_left(self._dates, tanggal)
+        if i < len(self._dates) and self._dates[i] == tanggal:
+            self._index[tanggal][1] += 1
+            i += 1
+        else:
+            self._dates.insert(i, tanggal)
+            self._index[tanggal] = [row, row + 1]
+            i += 1
+        for later in self._dates[i:]:
+            span = self._index[later]
+            span[0] += 1
+            span[1] += 1
+        return row
+
+    def update(self, tanggal, ts, jarak, waktu, berat, pace, speed, kal, hari):
+        """Timpa nilai run ``ts`` di barisnya (edit tanpa pindah tanggal/jam), O(log n)"""
+        row = self._find(tanggal, ts)
+        if row is None:
+            return None
+        self.version += 1
+        for name, value in zip(COLUMNS, (ts, jarak, waktu, berat, pace, speed, kal, HARI_LIST.index(hari))):
+            self.cols[name][row] = value
+        return row
+
+    def remove(self, tanggal, ts):
+        """Hapus satu run (memmove per kolom), geser index tanggal sesudahnya"""
+        row = self._find(tanggal, ts)
+        if row is None:
+            return False
+        self.version += 1
+        for col in self.cols.values():
+            del col[row]
+        i = bisect_left(self._dates, tanggal)
+        span = self._index[tanggal]
+        span[1] -= 1
+        if span[0] == span[1]:
+            del self._dates[i]
+            del self._index[tanggal]
+        else:
+            i += 1
+        for later in self._dates[i:]:
+            span = self._index[later]
+            span[0] -= 1
+            span[1] -= 1
+        return True
+
+    def _find(self, tanggal, ts):
+        """Nomor baris run ``ts`` pada tanggal itu (bisect di rentang tanggal), None jika tidak ada"""
+        start, end = self.date_range(tanggal)
+        row = bisect_left(self.cols["ts"], ts, start, end)
+        return row if row < end and self.cols["ts"][row] == ts else None
+
+    def _resort(self):
+        ts_col = self.cols["ts"]
+        order = sorted(range(len(ts_col)), key=ts_col.__getitem__)
+        for name, col in self.cols.items():
+            self.cols[name] = array(col.typecode, [col[i] for i in order])
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        self.version += 1
+        self._dates, self._index = [], {}
+        for row, ts in enumerate(self.cols["ts"]):
+            tanggal = datetime.fromtimestamp(ts).strftime("%Y-%m-%d")
+            if self._dates and self._dates[-1] == tanggal:
+                self._index[tanggal][1] = row + 1
+            else:
+                self._dates.append(tanggal)
+                self._index[tanggal] = [row, row + 1]
+
+    def recompute_metrics(self, koef_kalori=None):
+        """Hitung ulang pace/speed/kal seluruh run dalam satu pass vektor"""
+        from analysis import KOEF_KALORI, hitung_metrik_batch
+        c = self.cols
+        hasil = hitung_metrik_batch(c["jarak"], c["waktu"], c["berat"],
+                                    KOEF_KALORI if koef_kalori is None else koef_kalori)
+        for name, values in zip(("pace", "speed", "kal"), hasil):
+            col = array("d")
+            col.frombytes(values.tobytes())
+            c[name] = col
+        self.version += 1
+
+    # ===== QUERY =====
+    def dates(self, reverse=False):
+        return self._dates[::-1] if reverse else list(self._dates)
+
+    def date_count(self):
+        return len(self._dates)
+
+    def date_at(self, i, reverse=False):
+        """Tanggal ke-i tanpa menyalin seluruh daftar tanggal"""
+        return self._dates[-1 - i] if reverse else self._dates[i]
+
+    def date_position(self, prefix, reverse=False):
+        """Posisi tanggal terbaru yang diawali ``prefix`` ("YYYY" / "YYYY-MM")"""
+        hi = bisect_right(self._dates, prefix + "\uffff")
+        return len(self._dates) - hi if reverse else max(0, hi - 1)
+
+    def has_date(self, tanggal):
+        return tanggal in self._index
+
+    def date_range(self, tanggal):
+        """Rentang baris [awal, akhir) untuk satu tanggal"""
+        return tuple(self._index.get(tanggal, (0, 0)))
+
+    def range_between(self, dari, sampai):
+        """Rentang baris untuk tanggal dari..sampai (inklusif)"""
+        i = bisect_left(self._dates, dari)
+        j = bisect_right(self._dates, sampai)
+        if i >= j:
+            return 0, 0
+        return self._index[self._dates[i]][0], self._index[self._dates[j - 1]][1]
+
+    def total(self, col, start=0, end=None):
+        """Jumlah satu kolom pada rentang baris (sum di level C)"""
+        return sum(self.cols[col][start:end])
+
+    def total_on(self, col, tanggal):
+        return self.total(col, *self.date_range(tanggal))
+
+    def row(self, i):
+        """Satu run sebagai dict (hanya untuk tampilan)"""
+        c = self.cols
+        mulai = datetime.fromtimestamp(c["ts"][i])
+        return {
+            "ts": c["ts"][i],
+            "tanggal": mulai.strftime("%Y-%m-%d"),
+            "time": mulai.strftime("%H:%M"),
+            "jarak": c["jarak"][i],
+            "waktu": c["waktu"][i],
+            "pace": c["pace"][i],
+            "speed": c["speed"][i],
+            "kal": c["kal"][i],
+            "hari": HARI_LIST[c["dow"][i]],
+        }
+
+    def rows(self, start, end):
+        """Iterasi run pada rentang baris sebagai dict (hanya untuk tampilan)"""
+        for i in range(start, end):
+            yield self.row(i)
+
+    def rows_on(self, tanggal):
+        return self.rows(*self.date_range(tanggal))
+
+    def get(self, tanggal, ts):
+        """Record satu run (format log, tanpa segmen) atau None"""
+        row = self._find(tanggal, ts)
+        if row is None:
+            return None
+        c = self.cols
+        return {"tanggal": tanggal, "ts": ts, "jarak": c["jarak"][row], "waktu": c["waktu"][row],
+                "berat": c["berat"][row], "hari": HARI_LIST[c["dow"][row]],
+                "pace": c["pace"][row], "speed": c["speed"][row], "kal": c["kal"][row]}
+
+    def query(self, kriteria, schedule, urut="tanggal", turun=True):
+        """(ringkasan, generator run) yang lolos filter (lihat ``query.RunIndex.match``)"""
+        # Indeks sekunder dibuat saat query pertama, bukan saat memuat data
+        if self._query_index is None:
+            from query import RunIndex
+            self._query_index = RunIndex(self)
+        index = self._query_index
+        mask = index.match(kriteria, schedule)
+        return index.aggregate(mask), index.rows(mask, urut, turun)
+
+    def metric_rows(self):
+        """(ts, tanggal, jarak, pace) semua run, urut waktu (untuk membangun indeks rekor)"""
+        c = self.cols
+        for tanggal in self._dates:
+            start, end = self._index[tanggal]
+            for i in range(start, end):
+                yield c["ts"][i], tanggal, c["jarak"][i], c["pace"][i]
+
+    def daily_rows(self):
+        """(tanggal, jarak, waktu, kal) per tanggal, urut naik (total per slice, level C)"""
+        c = self.cols
+        for tanggal in self._dates:
+            start, end = self._index[tanggal]
+            yield tanggal, sum(c["jarak"][start:end]), sum(c["waktu"][start:end]), sum(c["kal"][start:end])
+
+    def export_chunks(self, dari=None, sampai=None, chunk=5000):
+        """Potongan kolom untuk tanggal dari..sampai, aman dibaca di thread lain.
+
+        Rentang baris dicari lewat index tanggal; kolom disalin sekali
+        (slice array, level C) saat dipanggil, potongan dibuat belakangan.
+        Salinan itu sebesar seluruh rentang (8 byte per nilai, tanpa dict per
+        run) supaya edit/impor di thread Tk tidak tercampur ke hasil ekspor;
+        yang dibatasi ``chunk`` hanya list tanggal dan buffer penulis.
+        """
+        i = bisect_left(self._dates, dari) if dari else 0
+        j = bisect_right(self._dates, sampai) if sampai else len(self._dates)
+        days = [(t, *self._index[t]) for t in self._dates[i:j]]
+        if not days:
+            return iter(())
+        start, end = days[0][1], days[-1][2]
+        cols = {name: self.cols[name][start:end] for name in
+                ("ts", "jarak", "waktu", "berat", "pace", "speed", "kal", "dow")}
+        return self._chunks(cols, days, start, chunk)
+
+    @staticmethod
+    def _chunks(cols, days, offset, chunk):
+        n, d = len(cols["ts"]), 0
+        for lo in range(0, n, chunk):
+            hi = min(n, lo + chunk)
+            tanggal = []
+            while len(tanggal) < hi - lo:
+                t, start, end = days[d]
+                start, end = start - offset, end - offset
+                tanggal.extend([t] * (min(end, hi) - max(start, lo)))
+                if end <= hi:
+                    d += 1
+            yield dict({name: col[lo:hi] for name, col in cols.items()}, tanggal=tanggal)
+
+    # ===== SNAPSHOT =====
+    def to_state(self):
+        return {
+            "cols": {name: base64.b64encode(col.tobytes()).decode("ascii")
+                     for name, col in self.cols.items()},
+            "index": [[d] + self._index[d] for d in self._dates],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        store = cls()
+        for name, code in COLUMNS.items():
+            col = array(code)
+            col.frombytes(base64.b64decode(state["cols"][name]))
+            store.cols[name] = col
+        # Index tanggal ikut disimpan, jadi tidak perlu dihitung ulang per baris
+        for tanggal, start, end in state["index"]:
+            store._dates.append(tanggal)
+            store._index[tanggal] = [start, end]
+        return store
+
+
+class DayTotals:
+    """Total jarak/waktu per tanggal yang diperbarui setiap ada run baru.
+
+    Total satu hari diambil O(1) dari dict. Untuk total minggu, bulan atau
+    rentang bebas dipakai Fenwick tree yang diindeks dengan ordinal tanggal,
+    sehingga query dan update masing-masing O(log n).
+    """
+
+    COLS = ("jarak", "waktu")
+
+    def __init__(self):
+        self._days = {}       # tanggal -> [jarak, waktu, jumlah_run]
+        self._base = None     # ordinal tanggal untuk posisi 0 di tree
+        self._trees = {col: array("d", [0.0]) for col in self.COLS}
+
+    def __len__(self):
+        return len(self._days)
+
+    def add(self, tanggal, jarak, waktu, runs=1):
+        pos = self._position(date.fromisoformat(tanggal).toordinal())
+        day = self._days.setdefault(tanggal, [0.0, 0.0, 0])
+        day[0] += jarak
+        day[1] += waktu
+        day[2] += runs
+        self._tree_add(self._trees["jarak"], pos, jarak)
+        self._tree_add(self._trees["waktu"], pos, waktu)
+
+    def remove(self, tanggal, jarak, waktu):
+        """Kurangi satu run (kebalikan ``add``); tanggal tanpa run lagi dibuang dari dict"""
+        self.add(tanggal, -jarak, -waktu, runs=-1)
+        if self._days[tanggal][2] <= 0:
+            del self._days[tanggal]
+
+    # ===== QUERY =====
+    def day(self, tanggal):
+        """(jarak, waktu, jumlah_run) pada satu tanggal"""
+        return tuple(self._days.get(tanggal, (0.0, 0.0, 0)))
+
+    def range_total(self, col, dari, sampai):
+        """Total kolom untuk tanggal dari..sampai (inklusif, objek date)"""
+        if self._base is None:
+            return 0.0
+        size = len(self._trees[col]) - 1
+        lo = max(0, dari.toordinal() - self._base)
+        hi = min(size - 1, sampai.toordinal() - self._base)
+        if lo > hi:
+            return 0.0
+        tree = self._trees[col]
+        return self._prefix(tree, hi) - (self._prefix(tree, lo - 1) if lo > 0 else 0.0)
+
+    def week_total(self, col, tanggal):
+        d = date.fromisoformat(tanggal)
+        senin = d - timedelta(days=d.weekday())
+        return self.range_total(col, senin, senin + timedelta(days=6))
+
+    def month_total(self, col, tanggal):
+        d = date.fromisoformat(tanggal)
+        awal = d.replace(day=1)
+        akhir = (awal + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return self.range_total(col, awal, akhir)
+
+    # ===== FENWICK TREE =====
+    def _position(self, ordinal):
+        """Posisi ordinal di tree; tree diperbesar (dobel) jika di luar jangkauan"""
+        size = len(self._trees["jarak"]) - 1
+        if self._base is not None and self._base <= ordinal < self._base + size:
+            return ordinal - self._base
+        lo = ordinal if self._base is None else min(self._base, ordinal)
+        hi = ordinal if self._base is None else max(self._base + size - 1, ordinal)
+        size = max(64, size)
+        while size < hi - lo + 1:
+            size *= 2
+        self._base = lo
+        self._rebuild(size)
+        return ordinal - self._base
+
+    def _rebuild(self, size):
+        self._trees = {col: array("d", bytes(8 * (size + 1))) for col in self.COLS}
+        for tanggal, (jarak, waktu, _) in self._days.items():
+            pos = date.fromisoformat(tanggal).toordinal() - self._base
+            self._tree_add(self._trees["jarak"], pos, jarak)
+            self._tree_add(self._trees["waktu"], pos, waktu)
+
+    @staticmethod
+    def _tree_add(tree, pos, value):
+        i = pos + 1
+        while i < len(tree):
+            tree[i] += value
+            i += i & -i
+
+    @staticmethod
+    def _prefix(tree, pos):
+        i, total = pos + 1, 0.0
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    # ===== SNAPSHOT =====
+    def to_state(self):
+        return self._days
+
+    @classmethod
+    def from_state(cls, state):
+        totals = cls()
+        if state:
+            ordinals = [date.fromisoformat(t).toordinal() for t in state]
+            totals._days = {t: list(v) for t, v in state.items()}
+            totals._base = min(ordinals)
+            size = 64
+            while size < max(ordinals) - totals._base + 1:
+                size *= 2
+            totals._rebuild(size)
+        return totals
+
+
+class Rollups:
+    """Total berjalan per minggu ISO, bulan dan tahun (update O(1) per run).
+
+    Total rentang bebas tetap memakai Fenwick tree di ``DayTotals``.
+    """
+
+    def __init__(self):
+        self.weeks = {}    # "2026-W42" -> [jarak, waktu, jumlah_run]
+        self.months = {}   # "2026-10"  -> [jarak, waktu, jumlah_run]
+        self.years = {}    # "2026"     -> [jarak, waktu, jumlah_run]
+
+    @staticmethod
+    def week_key(tanggal):
+        tahun, minggu, _ = date.fromisoformat(tanggal).isocalendar()
+        return f"{tahun}-W{minggu:02d}"
+
+    def add(self, tanggal, jarak, waktu, runs=1):
+        for table, key in ((self.weeks, self.week_key(tanggal)),
+                           (self.months, tanggal[:7]),
+                           (self.years, tanggal[:4])):
+            total = table.setdefault(key, [0.0, 0.0, 0])
+            total[0] += jarak
+            total[1] += waktu
+            total[2] += runs
+
+    def remove(self, tanggal, jarak, waktu):
+        """Kurangi satu run; periode tanpa run lagi dibuang"""
+        self.add(tanggal, -jarak, -waktu, runs=-1)
+        for table, key in ((self.weeks, self.week_key(tanggal)),
+                           (self.months, tanggal[:7]),
+                           (self.years, tanggal[:4])):
+            if table[key][2] <= 0:
+                del table[key]
+
+    def week(self, tanggal):
+        return tuple(self.weeks.get(self.week_key(tanggal), (0.0, 0.0, 0)))
+
+    def month(self, tanggal):
+        return tuple(self.months.get(tanggal[:7], (0.0, 0.0, 0)))
+
+    def year(self, tanggal):
+        return tuple(self.years.get(tanggal[:4], (0.0, 0.0, 0)))
+
+    @classmethod
+    def from_days(cls, day_totals):
+        """Bangun ulang penuh dari semua total harian, O(jumlah hari) — hanya saat load.
+
+        Bukan inkremental: setelah dimuat, ``add``/``remove`` per run yang
+        menjaga rollup tetap sinkron.
+        """
+        rollups = cls()
+        for tanggal, (jarak, waktu, runs) in day_totals.to_state().items():
+            rollups.add(tanggal, jarak, waktu, runs)
+        return rollups
@@ -0,0 +1,214 @@
+"""Analisis segmen satu run: split per km, best effort 1k/5k/10k dan deteksi interval"""
+import heapq
+import re
+from collections import deque
+
+# Jarak best effort (km)
+BEST_DISTANCES = {"1k": 1.0, "5k": 5.0, "10k": 10.0}
+
+
+class SegmentEngine:
+    """Satu pass atas aliran titik (detik, jarak_kumulatif_km).
+
+    Semua perhitungan memakai jendela geser (deque) sehingga setiap titik
+    diproses O(1) amortized tanpa menyimpan seluruh aliran:
+      - split: waktu tiap ``split_km``, titik lintas diinterpolasi linear
+      - best effort: untuk tiap jarak D, jendela terpendek yang menempuh D
+        (dua pointer; awal jendela diinterpolasi di dalam segmen pertama)
+      - interval: kecepatan jendela ``interval_window_s`` dibanding rata-rata
+        run sejauh ini; bagian yang lebih pendek dari ``min_interval_s``
+        digabung ke bagian berikutnya
+    """
+
+    def __init__(self, distances=BEST_DISTANCES, split_km=1.0,
+                 interval_window_s=20.0, min_interval_s=30.0, hysteresis=0.05):
+        self.distances = distances
+        self.split_km = split_km
+        self.interval_window_s = interval_window_s
+        self.min_interval_s = min_interval_s
+        self.hysteresis = hysteresis
+
+        self.splits = []          # detik per split
+        self.best = {}            # nama -> detik tercepat
+        self.intervals = []       # [jenis, detik, km]
+        self._start = None
+        self._prev = None
+        self._next_split = split_km
+        self._split_t = None
+        self._windows = {name: deque() for name in distances}
+        self._speed = deque()
+        self._state = None
+        self._seg = None          # (t, d) awal bagian interval yang sedang berjalan
+
+    def add(self, t, d):
+        if self._prev is not None and (t <= self._prev[0] or d < self._prev[1]):
+            return
+        if self._start is None:
+            self._start = self._prev = (t, d)
+            self._split_t = t
+            for window in self._windows.values():
+                window.append((t, d))
+            self._speed.append((t, d))
+            return
+
+        t_prev, d_prev = self._prev
+        # Split: bisa lebih dari satu jika satu segmen melewati beberapa km
+        while d >= self._next_split:
+            tc = t_prev + (t - t_prev) * (self._next_split - d_prev) / (d - d_prev)
+            self.splits.append(tc - self._split_t)
+            self._split_t = tc
+            self._next_split += self.split_km
+
+        for name, jarak in self.distances.items():
+            window = self._windows[name]
+            window.append((t, d))
+            while len(window) > 2 and d - window[1][1] >= jarak:
+                window.popleft()
+            (t0, d0), (t1, d1) = window[0], window[1]
+            if d - d0 >= jarak:
+                awal = t0 + (t1 - t0) * (d - jarak - d0) / (d1 - d0) if d1 > d0 else t0
+                if name not in self.best or t - awal < self.best[name]:
+                    self.best[name] = t - awal
+
+        self._update_interval(t, d)
+        self._prev = (t, d)
+
+    def _update_interval(self, t, d):
+        speed = self._speed
+        speed.append((t, d))
+        while len(speed) > 2 and t - speed[1][0] >= self.interval_window_s:
+            speed.popleft()
+        t0, d0 = speed[0]
+        st, sd = self._start
+        if t - st < self.interval_window_s or t <= t0:
+            return
+        sekarang = (d - d0) / (t - t0)
+        rata = (d - sd) / (t - st)
+        if self._state != "cepat" and sekarang > rata * (1 + self.hysteresis):
+            state = "cepat"
+        elif self._state != "recovery" and sekarang < rata * (1 - self.hysteresis):
+            state = "recovery"
+        else:
+            return
+
+        # Titik ganti = awal jendela kecepatan (jendela sudah "berisi" kondisi baru)
+        if self._state is None:
+            # Bagian sebelum perubahan pertama adalah kebalikan kondisi sekarang
+            if t0 - self._start[0] >= self.min_interval_s:
+                sebelum = "recovery" if state == "cepat" else "cepat"
+                self.intervals.append([sebelum, t0 - self._start[0], d0 - self._start[1]])
+                self._state, self._seg = state, (t0, d0)
+            else:
+                self._state, self._seg = state, self._start
+            return
+        if t0 - self._seg[0] >= self.min_interval_s:
+            self.intervals.append([self._state, t0 - self._seg[0], d0 - self._seg[1]])
+            self._seg = (t0, d0)
+        self._state = state
+
+    def summary(self):
+        """Hasil akhir run (dict siap JSON)"""
+        intervals = [list(x) for x in self.intervals]
+        if self._state is not None and self._prev[0] - self._seg[0] >= self.min_interval_s:
+            intervals.append([self._state, self._prev[0] - self._seg[0], self._prev[1] - self._seg[1]])
+        return {"splits": list(self.splits), "best": dict(self.best), "intervals": intervals}
+
+
+def from_laps(laps, start=0.0):
+    """Lap [(jarak_km, detik)] -> titik kumulatif untuk SegmentEngine"""
+    t, d = start, 0.0
+    yield t, d
+    for jarak, detik in laps:
+        t += detik
+        d += jarak
+        yield t, d
+
+
+def analyze(points, **options):
+    engine = SegmentEngine(**options)
+    for t, d in points:
+        engine.add(t, d)
+    return engine.summary()
+
+
+def pola_interval(schedule):
+    """(menit_cepat, menit_recovery) dari tips jadwal, mis. "5 menit cepat, 2 menit recovery" """
+    m = re.search(r"(\d+)\s*menit cepat,\s*(\d+)\s*menit recovery", schedule.get("tips", ""))
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def cek_interval(intervals, pola, toleransi=0.8):
+    """Jumlah repetisi cepat+recovery yang memenuhi pola jadwal, dan jumlah bagian cepat"""
+    cepat_s, recovery_s = pola[0] * 60 * toleransi, pola[1] * 60 * toleransi
+    reps = 0
+    for i, (jenis, detik, _) in enumerate(intervals):
+        if jenis != "cepat":
+            continue
+        nxt = intervals[i + 1] if i + 1 < len(intervals) else None
+        if detik >= cepat_s and (nxt is None or nxt[1] >= recovery_s):
+            reps += 1
+    return reps, sum(1 for x in intervals if x[0] == "cepat")
+
+
+def format_durasi(detik):
+    detik = int(round(detik))
+    jam, sisa = divmod(detik, 3600)
+    menit, detik = divmod(sisa, 60)
+    return f"{jam}:{menit:02d}:{detik:02d}" if jam else f"{menit}:{detik:02d}"
+
+
+class BestEfforts:
+    """Cache best effort per run + tabel rekor per jarak.
+
+    Run baru hanya dibandingkan dengan rekor saat ini (O(jumlah jarak)),
+    history tidak pernah di-scan ulang. Tiap jarak juga punya heap
+    (detik, ts); run yang dihapus tidak dicari di heap, entrinya dianggap
+    basi (tidak cocok lagi dengan ``per_run``) dan dibuang saat naik ke puncak.
+    """
+
+    def __init__(self):
+        self.per_run = {}     # ts -> {"1k": detik, ...}
+        self.records = {}     # nama -> [detik, ts]
+        self._heaps = {}      # nama -> heap (detik, ts), boleh berisi entri basi
+
+    def add(self, ts, best):
+        self.per_run[ts] = best
+        for name, detik in best.items():
+            heapq.heappush(self._heaps.setdefault(name, []), (detik, ts))
+            rekor = self.records.get(name)
+            if rekor is None or detik < rekor[0]:
+                self.records[name] = [detik, ts]
+
+    def remove(self, ts):
+        """Buang best effort satu run, kembalikan miliknya (None jika tidak ada).
+
+        Rekor yang dipegang run itu diganti puncak heap yang masih berlaku;
+        O(log n) teramortisasi.
+        """
+        best = self.per_run.pop(ts, None)
+        for name in best or ():
+            if self.records[name][1] != ts:
+                continue
+            heap = self._heaps[name]
+            while heap and self.per_run.get(heap[0][1], {}).get(name) != heap[0][0]:
+                heapq.heappop(heap)
+            if heap:
+                self.records[name] = list(heap[0])
+            else:
+                del self.records[name]
+        return best
+
+    def to_state(self):
+        return [[ts, best] for ts, best in self.per_run.items()]
+
+    @classmethod
+    def from_state(cls, state):
+        efforts = cls()
+        for ts, best in state or ():
+            efforts.per_run[ts] = best
+            for name, detik in best.items():
+                efforts._heaps.setdefault(name, []).append((detik, ts))
+        for name, heap in efforts._heaps.items():
+            heapq.heapify(heap)
+            efforts.records[name] = list(heap[0])
+        return efforts
@@ -0,0 +1,434 @@
+"""Backend SQLite (opsional): history run dibaca lewat query, bukan dimuat ke RAM"""
+import json
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from query import SORT_KEYS
+from run_store import HARI_LIST
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    athlete TEXT NOT NULL,
+    tanggal TEXT NOT NULL,
+    ts REAL NOT NULL,
+    jarak REAL NOT NULL,
+    waktu REAL NOT NULL,
+    berat REAL NOT NULL,
+    pace REAL NOT NULL,
+    speed REAL NOT NULL,
+    kal REAL NOT NULL,
+    dow INTEGER NOT NULL,
+    target_mingguan REAL NOT NULL,
+    segments TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_athlete_tanggal ON runs (athlete, tanggal, ts);
+CREATE INDEX IF NOT EXISTS runs_athlete_dow ON runs (athlete, dow);
+CREATE INDEX IF NOT EXISTS runs_athlete_jarak ON runs (athlete, jarak);
+CREATE INDEX IF NOT EXISTS runs_athlete_pace ON runs (athlete, pace);
+CREATE TABLE IF NOT EXISTS athlete_state (
+    athlete TEXT PRIMARY KEY,
+    target_mingguan REAL,
+    achievements TEXT,
+    last TEXT
+);
+"""
+
+# SQL tetap (bukan dirangkai per panggilan) supaya statement yang sudah
+# dikompilasi dipakai ulang dari cache statement tiap koneksi
+INSERT_RUN = """INSERT INTO runs (athlete, tanggal, ts, jarak, waktu, berat, pace, speed, kal, dow,
+                                  target_mingguan, segments)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+DELETE_RUN = "DELETE FROM runs WHERE athlete = ? AND tanggal = ? AND ts = ?"
+UPSERT_STATE = """INSERT INTO athlete_state (athlete, target_mingguan, achievements, last) VALUES (?, ?, ?, ?)
+                  ON CONFLICT (athlete) DO UPDATE SET target_mingguan = excluded.target_mingguan,
+                  achievements = excluded.achievements, last = excluded.last"""
+SELECT_STATE = "SELECT target_mingguan, achievements, last FROM athlete_state WHERE athlete = ?"
+SELECT_DAY_TOTALS = """SELECT tanggal, SUM(jarak), SUM(waktu), COUNT(*) FROM runs
+                       WHERE athlete = ? GROUP BY tanggal"""
+SELECT_LAST = """SELECT pace, speed, kal, target_mingguan, segments FROM runs
+                 WHERE athlete = ? ORDER BY tanggal DESC, ts DESC LIMIT 1"""
+SELECT_METRICS = "SELECT ts, tanggal, jarak, pace FROM runs WHERE athlete = ? ORDER BY tanggal, ts"
+SELECT_DAILY_TOTALS = """SELECT tanggal, SUM(jarak), SUM(waktu), SUM(kal) FROM runs
+    WHERE athlete = ? GROUP BY tanggal ORDER BY tanggal"""
+SELECT_EXPORT = """SELECT ts, tanggal, jarak, waktu, berat, pace, speed, kal, dow FROM runs
+    WHERE athlete = ? AND tanggal BETWEEN ? AND ? ORDER BY tanggal, ts"""
+SELECT_BEST = """SELECT ts, segments FROM runs
+                 WHERE athlete = ? AND segments IS NOT NULL ORDER BY tanggal, ts"""
+COUNT_RUNS = "SELECT COUNT(*) FROM runs WHERE athlete = ?"
+COUNT_DATES = "SELECT COUNT(DISTINCT tanggal) FROM runs WHERE athlete = ?"
+COUNT_DATES_AFTER = "SELECT COUNT(DISTINCT tanggal) FROM runs WHERE athlete = ? AND tanggal > ?"
+COUNT_DATES_UPTO = "SELECT COUNT(DISTINCT tanggal) FROM runs WHERE athlete = ? AND tanggal <= ?"
+SELECT_DATES_DESC = "SELECT DISTINCT tanggal FROM runs WHERE athlete = ? ORDER BY tanggal DESC LIMIT ? OFFSET ?"
+SELECT_DATES_ASC = "SELECT DISTINCT tanggal FROM runs WHERE athlete = ? ORDER BY tanggal LIMIT ? OFFSET ?"
+HAS_DATE = "SELECT 1 FROM runs WHERE athlete = ? AND tanggal = ? LIMIT 1"
+SELECT_RUN = """SELECT jarak, waktu, berat, pace, speed, kal, dow, segments FROM runs
+                WHERE athlete = ? AND tanggal = ? AND ts = ?"""
+SELECT_ROWS_ON = """SELECT ts, jarak, waktu, pace, speed, kal, dow FROM runs
+                    WHERE athlete = ? AND tanggal = ? ORDER BY ts"""
+
+# Filter History: batas kosong diisi nilai ekstrem, hari = bitmask dow (bit 0 = Senin)
+# ditambah daftar tanggal (JSON) yang tetap ikut walau harinya tidak ada di bitmask
+QUERY_WHERE = """WHERE athlete = ? AND tanggal BETWEEN ? AND ? AND jarak BETWEEN ? AND ?
+    AND pace BETWEEN ? AND ? AND ((? >> dow) & 1 OR tanggal IN (SELECT value FROM json_each(?)))"""
+# Halaman berikutnya dimulai setelah (kolom, ts) baris terakhir (keyset, bukan OFFSET)
+SELECT_QUERY = {
+    (urut, turun): f"""SELECT ts, tanggal, jarak, waktu, pace, speed, kal, dow FROM runs {QUERY_WHERE}
+        AND ({urut}, ts) {"<" if turun else ">"} (?, ?)
+        ORDER BY {urut} {"DESC" if turun else "ASC"}, ts {"DESC" if turun else "ASC"} LIMIT ?"""
+    for urut in SORT_KEYS for turun in (True, False)
+}
+# Posisi kolom urut di baris SELECT_QUERY
+QUERY_KEY = {"tanggal": 1, "jarak": 2, "waktu": 3, "pace": 4, "kal": 6}
+AGGREGATE_QUERY = f"SELECT COUNT(*), TOTAL(jarak), TOTAL(waktu), TOTAL(kal) FROM runs {QUERY_WHERE}"
+
+# Jumlah tanggal yang diambil sekaligus untuk daftar History
+DATE_PAGE = 64
+
+# Jumlah run hasil filter per query halaman (reader tidak ditahan selama hasil dibaca)
+QUERY_PAGE = 256
+
+
+class SqliteStore:
+    """Satu file database (mode WAL) untuk semua atlet.
+
+    Semua tulisan lewat satu koneksi writer, dipanggil dari thread io
+    ``TaskRunner`` dan dikelompokkan dalam satu transaksi per batch. Pembaca
+    (thread Tk maupun pekerja latar belakang) meminjam koneksi dari pool
+    lewat ``reader()``; dengan WAL pembaca tidak menunggu writer.
+    """
+
+    def __init__(self, path, readers=3):
+        self.path = path
+        self.version = 0      # naik setiap commit; dipakai untuk invalidasi cache query
+        self._conn = self._connect()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._readers = queue.LifoQueue()
+        self._reader_slots = threading.Semaphore(readers)
+        self._all_readers = []
+        self._lock = threading.Lock()
+
+    def _migrate(self):
+        """Tambah kolom yang belum ada di database versi lama"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        if "segments" not in columns:
+            with self._conn:
+                self._conn.execute("ALTER TABLE runs ADD COLUMN segments TEXT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=64)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def reader(self):
+        """Pinjam koneksi baca dari pool (dibuat saat dibutuhkan, maks ``readers``)"""
+        self._reader_slots.acquire()
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+            conn.execute("PRAGMA query_only=ON")
+            with self._lock:
+                self._all_readers.append(conn)
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+            self._reader_slots.release()
+
+    # ===== TULIS (thread io) =====
+    def append_many(self, athlete, records):
+        """Sisipkan banyak run dalam satu transaksi; record {"op": "hapus"} menghapus run"""
+        with self._conn:
+            rows = []
+            for r in records:
+                if r.get("op") == "hapus":
+                    # Urutan dijaga: edit = hapus lalu sisipkan run dengan ts yang sama
+                    self._conn.executemany(INSERT_RUN, rows)
+                    rows = []
+                    self._conn.execute(DELETE_RUN, (athlete, r["tanggal"], r["ts"]))
+                    continue
+                rows.append((athlete, r["tanggal"], r["ts"], r["jarak"], r["waktu"], r["berat"],
+                             r["pace"], r["speed"], r["kal"], HARI_LIST.index(r["hari"]), r["target_mingguan"],
+                             json.dumps(r["segments"]) if r.get("segments") else None))
+            self._conn.executemany(INSERT_RUN, rows)
+        self.version += 1
+
+    def save_state(self, athlete, target_mingguan, achievements, last):
+        with self._conn:
+            self._conn.execute(UPSERT_STATE, (athlete, target_mingguan,
+                                              json.dumps(achievements), json.dumps(last)))
+
+    def merge_state(self, athlete, target_mingguan, weeks, last):
+        """Seperti save_state, tapi hanya bucket minggu ``weeks`` yang diganti (thread io)"""
+        with self._conn:
+            saved = self._conn.execute(SELECT_STATE, (athlete,)).fetchone()
+            achievements = json.loads(saved[1]) if saved else {}
+            # Format lama (tanpa "weeks") dihitung ulang penuh saat load, jadi semua minggu ikut di ``weeks``
+            merged = achievements.get("weeks", {}) if "weeks" in achievements else {}
+            merged.update(weeks)
+            self._conn.execute(UPSERT_STATE, (athlete, target_mingguan,
+                                              json.dumps({"weeks": merged}), json.dumps(last)))
+
+    # ===== BACA =====
+    def load_state(self, athlete):
+        """State ringkas satu atlet: agregat per hari + pencapaian, tanpa baris run"""
+        with self.reader() as conn:
+            saved = conn.execute(SELECT_STATE, (athlete,)).fetchone()
+            last_run = conn.execute(SELECT_LAST, (athlete,)).fetchone()
+            if saved is None and last_run is None:
+                return None
+            day_totals = {t: [j, w, n] for t, j, w, n in conn.execute(SELECT_DAY_TOTALS, (athlete,))}
+            # Hanya best effort per run yang dimuat, bukan seluruh segmen
+            best_efforts = [[ts, json.loads(seg)["best"]] for ts, seg in conn.execute(SELECT_BEST, (athlete,))]
+
+        target, achievements, last = saved if saved else (None, "{}", "null")
+        last = json.loads(last)
+        if last is None and last_run is not None:
+            last = {"pace": last_run[0], "speed": last_run[1], "kal": last_run[2],
+                    "segments": json.loads(last_run[4]) if last_run[4] else None}
+        if target is None:
+            target = last_run[3] if last_run else 50.0
+        return {
+            "runs": None,
+            "day_totals": day_totals,
+            # Format lama (pencapaian per hari tanpa minggu) dihitung ulang oleh ScheduleEngine
+            "schedule": json.loads(achievements),
+            "target_mingguan": target,
+            "best_efforts": best_efforts,
+            "last": last,
+        }
+
+    def close(self):
+        self._conn.close()
+        with self._lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers = []
+
+
+class SqliteRuns:
+    """Pengganti ``RunStore`` untuk tampilan: setiap query langsung ke database.
+
+    Run baru ditulis oleh ``SqliteRunLog`` sehingga ``append`` di sini tidak
+    menyimpan apa-apa. Jumlah dan halaman tanggal di-cache sampai ada commit
+    baru (``SqliteStore.version``).
+    """
+
+    def __init__(self, store, athlete):
+        self.store = store
+        self.athlete = athlete
+        self._version = None
+        self._count = None
+        self._pages = {}      # (reverse, awal_halaman) -> [tanggal]
+
+    def _query(self, sql, *params):
+        with self.store.reader() as conn:
+            return conn.execute(sql, (self.athlete,) + params).fetchall()
+
+    def _fresh(self):
+        if self._version != self.store.version:
+            self._version = self.store.version
+            self._count = None
+            self._pages = {}
+
+    def __len__(self):
+        return self._query(COUNT_RUNS)[0][0]
+
+    def __bool__(self):
+        return self.date_count() > 0
+
+    def append(self, *run):
+        """Tidak menyimpan apa-apa: run ditulis ke database oleh SqliteRunLog"""
+        return None
+
+    def update(self, *run):
+        return None
+
+    def remove(self, tanggal, ts):
+        """Tidak menghapus apa-apa: record hapus ditulis ke database oleh SqliteRunLog"""
+        return None
+
+    @contextmanager
+    def bulk(self):
+        yield self
+
+    # ===== QUERY =====
+    def dates(self, reverse=False):
+        return [t for t, in self._query(SELECT_DATES_DESC if reverse else SELECT_DATES_ASC, -1, 0)]
+
+    def date_count(self):
+        self._fresh()
+        if self._count is None:
+            self._count = self._query(COUNT_DATES)[0][0]
+        return self._count
+
+    def date_at(self, i, reverse=False):
+        """Tanggal ke-i; diambil per halaman supaya daftar History cukup beberapa query"""
+        self._fresh()
+        start = i - i % DATE_PAGE
+        page = self._pages.get((reverse, start))
+        if page is None:
+            page = self._pages[(reverse, start)] = [
+                t for t, in self._query(SELECT_DATES_DESC if reverse else SELECT_DATES_ASC, DATE_PAGE, start)]
+        return page[i - start]
+
+    def date_position(self, prefix, reverse=False):
+        """Posisi tanggal terbaru yang diawali ``prefix`` ("YYYY" / "YYYY-MM")"""
+        if reverse:
+            return self._query(COUNT_DATES_AFTER, prefix + "\uffff")[0][0]
+        return max(0, self._query(COUNT_DATES_UPTO, prefix + "\uffff")[0][0] - 1)
+
+    def has_date(self, tanggal):
+        return bool(self._query(HAS_DATE, tanggal))
+
+    def get(self, tanggal, ts):
+        """Record satu run (termasuk segmen) atau None"""
+        found = self._query(SELECT_RUN, tanggal, ts)
+        if not found:
+            return None
+        jarak, waktu, berat, pace, speed, kal, dow, segments = found[0]
+        rec = {"tanggal": tanggal, "ts": ts, "jarak": jarak, "waktu": waktu, "berat": berat,
+               "hari": HARI_LIST[dow], "pace": pace, "speed": speed, "kal": kal}
+        if segments:
+            rec["segments"] = json.loads(segments)
+        return rec
+
+    def rows_on(self, tanggal):
+        for ts, jarak, waktu, pace, speed, kal, dow in self._query(SELECT_ROWS_ON, tanggal):
+            yield self._row(ts, tanggal, jarak, waktu, pace, speed, kal, dow)
+
+    @staticmethod
+    def _row(ts, tanggal, jarak, waktu, pace, speed, kal, dow):
+        return {
+            "ts": ts,
+            "tanggal": tanggal,
+            "time": datetime.fromtimestamp(ts).strftime("%H:%M"),
+            "jarak": jarak,
+            "waktu": waktu,
+            "pace": pace,
+            "speed": speed,
+            "kal": kal,
+            "hari": HARI_LIST[dow],
+        }
+
+    def query(self, kriteria, schedule, urut="tanggal", turun=True):
+        """(ringkasan, generator run) yang lolos filter, format sama dengan ``RunStore.query``.
+
+        Tanggal, hari dan rentang jarak/pace disaring SQLite (index per
+        kolom); tipe latihan dan status tercapai bergantung pada jadwal, jadi
+        dicek di Python dengan lookup O(1) per baris.
+        """
+        bounds = []
+        for col in ("jarak", "pace"):
+            lo, hi = kriteria.get(col) or (None, None)
+            bounds += [-1e308 if lo is None else lo, 1e308 if hi is None else hi]
+        hari = sum(1 << HARI_LIST.index(h) for h in kriteria.get("hari") or HARI_LIST)
+        tipe, completed = set(kriteria.get("tipe") or ()), kriteria.get("completed")
+        base, ganti, extra = [schedule.base[h]["tipe"] for h in HARI_LIST], {}, []
+        if tipe:
+            # Hari yang tipe dasarnya cocok + tanggal yang tipenya ditimpa program
+            if self:
+                ganti = dict(schedule.tipe_overrides(self.date_at(0), self.date_at(0, reverse=True)))
+            extra = [t for t, g in ganti.items()
+                     if g in tipe and hari >> date.fromisoformat(t).weekday() & 1]
+            hari &= sum(1 << d for d, t in enumerate(base) if t in tipe)
+        params = (kriteria.get("dari") or "", kriteria.get("sampai") or "\uffff", *bounds, hari,
+                  json.dumps(extra))
+
+        def found():
+            last = (("\uffff" if turun else "") if urut == "tanggal" else (1e308 if turun else -1e308),
+                    1e308 if turun else -1e308)
+            while True:
+                page = self._query(SELECT_QUERY[(urut, turun)], *params, *last, QUERY_PAGE)
+                for row in page:
+                    tanggal = row[1]
+                    if ((not tipe or ganti.get(tanggal, base[row[7]]) in tipe) and
+                            (completed is None or (tanggal in schedule.completed_days) == completed)):
+                        yield row
+                if len(page) < QUERY_PAGE:
+                    return
+                last = (page[-1][QUERY_KEY[urut]], page[-1][0])
+
+        if tipe or completed is not None:
+            runs, jarak, waktu, kal = 0, 0.0, 0.0, 0.0
+            for row in found():
+                runs += 1
+                jarak += row[2]
+                waktu += row[3]
+                kal += row[6]
+        else:
+            runs, jarak, waktu, kal = self._query(AGGREGATE_QUERY, *params)[0]
+        return ({"runs": runs, "jarak": jarak, "waktu": waktu, "kal": kal,
+                 "pace": waktu / jarak if jarak > 0 else 0.0},
+                (self._row(*row) for row in found()))
+
+    def metric_rows(self):
+        """(ts, tanggal, jarak, pace) semua run, dibaca bertahap dari cursor"""
+        with self.store.reader() as conn:
+            yield from conn.execute(SELECT_METRICS, (self.athlete,))
+
+    def daily_rows(self):
+        """(tanggal, jarak, waktu, kal) per tanggal, urut naik"""
+        return self._query(SELECT_DAILY_TOTALS)
+
+    def export_chunks(self, dari=None, sampai=None, chunk=5000):
+        """Potongan kolom untuk tanggal dari..sampai (index athlete+tanggal, fetchmany)"""
+        with self.store.reader() as conn:
+            cursor = conn.execute(SELECT_EXPORT, (self.athlete, dari or "", sampai or "\uffff"))
+            names = ("ts", "tanggal", "jarak", "waktu", "berat", "pace", "speed", "kal", "dow")
+            while True:
+                rows = cursor.fetchmany(chunk)
+                if not rows:
+                    return
+                yield dict(zip(names, map(list, zip(*rows))))
+
+    def to_state(self):
+        # Baris run sudah ada di database, tidak ikut snapshot
+        return None
+
+
+class SqliteRunLog:
+    """Antarmuka ``RunLog`` di atas ``SqliteStore`` untuk satu atlet"""
+
+    def __init__(self, store, athlete):
+        self.store = store
+        self.athlete = athlete
+        self.saved_target = None    # target yang terakhir dikirim ke save_changes (thread Tk)
+
+    def new_runs(self, state=None):
+        return SqliteRuns(self.store, self.athlete)
+
+    def load(self):
+        return self.store.load_state(self.athlete), []
+
+    def append_many(self, records):
+        self.store.append_many(self.athlete, records)
+
+    def append(self, record):
+        self.append_many([record])
+
+    def needs_compaction(self):
+        # Run sudah langsung di database; state ringkas disimpan lewat save_changes
+        return False
+
+    def save_changes(self, target_mingguan, weeks, last):
+        """Simpan target, run terakhir dan bucket minggu yang berubah saja"""
+        self.store.merge_state(self.athlete, target_mingguan, weeks, last)
+
+    def compact(self, state, background=True):
+        """Simpan pencapaian jadwal, target dan run terakhir (selalu di thread pemanggil)"""
+        self.store.save_state(self.athlete, state["target_mingguan"],
+                              state["schedule"], state["last"])
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
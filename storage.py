@@ -0,0 +1,165 @@
+"""Penyimpanan data lari: log append-only + snapshot untuk start cepat"""
+import json
+import os
+import threading
+import time
+
+from run_store import RunStore
+
+DATA_DIR = os.path.join(os.path.expanduser("~"), ".run_analyzer")
+
+
+class RunLog:
+    """Log append-only (JSON Lines) dengan fsync berkelompok dan snapshot.
+
+    Setiap run baru ditulis sebagai satu baris ke ``runs.log``. Secara berkala
+    seluruh state aplikasi disimpan ke ``snapshot.json`` sehingga saat start
+    hanya ekor log (record setelah snapshot) yang perlu diputar ulang.
+    Run yang dihapus ditulis sebagai record ``{"op": "hapus", "tanggal", "ts"}``;
+    edit = record hapus + run baru dengan ts yang sama.
+    """
+
+    def __init__(self, folder=DATA_DIR, fsync_interval=0.5, fsync_batch=64,
+                 compact_threshold=5000):
+        self.folder = folder
+        self.log_path = os.path.join(folder, "runs.log")
+        self.snapshot_path = os.path.join(folder, "snapshot.json")
+        self.fsync_interval = fsync_interval
+        self.fsync_batch = fsync_batch
+        self.compact_threshold = compact_threshold
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._seq = 0
+        self._log_records = 0
+        self._compacting = False
+        self._closed = False
+        self._wake = threading.Event()
+
+        os.makedirs(folder, exist_ok=True)
+        self._fh = open(self.log_path, "a", encoding="utf-8")
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def new_runs(self, state=None):
+        """Wadah run di memori untuk backend log (dari snapshot jika ada)"""
+        return RunStore.from_state(state) if state else RunStore()
+
+    # ===== BACA =====
+    def load(self):
+        """Kembalikan (state_snapshot, record_ekor_log)"""
+        state, snap_seq = None, 0
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snap = json.load(f)
+            state, snap_seq = snap["state"], snap["seq"]
+
+        records = []
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # Baris terakhir bisa terpotong kalau aplikasi crash
+                    continue
+                if rec["seq"] > snap_seq:
+                    records.append(rec)
+
+        self._seq = records[-1]["seq"] if records else snap_seq
+        self._log_records = len(records)
+        return state, records
+
+    # ===== TULIS =====
+    def append(self, record):
+        """Tulis satu record ke log, fsync dilakukan berkelompok"""
+        self.append_many([record])
+
+    def append_many(self, records):
+        """Tulis beberapa record sekaligus (satu transaksi fsync)"""
+        with self._lock:
+            for record in records:
+                self._seq += 1
+                record["seq"] = self._seq
+                self._fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+            self._pending += len(records)
+            self._log_records += len(records)
+            if self._pending >= self.fsync_batch:
+                self._sync_locked()
+        self._wake.set()
+
+    def _sync_locked(self):
+        if self._pending:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._pending = 0
+
+    def _flush_loop(self):
+        while not self._closed:
+            self._wake.wait()
+            time.sleep(self.fsync_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._closed:
+                    self._sync_locked()
+
+    def flush(self):
+        with self._lock:
+            self._sync_locked()
+
+    # ===== KOMPAKSI =====
+    def needs_compaction(self):
+        return self._log_records >= self.compact_threshold and not self._compacting
+
+    def compact(self, state, background=True):
+        """Simpan snapshot dari ``state`` lalu buang record log yang sudah tercakup.
+
+        ``state`` harus sudah berupa salinan (diambil di thread utama) karena
+        penulisan snapshot bisa berjalan di thread latar belakang.
+        """
+        if self._compacting:
+            return
+        with self._lock:
+            seq = self._seq
+        self._compacting = True
+        if background:
+            threading.Thread(target=self._compact, args=(state, seq), daemon=True).start()
+        else:
+            self._compact(state, seq)
+
+    def _compact(self, state, seq):
+        try:
+            tmp = self.snapshot_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"seq": seq, "state": state}, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.snapshot_path)
+
+            with self._lock:
+                self._sync_locked()
+                self._fh.close()
+                tail = []
+                with open(self.log_path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            if json.loads(line)["seq"] > seq:
+                                tail.append(line)
+                        except ValueError:
+                            continue
+                tmp = self.log_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(tail)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self.log_path)
+                self._fh = open(self.log_path, "a", encoding="utf-8")
+                self._log_records = len(tail)
+        finally:
+            self._compacting = False
+
+    def close(self):
+        with self._lock:
+            self._sync_locked()
+            self._closed = True
+            self._fh.close()
+        self._wake.set()
@@ -0,0 +1,111 @@
+"""Pekerjaan latar belakang untuk aplikasi Tk (hasil dikirim balik lewat after())"""
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TaskRunner:
+    """Pool pekerja dengan hasil yang diproses di thread Tk.
+
+    Tiga pool:
+      - "io"  : satu thread, urutan tulis ke disk terjaga (log run, snapshot)
+      - "bg"  : beberapa thread untuk pekerjaan lama yang kebanyakan menunggu
+      - "cpu" : ProcessPool untuk komputasi berat (dibuat saat pertama dipakai)
+
+    Callback ``on_done``/``on_error`` selalu dipanggil di thread Tk oleh
+    ``_poll`` yang berjalan lewat ``after()`` dan dibatasi ``budget_ms`` per
+    tick, sehingga main loop tidak pernah tertahan lebih dari satu frame.
+    Tugas dengan ``key`` yang sama digabung: tugas lama yang belum jalan
+    dibatalkan dan hasil tugas lama yang sudah terlanjur jalan diabaikan.
+    """
+
+    def __init__(self, root, poll_ms=16, budget_ms=8, bg_workers=2, cpu_workers=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.budget_ms = budget_ms
+        self._pools = {
+            "io": ThreadPoolExecutor(max_workers=1, thread_name_prefix="run-io"),
+            "bg": ThreadPoolExecutor(max_workers=bg_workers, thread_name_prefix="run-bg"),
+        }
+        self._cpu_workers = cpu_workers
+        self._results = queue.SimpleQueue()
+        self._latest = {}     # key -> Future terbaru
+        self._pending = 0
+        self._poll_job = None
+
+    @property
+    def cpu(self):
+        if "cpu" not in self._pools:
+            # multiprocessing cukup berat di-import; hanya saat benar-benar dipakai.
+            # Akses pertama harus dari thread Tk (bukan dari tugas di pool "bg")
+            from concurrent.futures import ProcessPoolExecutor
+            self._pools["cpu"] = ProcessPoolExecutor(max_workers=self._cpu_workers)
+        return self._pools["cpu"]
+
+    def submit(self, fn, *args, pool="io", on_done=None, on_error=None, key=None):
+        """Jalankan ``fn(*args)`` di pool; kembalikan Future"""
+        executor = self.cpu if pool == "cpu" else self._pools[pool]
+        if key is not None:
+            self.cancel(key)
+        future = executor.submit(fn, *args)
+        if key is not None:
+            self._latest[key] = future
+        self._pending += 1
+        future.add_done_callback(lambda f: self._results.put((f, on_done, on_error, key)))
+        if self._poll_job is None:
+            self._poll_job = self.root.after(self.poll_ms, self._poll)
+        return future
+
+    def flush(self, pool="io"):
+        """Tunggu sampai semua tugas yang sudah diantrikan di ``pool`` (satu thread) selesai"""
+        self._pools[pool].submit(int).result()
+
+    def cancel(self, key):
+        """Batalkan tugas terakhir dengan ``key`` (jika belum mulai jalan)"""
+        old = self._latest.pop(key, None)
+        if old is not None:
+            old.cancel()
+
+    def _poll(self):
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        while time.perf_counter() < deadline:
+            try:
+                future, on_done, on_error, key = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            if future.cancelled():
+                continue
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    continue  # sudah digantikan tugas yang lebih baru
+                del self._latest[key]
+            error = future.exception()
+            if error is not None:
+                if on_error is not None:
+                    on_error(error)
+                else:
+                    self.root.report_callback_exception(type(error), error, error.__traceback__)
+            elif on_done is not None:
+                on_done(future.result())
+
+        self._poll_job = None
+        if self._pending:
+            self._poll_job = self.root.after(self.poll_ms, self._poll)
+
+    def run_steps(self, steps, on_done=None, delay_ms=1):
+        """Jalankan generator sedikit demi sedikit di thread Tk (satu langkah per tick)"""
+        try:
+            next(steps)
+        except StopIteration as stop:
+            if on_done is not None:
+                on_done(stop.value)
+            return
+        self.root.after(delay_ms, self.run_steps, steps, on_done, delay_ms)
+
+    def shutdown(self, wait=True):
+        if self._poll_job is not None:
+            self.root.after_cancel(self._poll_job)
+            self._poll_job = None
+        for executor in self._pools.values():
+            executor.shutdown(wait=wait, cancel_futures=not wait)